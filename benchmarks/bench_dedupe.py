@@ -0,0 +1,72 @@
+# --- 量測：匯入時的近似重複偵測 ---
+# 用法：python benchmarks/bench_dedupe.py --names 100000 --existing 20000
+#
+# 合成資料：以「廠牌 + 用途 + 地點 + 編號」組出名稱，再隨機改大小寫、調換字序、加空白/標點作為重複；
+# 「兩兩比對」= 對前 --pairwise 個名稱計算所有配對的 Jaccard (O(N^2))，作為召回率的基準。
+import argparse
+import os
+import random
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cdm_core import name_tokens, near_duplicates
+from suite import timed
+
+BRANDS = ["Synology", "Cisco", "Fortinet", "HP", "Dell", "Lenovo", "Oracle", "SAP", "VMware", "Microsoft"]
+ROLES = ["NAS 備份機", "核心交換器", "防火牆", "檔案伺服器", "資料庫主機", "ERP 系統", "AD 網域控制站", "郵件閘道", "筆電", "工作站"]
+SITES = ["台北", "新竹", "台中", "高雄", "東京", "上海", "機房A", "機房B"]
+
+
+def synthetic(n, seed, dup_rate=0.1):
+    rng = random.Random(seed)
+    names = []
+    for i in range(n):
+        if names and rng.random() < dup_rate:
+            words = rng.choice(names).split()
+            rng.shuffle(words)
+            name = rng.choice([" ", "  ", " - "]).join(words)
+            names.append(name.upper() if rng.random() < 0.5 else name.lower())
+        else:
+            names.append(f"{rng.choice(BRANDS)} {rng.choice(ROLES)} {rng.choice(SITES)} {i:06d}")
+    return names
+
+
+def pairwise(names, threshold):
+    tokens = [name_tokens(n) for n in names]
+    found = set()
+    for i in range(len(names)):
+        for j in range(i + 1, len(names)):
+            a, b = tokens[i], tokens[j]
+            if a and b and len(a & b) / len(a | b) >= threshold and {t for t in a if any(c.isdigit() for c in t)} == {t for t in b if any(c.isdigit() for c in t)}:
+                found.add(j)
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--names", type=int, default=100000, help="匯入的名稱數")
+    parser.add_argument("--existing", type=int, default=20000, help="已在清單中的名稱數")
+    parser.add_argument("--pairwise", type=int, default=3000)
+    parser.add_argument("--threshold", type=float, default=0.6)
+    args = parser.parse_args()
+
+    existing = synthetic(args.existing, seed=1)
+    for n in (args.names // 10, args.names // 2, args.names):
+        names = synthetic(n, seed=2)
+        merges, t = timed(lambda: near_duplicates(names, existing=existing, threshold=args.threshold))
+        print(f"  {n:7d} 名稱 + {args.existing} 既有   {t * 1000:9.1f} ms   合併建議 {len(merges)}")
+
+    names = synthetic(args.pairwise, seed=3)
+    expected, t_pair = timed(pairwise, names, args.threshold)
+    merges, t_lsh = timed(lambda: near_duplicates(names, threshold=args.threshold))
+    index = {name: i for i, name in enumerate(names)}
+    got = {index[name] for name in merges["資產名稱"]}
+    print(f"{args.pairwise} 名稱：兩兩比對 {t_pair * 1000:.1f} ms / LSH {t_lsh * 1000:.1f} ms，"
+          f"召回 {len(got & expected)}/{len(expected)}，多出 {len(got - expected)}")
+
+
+if __name__ == "__main__":
+    main()
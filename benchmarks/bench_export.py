@@ -0,0 +1,75 @@
+# --- 量測：報表匯出 (XLSX / HTML / PDF) ---
+# 用法：python benchmarks/bench_export.py --sizes 10000 100000
+#
+# 每個資產數量先建立快照 (Report)，再以各格式寫入暫存檔，記錄耗時、檔案大小與寫檔期間的記憶體峰值
+# (tracemalloc，只計寫檔本身)；串流寫出時峰值應與資產數無關。--no-memory 略過記憶體量測 (tracemalloc 會拖慢寫檔)。
+# 另以 openpyxl 的 write-only 模式寫同樣的資產表作為對照 (--openpyxl-max 以下的資產數)。
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cdm_core import EXPORT_FORMATS, Report, SharedWorkspace
+from cdm_core.export import ASSET_COLUMNS
+from suite import build_store, synthetic_inventory
+
+
+def timed_write(write, path, memory):
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    write(path)
+    elapsed = time.perf_counter() - start
+    peak = None
+    if memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return elapsed, peak
+
+
+def openpyxl_write(report, path):
+    import openpyxl
+
+    book = openpyxl.Workbook(write_only=True)
+    sheet = book.create_sheet("資產評分")
+    sheet.append(ASSET_COLUMNS)
+    for chunk in report.asset_rows():
+        for name, category, crown, scores in chunk:
+            sheet.append([name, category, "是" if crown else "否", *scores])
+    book.save(path)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--no-memory", action="store_true")
+    parser.add_argument("--openpyxl-max", type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.sizes:
+            shared = SharedWorkspace(build_store(*synthetic_inventory(n)))
+            start = time.perf_counter()
+            report = Report.from_shared(shared)
+            print(f"{n} 項資產 (快照 {(time.perf_counter() - start) * 1000:.0f} ms，{len(report.gaps)} 個缺口)")
+            targets = [(fmt, lambda path, write=write: write(report, path)) for fmt, (_, _, _, write) in EXPORT_FORMATS.items()]
+            if n <= args.openpyxl_max:
+                targets.append(("openpyxl", lambda path: openpyxl_write(report, path)))
+            for name, write in targets:
+                path = os.path.join(tmp, f"{name}-{n}")
+                elapsed, peak = timed_write(write, path, memory=False)
+                memory = ""
+                if not args.no_memory and name != "openpyxl":
+                    _, peak = timed_write(write, path, memory=True)
+                    memory = f"   記憶體峰值 {peak / 1e6:6.1f} MB"
+                print(f"  {name:<9} {elapsed:7.2f} s   {os.path.getsize(path) / 1e6:7.1f} MB{memory}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# --- 量測：歷史快照 (差異儲存) ---
+# 用法：python benchmarks/bench_history.py --assets 50000 --snapshots 200 --changes 250
+#
+# 每個快照之間改動 --changes 筆評分 (並新增 / 刪除少量資產)，量測：資料庫大小 (對照每次存完整內容)、
+# 建立快照、還原任一快照、任意兩個快照比對、以及只讀每格統計量的趨勢查詢。
+import argparse
+import os
+import random
+import sys
+import tempfile
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cdm_core import FUNCTIONS, WorkspaceDB, classify_cells
+from suite import populate, synthetic_inventory, timed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--assets", type=int, default=50000)
+    parser.add_argument("--snapshots", type=int, default=200)
+    parser.add_argument("--changes", type=int, default=250, help="每個快照之間改動的評分筆數")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "workspaces.sqlite")
+        db = WorkspaceDB(path)
+        assets, scores = synthetic_inventory(args.assets, score_weights=(0, 1, 1, 1, 1))
+        store = populate(db.load("基準"), assets, scores)
+        names = assets["資產名稱"].tolist()
+        db._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        base_size = os.path.getsize(path)
+
+        snapshot_times, ids, added = [], [], 0
+        for k in range(args.snapshots):
+            store.update({(rng.choice(names), rng.choice(FUNCTIONS)): rng.randint(1, 4) for _ in range(args.changes)})
+            new = [f"new-{added + i:06d}" for i in range(5)]
+            added += len(new)
+            store.add_assets(pd.DataFrame({"資產名稱": new, "類別": "裝置", "皇冠寶石": False}))
+            store.remove_assets([names.pop(rng.randrange(len(names)))])
+            snapshot_id, t = timed(lambda: db.snapshot("基準", f"第 {k + 1} 次"))
+            ids.append(snapshot_id)
+            snapshot_times.append(t)
+        db._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        history_size = os.path.getsize(path) - base_size
+
+        rows = db._conn.execute("SELECT COUNT(*) FROM snapshot_assets").fetchone()[0]
+        full_rows = sum(count for _, _, _, count, _, _ in db.snapshots("基準"))
+        print(f"{args.assets} 項資產，{args.snapshots} 個快照，每次改動 {args.changes} 筆評分")
+        print(f"  儲存列數          {rows:10d}  (每次存完整內容 {full_rows} 列，{full_rows / rows:.1f} 倍)")
+        print(f"  歷史佔用          {history_size / 2**20:10.1f} MB  (工作區本身 {base_size / 2**20:.1f} MB)")
+        print(f"  建立快照          {sum(snapshot_times) / len(snapshot_times) * 1000:10.1f} ms/次 (最慢 {max(snapshot_times) * 1000:.1f})")
+
+        _, t = timed(lambda: [db.snapshot_store(i) for i in ids[-10:]])
+        print(f"  還原快照          {t / 10 * 1000:10.1f} ms/次")
+        diffs = [tuple(rng.sample(ids, 2)) for _ in range(10)]
+        _, t = timed(lambda: [db.snapshot_diff(a, b) for a, b in diffs])
+        print(f"  任意兩快照比對    {t / 10 * 1000:10.1f} ms/次")
+
+        def trend():
+            snapshots, *aggregates = db.snapshot_cells("基準")
+            return classify_cells(*aggregates)
+
+        (statuses, _), t = timed(trend)
+        print(f"  整個矩陣的趨勢    {t * 1000:10.1f} ms  ({statuses.shape[0]} 個快照)")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# --- 量測：逐筆新增資產 (手動「新增」按鈕的路徑) ---
+# 用法：python benchmarks/bench_inserts.py --assets 100000 --baseline 10000
+#
+# 「原本」= 以 .values 線性查重 + pd.concat 單列 DataFrame (整份複製)，O(N²)，只跑 --baseline 筆；
+# 「AssessmentStore」= 名稱索引查重 + 預留容量的陣列，新增為攤銷 O(1)。
+# --read-every 模擬每 K 次新增就重跑一次頁面 (讀取 store.assets)，量測延遲合併的成本。
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cdm_core import AssessmentStore
+from suite import synthetic_inventory, timed
+
+
+def baseline(rows):
+    assets = pd.DataFrame(columns=["資產名稱", "類別", "皇冠寶石"])
+    for name, category, crown in rows:
+        if name not in assets['資產名稱'].values:
+            new_row = pd.DataFrame([{"資產名稱": name, "類別": category, "皇冠寶石": crown}])
+            assets = pd.concat([assets, new_row], ignore_index=True)
+    return assets
+
+
+def store_adds(rows, read_every):
+    store = AssessmentStore()
+    for i, (name, category, crown) in enumerate(rows, 1):
+        store.add_asset(name, category, crown)
+        if read_every and i % read_every == 0:
+            store.assets
+    store.assets
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--assets", type=int, default=100000)
+    parser.add_argument("--baseline", type=int, default=10000, help="原本做法只跑前 N 筆 (O(N²) 太慢)")
+    parser.add_argument("--read-every", type=int, default=100)
+    args = parser.parse_args()
+
+    assets, _ = synthetic_inventory(args.assets)
+    rows = list(zip(assets["資產名稱"].tolist(), assets["類別"].tolist(), assets["皇冠寶石"].tolist()))
+
+    print(f"逐筆新增 {args.assets} 項資產")
+    if args.baseline:
+        n = min(args.baseline, args.assets)
+        for k in (n // 2, n):
+            _, t = timed(baseline, rows[:k])
+            print(f"  原本 concat + .values   {k:7d} 筆 {t:8.2f} s  ({t / k * 1e6:7.1f} µs/筆)")
+    for k in (args.assets // 2, args.assets):
+        _, t = timed(store_adds, rows[:k], 0)
+        print(f"  AssessmentStore         {k:7d} 筆 {t:8.2f} s  ({t / k * 1e6:7.1f} µs/筆)")
+    _, t = timed(store_adds, rows, args.read_every)
+    print(f"  + 每 {args.read_every} 筆讀一次 assets {args.assets:7d} 筆 {t:8.2f} s  ({t / args.assets * 1e6:7.1f} µs/筆)")
+
+
+if __name__ == "__main__":
+    main()
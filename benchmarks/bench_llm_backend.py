@@ -0,0 +1,120 @@
+# --- 量測：本地 LLM 分類引擎 (批次 + 並行 + 快取 + 規則備援) ---
+# 用法：python benchmarks/bench_llm_backend.py --lines 2000 --latency 0.3
+#
+# 啟動一個模擬 Ollama /api/generate 的本機 stub server (可設定延遲與失敗率，
+# 內部以關鍵字規則作答，方便核對結果)，依序量測：
+#   冷啟動匯入 -> 同一份資料再匯入 (應全部命中快取) -> 模型過慢 (逾時) -> 模型離線。
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cdm_core import ClassificationCache, LLMClassifier, RuleClassifier
+from suite import timed
+
+ITEM = re.compile(r"^(\d+)\. (.*)$", re.M)
+
+
+def start_stub(latency, failure_rate, seed=0):
+    rules = RuleClassifier()
+    rng = random.Random(seed)
+    stats = {"requests": 0, "lines": 0, "lock": threading.Lock()}
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            lines = [line for _, line in ITEM.findall(payload["prompt"])]
+            with stats["lock"]:
+                stats["requests"] += 1
+                stats["lines"] += len(lines)
+                fail = rng.random() < failure_rate
+            time.sleep(server.latency * (0.5 + rng.random()))
+            if fail:
+                self.send_response(500)
+                self.end_headers()
+                return
+            results = [{"category": c, "crown": k} for c, k in rules.classify(lines)]
+            body = json.dumps({"model": payload["model"], "response": json.dumps({"results": results}), "done": True})
+            body = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.latency = latency
+    server.stats = stats
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def synthetic_lines(n, seed=0):
+    rng = random.Random(seed)
+    words = ["Cisco", "核心", "SQL", "Database", "VPN", "帳號", "AWS", "生產", "NAS", "iPad", "ERP", "Switch",
+             "Office", "個資", "總經理", "Router", "Admin", "EDR", "印表機", "伺服器"]
+    return [f"{' '.join(rng.sample(words, 3))} #{i}" for i in range(n)]
+
+
+def run(label, classifier, lines, server, expected):
+    server.stats["requests"] = server.stats["lines"] = 0
+    classifier.stats = {"cached": 0, "llm": 0, "fallback": 0}
+    results, elapsed = timed(classifier.classify, lines)
+    s = classifier.stats
+    print(f"  {label:<10} {elapsed:7.2f} s  模型請求 {server.stats['requests']:4d}  "
+          f"快取 {s['cached']:5d}  LLM {s['llm']:5d}  規則備援 {s['fallback']:5d}  "
+          f"結果一致 {results == expected}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.3, help="stub 每次請求的平均延遲 (秒)")
+    parser.add_argument("--failure-rate", type=float, default=0.05)
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    lines = synthetic_lines(args.lines)
+    expected = RuleClassifier().classify(lines)
+    server = start_stub(args.latency, args.failure_rate)
+    endpoint = f"http://127.0.0.1:{server.server_address[1]}"
+    batches = -(-args.lines // args.batch_size)
+    print(f"{args.lines} 行 / batch {args.batch_size} / {args.workers} 並行，stub 延遲 ~{args.latency}s，"
+          f"失敗率 {args.failure_rate:.0%}")
+    print(f"  (逐批序列呼叫的估計時間 ~{batches * args.latency:.1f} s)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ClassificationCache(os.path.join(tmp, "cache.sqlite"))
+        classifier = LLMClassifier(endpoint, "stub", cache=cache, batch_size=args.batch_size,
+                                   max_workers=args.workers, timeout=args.latency * 5, backoff=0.05)
+        run("冷啟動", classifier, lines, server, expected)
+        run("再次匯入", classifier, lines, server, expected)
+
+        # 模型過慢：每批都逾時，連續失敗後整批改用規則
+        fresh = synthetic_lines(args.lines, seed=1)
+        server.latency = args.latency * 20
+        slow = LLMClassifier(endpoint, "stub", cache=cache, batch_size=args.batch_size,
+                             max_workers=args.workers, timeout=args.latency, retries=1, backoff=0.05)
+        run("模型過慢", slow, fresh, server, RuleClassifier().classify(fresh))
+
+        server.shutdown()
+        server.server_close()
+        run("模型離線", slow, fresh, server, RuleClassifier().classify(fresh))
+
+
+if __name__ == "__main__":
+    main()
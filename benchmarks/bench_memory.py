@@ -0,0 +1,63 @@
+# --- 量測：每個 session 的資產 / 評分記憶體用量 ---
+# 用法：python benchmarks/bench_memory.py --assets 50000
+#
+# 「原本」= object 欄位的 assets DataFrame + {(資產名稱, 功能): 分數} dict；
+# 「AssessmentStore」= 名稱索引 + int8 分數矩陣 + categorical 類別 + bool 皇冠。
+import argparse
+import os
+import sys
+import tracemalloc
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cdm_core import FUNCTIONS, AssessmentStore
+from suite import synthetic_inventory
+
+
+def measure(build):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--assets", type=int, default=50000)
+    args = parser.parse_args()
+
+    # 名稱字串兩種表示法共用，先建立好不計入
+    assets, scores = synthetic_inventory(args.assets, score_weights=(0, 1, 1, 1, 1))
+    names = assets["資產名稱"].tolist()
+    categories = assets["類別"].tolist()
+    crowns = assets["皇冠寶石"].tolist()
+    scores = scores.tolist()
+
+    def build_dict():
+        assets = pd.DataFrame({"資產名稱": names, "類別": categories, "皇冠寶石": crowns}, dtype=object)
+        assessments = {(name, f): row[i] for name, row in zip(names, scores) for i, f in enumerate(FUNCTIONS)}
+        return assets, assessments
+
+    def build_store():
+        store = AssessmentStore()
+        store.add_assets(pd.DataFrame({"資產名稱": names, "類別": categories, "皇冠寶石": crowns}))
+        for name, row in zip(names, scores):
+            for i, f in enumerate(FUNCTIONS):
+                store[(name, f)] = row[i]
+        return store
+
+    _, old = measure(build_dict)
+    _, new = measure(build_store)
+    print(f"{args.assets} 項資產 x {len(FUNCTIONS)} 個功能，每個 session 的記憶體 (tracemalloc)")
+    print(f"  原本 DataFrame + dict  {old / 2**20:8.2f} MiB")
+    print(f"  AssessmentStore        {new / 2**20:8.2f} MiB  ({old / max(new, 1):.1f}x 較小)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# --- 量測：評分政策 ---
+# 用法：python benchmarks/bench_policy.py --assets 50000 --updates 200
+#
+# 「完整重算」= compute_matrix (DataFrame + 評分 dict)，預設規則與每個政策各一次；
+# 「改一筆評分後」= 戰情室的實際路徑：store 增量更新後取矩陣，預設規則 (只判定異動的格子) vs. 所有內建政策並列，
+# 政策由矩陣快取的分數分佈判定，與資產數無關。
+import argparse
+import os
+import random
+import statistics
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cdm_core import FUNCTIONS, POLICIES, ScoringPolicy, compute_matrix
+from suite import build_store, synthetic_inventory, timed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--assets", type=int, default=50000)
+    parser.add_argument("--updates", type=int, default=200, help="逐筆改分的次數")
+    args = parser.parse_args()
+
+    assets, scores = synthetic_inventory(args.assets)
+    store = build_store(assets, scores)
+    assessments = dict(store.items())
+    policies = [ScoringPolicy(spec) for spec in POLICIES]
+
+    print(f"{args.assets} 項資產，{len(policies)} 個政策：{'、'.join(p.name for p in policies)}")
+    _, t_default = timed(lambda: compute_matrix(assets, assessments))
+    _, t_policies = timed(lambda: [compute_matrix(assets, assessments, p) for p in policies])
+    print(f"  完整重算    預設規則 {t_default * 1000:8.1f} ms   所有政策 {t_policies * 1000:8.1f} ms")
+
+    rng = random.Random(0)
+    names = assets["資產名稱"].tolist()
+    default, together = [], []
+    for _ in range(args.updates):
+        store.update({(rng.choice(names), rng.choice(FUNCTIONS)): rng.randint(0, 4)})
+        default.append(timed(store.matrix)[1])
+        store.update({(rng.choice(names), rng.choice(FUNCTIONS)): rng.randint(0, 4)})
+        together.append(timed(lambda: [store.matrix(p) for p in policies])[1])
+    print(f"  改一筆評分後 預設規則 {statistics.median(default) * 1000:8.3f} ms   "
+          f"所有政策 {statistics.median(together) * 1000:8.3f} ms (中位數，{args.updates} 次)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# --- 量測：效能診斷 (Profiler) 本身的成本 ---
+# 用法：python benchmarks/bench_profiling.py --assets 20000
+#
+# 1. 每個區段的額外成本：關閉 (共用的空 context) / 開啟 (計時 + 直方圖 + 記錄)，與不包 section 比較；
+# 2. 整頁重跑：同一個 session 關閉 / 開啟量測時各頁的重跑時間 (開啟時含 session state 大小估算)。
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("CDM_DB_PATH", ":memory:")  # 量測時不寫入使用者的工作區資料庫
+
+from cdm_core import Profiler, SharedWorkspace
+from suite import PAGES, build_store, synthetic_inventory
+
+
+def per_call(fn, calls):
+    start = time.perf_counter()
+    fn(calls)
+    return (time.perf_counter() - start) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--assets", type=int, default=20000)
+    parser.add_argument("--calls", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--app", default="app.py", choices=list(PAGES))
+    args = parser.parse_args()
+
+    profiler = Profiler()
+
+    def bare(calls):
+        for _ in range(calls):
+            pass
+
+    def wrapped(calls):
+        for _ in range(calls):
+            with profiler.section("matrix"):
+                pass
+
+    base = per_call(bare, args.calls)
+    disabled = per_call(wrapped, args.calls)
+    profiler.enabled = True
+    enabled = per_call(wrapped, args.calls)
+    print(f"每個區段的額外成本 ({args.calls} 次)")
+    print(f"  關閉  {(disabled - base) * 1e9:8.0f} ns")
+    print(f"  開啟  {(enabled - base) * 1e9:8.0f} ns")
+
+    from streamlit.testing.v1 import AppTest
+
+    store = build_store(*synthetic_inventory(args.assets))
+    at = AppTest.from_file(os.path.join(ROOT, args.app), default_timeout=300).run()
+    at.session_state.shared = SharedWorkspace(store)
+    print(f"{args.app}: {args.assets} 項資產，整頁重跑中位數 ({args.repeat} 次)")
+    for page in PAGES[args.app]:
+        at.session_state.current_page = page
+        times = {}
+        for enabled in (False, True):
+            at.toggle(key="profiling").set_value(enabled).run()
+            samples = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                at.run()
+                samples.append(time.perf_counter() - start)
+            if at.exception:
+                raise RuntimeError(at.exception[0].value)
+            times[enabled] = statistics.median(samples)
+        print(f"  {page:10s}  關閉 {times[False] * 1000:7.1f} ms   開啟 {times[True] * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# --- 量測：在大量資產的 session 中改一個分數，重跑需要多久 ---
+# 用法：python benchmarks/bench_rerun.py --app app.py --assets 5000
+#
+# 「整頁重跑」= 舊行為，任何互動都從 app 最上方重新執行；
+# 「fragment 重跑」= 只重跑被點擊的那一列評分 (st.fragment)。
+import argparse
+import os
+import statistics
+import sys
+import time
+from unittest import mock
+
+from streamlit.runtime.scriptrunner_utils.script_requests import RerunData
+from streamlit.testing.v1 import AppTest
+from streamlit.testing.v1 import local_script_runner
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("CDM_DB_PATH", ":memory:")  # 量測時不寫入使用者的工作區資料庫
+
+from cdm_core import SharedWorkspace
+from suite import build_store, synthetic_inventory
+
+
+def run_fragment(at, fragment_id):
+    # AppTest 只會整頁重跑；這裡讓 runner 建立的 RerunData 都帶上 fragment_id_queue，
+    # 模擬瀏覽器端點擊 fragment 內元件時送出的重跑請求
+    def fragment_rerun_data(**kwargs):
+        return RerunData(fragment_id_queue=[fragment_id], **kwargs)
+
+    with mock.patch.object(local_script_runner, "RerunData", fragment_rerun_data):
+        at.run()
+
+
+def fragment_ids(at, name):
+    # 依函式名稱找出已註冊的 fragment (包裝函式的 closure 內有原本的函式)，依註冊順序
+    return [
+        fragment_id for fragment_id, wrapped in at._fragment_storage._fragments.items()
+        if any(getattr(cell.cell_contents, "__name__", None) == name for cell in wrapped.__closure__ or ())
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--app", default="app.py")
+    parser.add_argument("--assets", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    at = AppTest.from_file(os.path.join(ROOT, args.app), default_timeout=300).run()
+    at.session_state.shared = SharedWorkspace(build_store(*synthetic_inventory(args.assets)))
+    at.session_state.current_page = "2. 防禦診斷"
+    at.run()
+    [r for r in at.radio if r.label == "評估模式"][0].set_value("🔘 逐項評分").run()
+
+    # 第一個 assessment_row 就是「識別」分頁的第一列 (側邊欄的多人同步也是 fragment，不能直接取第一個)
+    fragment_id = fragment_ids(at, "assessment_row")[0]
+    radio_key = [r.key for r in at.radio if r.key and r.key.startswith("radio_")][0]
+
+    def median_rerun(rerun):
+        samples = []
+        for i in range(args.repeat):
+            at.radio(key=radio_key).set_value(1 + i % 4)
+            start = time.perf_counter()
+            rerun()
+            samples.append(time.perf_counter() - start)
+            if at.exception:
+                raise RuntimeError(at.exception[0].value)
+        return statistics.median(samples)
+
+    full = median_rerun(at.run)
+    fragment = median_rerun(lambda: run_fragment(at, fragment_id))
+
+    print(f"{args.app}: {args.assets} 項資產，改一個分數的重跑時間 (中位數，{args.repeat} 次)")
+    print(f"  整頁重跑      {full * 1000:8.1f} ms")
+    print(f"  fragment 重跑 {fragment * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# --- 量測：集團彙總 (多單位矩陣加總) ---
+# 用法：python benchmarks/bench_rollup.py --units 500 --assets 200
+#
+# 「重掃」= 每個群組 / 全企業把單位的資產合併後重新 compute_matrix；
+# 「Rollup」= 直接加總各單位每格的 (總和, 筆數, 皇冠低分筆數) 再判定。
+# 另量測從工作區資料庫取得各單位統計量：第一次 (SQL 分組統計) 與資料未異動時 (快取)。
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cdm_core import Rollup, WorkspaceDB, compute_matrix
+from suite import populate, synthetic_inventory, timed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--units", type=int, default=500)
+    parser.add_argument("--assets", type=int, default=200, help="每個單位的資產數")
+    parser.add_argument("--groups", type=int, default=10)
+    args = parser.parse_args()
+
+    db = WorkspaceDB(":memory:")
+    stores, frames, scores = {}, {}, {}
+    for u in range(args.units):
+        name = f"群組{u % args.groups:02d}/單位{u:04d}"
+        assets, unit_scores = synthetic_inventory(args.assets, crown_ratio=0.05, score_weights=(1, 0, 1, 2, 2), seed=u)
+        frames[name] = assets.assign(資產名稱=f"{name}-" + assets["資產名稱"])  # 資產名稱在各單位之間不重複
+        stores[name] = populate(db.load(name), frames[name], unit_scores)
+        scores[name] = dict(stores[name].items())
+
+    def rescan():
+        out = {}
+        for g in range(args.groups):
+            members = [n for n in frames if n.startswith(f"群組{g:02d}/")]
+            assets = pd.concat([frames[n] for n in members], ignore_index=True)
+            out[g] = compute_matrix(assets, {k: v for n in members for k, v in scores[n].items()})
+        assets = pd.concat(frames.values(), ignore_index=True)
+        out["all"] = compute_matrix(assets, {k: v for s in scores.values() for k, v in s.items()})
+        return out
+
+    def rollup(r):
+        out = {g: r.group_matrix(f"群組{g:02d}") for g in range(args.groups)}
+        out["all"] = r.enterprise_matrix()
+        return out
+
+    print(f"{args.units} 個單位 x {args.assets} 項資產，{args.groups} 個群組 + 全企業")
+    _, t = timed(rescan)
+    print(f"  重掃合併資產             {t * 1000:9.1f} ms")
+    r, t_build = timed(lambda: Rollup.from_stores(stores))
+    _, t = timed(rollup, r)
+    print(f"  Rollup (session 快取)    {(t_build + t) * 1000:9.1f} ms  (建立 {t_build * 1000:.1f} + 判定 {t * 1000:.1f})")
+
+    _, t = timed(lambda: Rollup.from_workspaces(db))
+    print(f"  資料庫統計 (第一次)      {t * 1000:9.1f} ms")
+    _, t = timed(lambda: Rollup.from_workspaces(db))
+    print(f"  資料庫統計 (未異動)      {t * 1000:9.1f} ms")
+    next(iter(stores.values()))[(frames[next(iter(frames))]["資產名稱"][0], "識別")] = 1
+    _, t = timed(lambda: Rollup.from_workspaces(db))
+    print(f"  資料庫統計 (改 1 個單位) {t * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# --- 負載測試：多位分析師同時編輯一個共用工作區 ---
+# 用法：python benchmarks/bench_shared.py --assets 30000 --sessions 40 --seconds 10
+#
+# 每個模擬 session 是一個執行緒，依類別分工 (session k 負責 CATEGORIES[k % 5])，反覆：
+# 讀取版本 -> 思考 (--think 秒) -> 以該版本送出一批評分 (樂觀鎖)；另有一組 session 只看戰情室，
+# 以 wait() 等待異動並取 changes_since。量測送出延遲、衝突數、通知延遲 (正確性見 tests/test_shared.py)。
+# 另外量測「每個 session 各自載入一份」與共用一份的載入成本。
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cdm_core import CATEGORIES, FUNCTIONS, WorkspaceDB
+from suite import populate, synthetic_inventory
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else float("nan")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--assets", type=int, default=30000)
+    parser.add_argument("--sessions", type=int, default=40, help="編輯評分的 session 數")
+    parser.add_argument("--viewers", type=int, default=10, help="只看戰情室的 session 數")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--batch", type=int, default=20, help="每次送出的評分筆數")
+    parser.add_argument("--think", type=float, default=0.02, help="讀取到送出之間的間隔 (秒)")
+    parser.add_argument("--overlap", type=float, default=0.05, help="改到其他類別 (別人負責的) 資產的比例")
+    args = parser.parse_args()
+
+    assets, scores = synthetic_inventory(args.assets, crown_ratio=0.05, score_weights=(0, 1, 1, 1, 1))
+    names = assets["資產名稱"].tolist()
+    by_category = {c: assets.loc[assets["類別"] == c, "資產名稱"].tolist() for c in CATEGORIES}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "shared.sqlite")
+        db = WorkspaceDB(path)
+        populate(db.load("共用"), assets, scores)
+        db.close()
+
+        # 載入成本：每個 session 各自一份 vs. process 內共用一份
+        db = WorkspaceDB(path)
+        start = time.perf_counter()
+        copies = [db.load("共用") for _ in range(min(args.sessions, 5))]
+        per_copy = (time.perf_counter() - start) / len(copies)
+        del copies
+        start = time.perf_counter()
+        shared = db.shared("共用")
+        assert all(db.shared("共用") is shared for _ in range(args.sessions))
+        t_shared = time.perf_counter() - start
+        print(f"{args.assets} 項資產，{args.sessions} 個編輯 session + {args.viewers} 個檢視 session，{args.seconds:.0f} 秒")
+        print(f"  各自載入：每個 session {per_copy * 1000:.0f} ms (共 {per_copy * args.sessions * 1000:.0f} ms)；"
+              f"共用：{t_shared * 1000:.0f} ms 一次")
+
+        stop = threading.Event()
+        latencies, conflicts, written = [], [0], [0]
+        notify = []
+        stats_lock = threading.Lock()
+
+        def editor(k):
+            local = random.Random(k)
+            own = by_category[CATEGORIES[k % len(CATEGORIES)]]
+            author = f"editor-{k}"
+            while not stop.is_set():
+                base = shared.version
+                time.sleep(local.random() * 2 * args.think)
+                batch = {}
+                for _ in range(args.batch):
+                    pool = names if local.random() < args.overlap else own
+                    batch[(local.choice(pool), local.choice(FUNCTIONS))] = local.randint(1, 4)
+                start = time.perf_counter()
+                rejected = shared.update(batch, base, author)
+                elapsed = time.perf_counter() - start
+                with stats_lock:
+                    latencies.append(elapsed)
+                    conflicts[0] += len(rejected)
+                    written[0] += len(batch) - len(rejected)
+
+        def viewer(k):
+            seen = shared.version
+            author = f"viewer-{k}"
+            while not stop.is_set():
+                version = shared.wait(seen, timeout=0.5)
+                if version == seen:
+                    continue
+                start = time.perf_counter()
+                seen, cells, _ = shared.changes_since(seen, author)
+                shared.matrix()
+                with stats_lock:
+                    notify.append((time.perf_counter() - start, len(cells)))
+
+        threads = [threading.Thread(target=editor, args=(k,)) for k in range(args.sessions)]
+        threads += [threading.Thread(target=viewer, args=(k,)) for k in range(args.viewers)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+
+        print(f"  送出 {len(latencies)} 批 ({len(latencies) / elapsed:.0f} 批/秒)，寫入 {written[0]} 筆評分，"
+              f"衝突 {conflicts[0]} 筆 ({conflicts[0] / max(1, conflicts[0] + written[0]):.2%})")
+        print(f"  送出延遲 (含 SQLite 寫入)  p50 {percentile(latencies, 0.5) * 1000:6.2f} ms   "
+              f"p95 {percentile(latencies, 0.95) * 1000:6.2f} ms   p99 {percentile(latencies, 0.99) * 1000:6.2f} ms")
+        if notify:
+            print(f"  檢視 session 取異動 + 矩陣  p50 {percentile([t for t, _ in notify], 0.5) * 1000:6.2f} ms   "
+                  f"平均每次 {statistics.mean(c for _, c in notify):.1f} 格")
+
+
+if __name__ == "__main__":
+    main()
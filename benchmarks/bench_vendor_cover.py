@@ -0,0 +1,57 @@
+# --- 量測：跨缺口的最少廠商組合 (貪婪加權集合覆蓋) ---
+# 用法：python benchmarks/bench_vendor_cover.py --vendors 5000 --per-cell 400
+#
+# 「逐輪掃描」= 每輪把每家廠商的格子清單與未涵蓋缺口逐一比對 (Python 迴圈)；
+# 「VendorCatalog.cover」= 建立一次 廠商 x 25 格 的反向索引，每輪一次矩陣乘法。
+import argparse
+import os
+import random
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cdm_core import CATEGORIES, FUNCTIONS, SEVERITY_WEIGHTS, VendorCatalog
+from suite import timed
+
+
+def naive_cover(solutions, gaps):
+    remaining = {(cat, func): SEVERITY_WEIGHTS[status] for cat, func, status in gaps}
+    vendors = list(dict.fromkeys(v for vendors in solutions.values() for v in vendors))
+    picks = []
+    while True:
+        best, best_gain = None, 0
+        for vendor in vendors:
+            gain = sum(w for cell, w in remaining.items() if vendor in solutions.get(cell, ()))
+            if gain > best_gain:
+                best, best_gain = vendor, gain
+        if best is None:
+            return picks
+        picks.append(best)
+        remaining = {cell: w for cell, w in remaining.items() if best not in solutions.get(cell, ())}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vendors", type=int, default=5000)
+    parser.add_argument("--per-cell", type=int, default=400, help="每格平均的廠商數")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    names = [f"廠商{i:05d}" for i in range(args.vendors)]
+    solutions = {(cat, func): rng.sample(names, args.per_cell) for cat in CATEGORIES for func in FUNCTIONS}
+    gaps = [(cat, func, rng.choice(list(SEVERITY_WEIGHTS))) for cat in CATEGORIES for func in FUNCTIONS]
+
+    print(f"{args.vendors} 家廠商，每格 {args.per_cell} 家，{len(gaps)} 個缺口")
+    expected, t = timed(lambda: naive_cover(solutions, gaps))
+    print(f"  逐輪掃描               {t * 1000:9.1f} ms  ({len(expected)} 家)")
+    catalog, t = timed(lambda: VendorCatalog(solutions))
+    print(f"  建立反向索引 (一次)    {t * 1000:9.1f} ms")
+    (picks, _), t = timed(lambda: [catalog.cover(gaps) for _ in range(args.repeat)][-1])
+    print(f"  VendorCatalog.cover    {t / args.repeat * 1000:9.2f} ms  ({len(picks)} 家)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# --- 量測：What-if 方案評估 ---
+# 用法：python benchmarks/bench_whatif.py --assets 20000 --scenarios 10000 --baseline 50
+#
+# 「逐一重算」= 每個方案複製一份評分、套用提升後 compute_matrix，只跑 --baseline 個方案；
+# 「WhatIf」= 格子方案遮罩 (S x G) @ 每格加總的調整量 (G x 75) 加到目前的每格統計量，再一次 classify_cells。
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cdm_core import WhatIf, compute_matrix
+from suite import build_store, synthetic_inventory, timed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--assets", type=int, default=20000)
+    parser.add_argument("--scenarios", type=int, default=10000)
+    parser.add_argument("--baseline", type=int, default=50, help="逐一重算只跑前 N 個方案")
+    args = parser.parse_args()
+
+    store = build_store(*synthetic_inventory(args.assets, crown_ratio=0.05, score_weights=(1, 1, 1, 2, 2)))
+
+    sim = WhatIf(store)
+    actions = sim.upgrades(target=3, crown_only=True)
+    plans = sim.cell_plans(actions, limit=args.scenarios)
+    print(f"{args.assets} 項資產，{len(actions)} 個可提升的評分，{len(plans)} 個方案")
+
+    base = dict(store.items())
+    keys = list(zip(actions["資產名稱"], actions["功能"]))
+
+    def rescan(k):
+        out = []
+        for mask in plans[:k]:
+            plan = sim.expand(actions, mask)
+            scores = dict(base)
+            scores.update((key, 3) for key, take in zip(keys, plan) if take)
+            out.append(compute_matrix(store.assets, scores))
+        return out
+
+    k = min(args.baseline, len(plans))
+    _, t = timed(rescan, k)
+    print(f"  逐一重算      {k:6d} 個方案 {t:8.2f} s  ({t / k * 1000:7.2f} ms/方案)")
+    _, t = timed(sim.evaluate_cells, actions, plans)
+    print(f"  WhatIf        {len(plans):6d} 個方案 {t:8.2f} s  ({t / len(plans) * 1000:7.3f} ms/方案)")
+    ranking, t = timed(lambda: sim.rank(actions, plans, budget=actions["成本"].sum() / 2))
+    print(f"  rank (含預算) {len(plans):6d} 個方案 {t:8.2f} s  最佳方案消除 {ranking['消除皇冠風險'].iloc[0]} 格皇冠風險")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# --- 量測：工作區持久化 (SQLite WAL) ---
+# 用法：python benchmarks/bench_workspace.py --assets 50000
+#
+# 建立一個全部評分完成的工作區，量測：整批寫入、單筆評分 / 新增的增量寫入延遲、
+# 以及重新開啟資料庫後的冷載入時間 (目標 50k 資產 < 1 秒)。
+import argparse
+import os
+import random
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cdm_core import CATEGORIES, FUNCTIONS, WorkspaceDB
+from suite import build_store, synthetic_inventory, timed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--assets", type=int, default=50000)
+    parser.add_argument("--edits", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    store = build_store(*synthetic_inventory(args.assets, score_weights=(0, 1, 1, 1, 1)))
+    names = store.assets["資產名稱"].tolist()
+
+    def edit_scores():
+        for _ in range(args.edits):
+            store[(rng.choice(names), rng.choice(FUNCTIONS))] = rng.randint(0, 4)
+
+    def add_assets():
+        for i in range(args.edits):
+            store.add_asset(f"new-{i}", rng.choice(CATEGORIES), False)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "workspaces.sqlite")
+        db = WorkspaceDB(path)
+        _, t = timed(db.save, "bench", store)
+        print(f"{args.assets} 項資產 x {len(FUNCTIONS)} 個功能")
+        print(f"  整批寫入            {t:8.3f} s")
+
+        _, t = timed(edit_scores)
+        print(f"  單筆評分 (增量寫入) {t / args.edits * 1e3:8.3f} ms/次")
+        _, t = timed(add_assets)
+        print(f"  單筆新增 (增量寫入) {t / args.edits * 1e3:8.3f} ms/次")
+
+        batch = {(name, f): rng.randint(0, 4) for name in rng.sample(names, 200) for f in FUNCTIONS}
+        _, t = timed(store.update, batch)
+        print(f"  批次表格送出 {len(batch)} 格 {t * 1e3:8.3f} ms")
+        db.close()
+
+        _, t = timed(lambda: WorkspaceDB(path).load("bench", create=False))
+        print(f"  冷載入              {t:8.3f} s  ({os.path.getsize(path) / 2**20:.1f} MiB)")
+
+
+if __name__ == "__main__":
+    main()
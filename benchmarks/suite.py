@@ -0,0 +1,332 @@
+# --- 效能基準套件：合成資產清單 x 各個熱點路徑，結果存成 JSON 供版本間比對 ---
+# 用法：
+#   python benchmarks/suite.py run --sizes 1000 10000 50000 200000 --out results/new.json
+#   python benchmarks/suite.py run --quick                       (1k / 10k，每項 1 次)
+#   python benchmarks/suite.py compare results/old.json results/new.json --tolerance 0.25
+#
+# run 對每個資產數量量測：
+#   reference_cells  逐格參考實作 calculate_cell_status (25 格；資產數 <= --reference-max)
+#   compute_matrix   向量化引擎 (DataFrame + 評分 dict)
+#   dashboard_build  戰情室從頭建立：載入 store (矩陣快取) + 判定 + 處方籤 + HTML 表格 + 最少廠商組合
+#   policy_compare   所有內建評分政策由矩陣快取的分數分佈各判定一次 (並列比較)
+#   classify         規則式分類引擎
+#   file_import      CSV 串流匯入 (欄位未對應類別，全部交給分類引擎)
+#   add_assets       整批新增到空的 store
+#   dedupe           匯入時的近似重複偵測 (10% 為改寫過的重複名稱)
+#   page:<app>:<頁>  以 Streamlit AppTest 無頭重跑每一頁 (資產數 <= --app-max)
+# compare 以中位數比對：變慢超過 tolerance 且差距大於 --min-delta 秒視為退步，有退步時結束碼為 1。
+#
+# 各個 bench_*.py 共用這裡的合成資料 (synthetic_inventory / build_store / populate) 與計時 (timed / measure)；
+# 量測只計時，結果正確性由 tests/ 的 pytest 驗證。
+import argparse
+import csv
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("CDM_DB_PATH", ":memory:")  # 量測時不寫入使用者的工作區資料庫
+
+from cdm_core import (
+    CATEGORIES,
+    FUNCTIONS,
+    POLICIES,
+    AssessmentStore,
+    InventoryImport,
+    MatrixRenderer,
+    RuleClassifier,
+    ScoringPolicy,
+    SharedWorkspace,
+    VendorCatalog,
+    calculate_cell_status,
+    compute_matrix,
+    iter_file_chunks,
+    near_duplicates,
+    risk_cells,
+)
+
+PAGES = {
+    "app.py": ["1. 資產盤點", "2. 防禦診斷", "3. 風險戰情室"],
+    "app_ai.py": ["1. AI 智慧盤點", "2. 防禦診斷", "3. 風險戰情室"],
+}
+# 名稱用字：一半會命中分類規則的關鍵字，其餘落到預設類別
+WORDS = ["sql", "db", "erp", "office", "cisco", "switch", "vpn", "admin", "nas", "核心", "生產",
+         "伺服器", "筆電", "印表機", "監視器", "工作站", "閘道", "備份", "測試", "主機"]
+SITES = ["台北", "新竹", "台中", "高雄", "東京", "機房A", "機房B"]
+
+
+# --- 合成資產清單 ---
+def synthetic_inventory(n, crown_ratio=0.1, score_weights=(0.2, 0.1, 0.2, 0.3, 0.2), seed=0):
+    # 回傳 (assets DataFrame, 分數 N x 5 int 陣列)；score_weights 為分數 0~4 的比例
+    rng = np.random.default_rng(seed)
+    words = rng.integers(0, len(WORDS), size=(n, 2))
+    sites = rng.integers(0, len(SITES), size=n)
+    names = [f"{WORDS[a]}-{WORDS[b]} {SITES[s]} {i:06d}" for i, ((a, b), s) in enumerate(zip(words.tolist(), sites.tolist()))]
+    weights = np.asarray(score_weights, dtype=float)
+    assets = pd.DataFrame({
+        "資產名稱": names,
+        "類別": np.asarray(CATEGORIES, dtype=object)[rng.integers(0, len(CATEGORIES), size=n)],
+        "皇冠寶石": rng.random(n) < crown_ratio,
+    })
+    scores = rng.choice(len(weights), size=(n, len(FUNCTIONS)), p=weights / weights.sum())
+    return assets, scores
+
+
+def build_store(assets, scores):
+    codes = pd.Categorical(assets["類別"], categories=CATEGORIES).codes
+    return AssessmentStore.from_arrays(assets["資產名稱"].tolist(), codes, assets["皇冠寶石"], scores)
+
+
+def populate(store, assets, scores):
+    # 把合成資料逐批寫入既有的 store (例如 WorkspaceDB.load 的工作區，異動同時寫入資料庫)
+    store.add_assets(assets)
+    store.update({
+        (name, function): score
+        for name, row in zip(assets["資產名稱"].tolist(), scores.tolist())
+        for function, score in zip(FUNCTIONS, row)
+    })
+    return store
+
+
+def with_duplicates(names, rate=0.1, seed=0):
+    # 匯入名單：每 1/rate 個名稱把一個既有名稱改寫 (大小寫、字序、標點) 後加入
+    rng = np.random.default_rng(seed)
+    out = list(names)
+    for i in rng.choice(len(names), size=int(len(names) * rate), replace=False).tolist():
+        words = names[i].split()
+        rng.shuffle(words)
+        out.append(" - ".join(words).upper())
+    return out
+
+
+# --- 計時 ---
+def timed(fn, *args):
+    # 執行一次，回傳 (結果, 秒數)
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def measure(fn, repeat, setup=None):
+    # setup 的時間不計入；回傳每次的秒數
+    samples = []
+    for _ in range(repeat):
+        arg = setup() if setup is not None else None
+        start = time.perf_counter()
+        fn(arg) if setup is not None else fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def record(results, case, n, samples, **extra):
+    entry = {"case": case, "assets": n, "median": statistics.median(samples), "min": min(samples), "samples": samples}
+    entry.update(extra)
+    results.append(entry)
+    shown = " ".join(f"{k}={v * 1000:.1f}ms" if isinstance(v, float) else f"{k}={v}" for k, v in extra.items())
+    print(f"  {case:34s} {n:7d}  {entry['median'] * 1000:10.1f} ms  {shown}", flush=True)
+
+
+def run_core(results, n, assets, scores, args):
+    store = build_store(assets, scores)
+    assessments = dict(store.items())
+
+    if n <= args.reference_max:
+        record(results, "reference_cells", n, measure(
+            lambda: [calculate_cell_status(assets, assessments, c, f) for c in CATEGORIES for f in FUNCTIONS],
+            args.repeat))
+    record(results, "compute_matrix", n, measure(lambda: compute_matrix(assets, assessments), args.repeat))
+
+    catalog = VendorCatalog()
+
+    def dashboard():
+        fresh = build_store(assets, scores)
+        matrix = fresh.matrix()
+        gaps = risk_cells(matrix)
+        MatrixRenderer().render(matrix)
+        catalog.cover(gaps)
+
+    record(results, "dashboard_build", n, measure(dashboard, args.repeat))
+
+    policies = [ScoringPolicy(spec) for spec in POLICIES]
+    cache = store.matrix_cache
+    record(results, "policy_compare", n, measure(
+        lambda: [policy.matrix(cache.asset_counts, cache.histogram) for policy in policies], args.repeat))
+
+    names = assets["資產名稱"].tolist()
+    classifier = RuleClassifier()
+    record(results, "classify", n, measure(lambda: classifier.classify(names), args.repeat))
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["名稱", "備註"])
+    writer.writerows((name, "") for name in names)
+    data = buffer.getvalue().encode("utf-8")
+
+    def file_import(job):
+        for _, chunk in iter_file_chunks(io.BytesIO(data), "inventory.csv"):
+            job.feed(chunk)
+        job.store.add_assets(job.result())
+
+    record(results, "file_import", n, measure(
+        file_import, args.repeat, setup=lambda: InventoryImport(AssessmentStore(), classifier, "名稱")))
+    record(results, "add_assets", n, measure(lambda empty: empty.add_assets(assets), args.repeat, setup=AssessmentStore))
+
+    incoming = with_duplicates(names[n // 2:])
+    existing = names[:n // 2]
+    merges = []
+    samples = measure(lambda: merges.append(near_duplicates(incoming, existing=existing)), args.repeat)
+    record(results, "dedupe", n, samples, merges=len(merges[-1]))
+
+
+def run_pages(results, n, assets, scores, args):
+    from streamlit.testing.v1 import AppTest
+
+    store = build_store(assets, scores)
+    for app in args.apps:
+        for page in PAGES[app]:
+            case = f"page:{app}:{page}"
+            at = AppTest.from_file(os.path.join(ROOT, app), default_timeout=600)
+            at.run()
+            at.session_state.shared = SharedWorkspace(store)
+            at.session_state.current_page = page
+            start = time.perf_counter()
+            at.run()
+            first = time.perf_counter() - start
+            samples = measure(at.run, args.repeat)
+            if at.exception:
+                error = at.exception[0].value
+                results.append({"case": case, "assets": n, "error": error})
+                print(f"  {case:34s} {n:7d}  錯誤：{error}", flush=True)
+                continue
+            record(results, case, n, samples, first=first)
+
+
+def metadata(args):
+    def version(module):
+        try:
+            return __import__(module).__version__
+        except ImportError:
+            return None
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": version("numpy"),
+        "pandas": version("pandas"),
+        "streamlit": version("streamlit"),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "args": {k: v for k, v in vars(args).items() if k != "func"},
+    }
+
+
+def run(args):
+    if args.quick:
+        args.sizes, args.repeat = [1000, 10000], 1
+    results = []
+    print(f"{'項目':34s} {'資產數':>7s}  {'中位數':>10s}")
+    for n in args.sizes:
+        assets, scores = synthetic_inventory(n, args.crown_ratio, args.scores, args.seed)
+        run_core(results, n, assets, scores, args)
+        if args.apps and n <= args.app_max:
+            run_pages(results, n, assets, scores, args)
+
+    report = {"meta": metadata(args), "results": results}
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=1)
+        print(f"結果已寫入 {args.out}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            return compare_reports(json.load(f), report, args.tolerance, args.min_delta)
+    return 0
+
+
+# --- 比對兩次結果 ---
+def compare_reports(old, new, tolerance, min_delta):
+    def index(report):
+        return {(r["case"], r["assets"]): r for r in report["results"]}
+
+    before, after = index(old), index(new)
+    print(f"比對 {old['meta'].get('commit')} ({old['meta'].get('created_at')}) -> "
+          f"{new['meta'].get('commit')} ({new['meta'].get('created_at')})")
+    regressions = 0
+    for key in sorted(before.keys() | after.keys(), key=lambda k: (k[1], k[0])):
+        a, b = before.get(key), after.get(key)
+        case, n = key
+        if a is None or b is None or "median" not in a or "median" not in b:
+            status = "只有新版" if a is None else "只有舊版" if b is None else "錯誤"
+            print(f"  {case:34s} {n:7d}  {status}")
+            regressions += b is not None and "error" in b
+            continue
+        ratio = b["median"] / a["median"] if a["median"] else float("inf")
+        delta = b["median"] - a["median"]
+        mark = ""
+        if ratio > 1 + tolerance and delta > min_delta:
+            mark = "⚠️ 變慢"
+            regressions += 1
+        elif ratio < 1 / (1 + tolerance) and -delta > min_delta:
+            mark = "✅ 變快"
+        print(f"  {case:34s} {n:7d}  {a['median'] * 1000:10.1f} -> {b['median'] * 1000:10.1f} ms  x{ratio:5.2f}  {mark}")
+    print(f"{regressions} 項退步 (門檻：慢 {tolerance:.0%} 以上且多 {min_delta * 1000:.0f} ms 以上)")
+    return 1 if regressions else 0
+
+
+def compare(args):
+    with open(args.old, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+    return compare_reports(old, new, args.tolerance, args.min_delta)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("run", help="執行量測")
+    p.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000, 200000])
+    p.add_argument("--crown-ratio", type=float, default=0.1)
+    p.add_argument("--scores", type=float, nargs=5, default=[0.2, 0.1, 0.2, 0.3, 0.2], metavar="W",
+                   help="分數 0~4 的比例 (0 = 未評 / N/A)")
+    p.add_argument("--repeat", type=int, default=3)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--reference-max", type=int, default=50000, help="逐格參考實作只跑到這個資產數")
+    p.add_argument("--apps", nargs="*", default=list(PAGES), choices=list(PAGES), help="不給值則不跑頁面重跑")
+    p.add_argument("--app-max", type=int, default=50000, help="頁面重跑只跑到這個資產數")
+    p.add_argument("--quick", action="store_true")
+    p.add_argument("--out", help="結果 JSON 路徑")
+    p.add_argument("--compare", help="跑完後與這份結果比對")
+    p.add_argument("--tolerance", type=float, default=0.25)
+    p.add_argument("--min-delta", type=float, default=0.005)
+    p.set_defaults(func=run)
+
+    p = commands.add_parser("compare", help="比對兩份結果 JSON")
+    p.add_argument("old")
+    p.add_argument("new")
+    p.add_argument("--tolerance", type=float, default=0.25)
+    p.add_argument("--min-delta", type=float, default=0.005)
+    p.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+
+if __name__ == "__main__":
+    main()
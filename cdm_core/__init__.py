@@ -0,0 +1,28 @@
+from .matrix import (
+    CATEGORIES,
+    FUNCTIONS,
+    RISK_STATUSES,
+    MatrixCache,
+    aggregate_cells,
+    calculate_cell_status,
+    classify_cells,
+    compute_matrix,
+    risk_cells,
+    score_arrays,
+    score_histogram,
+)
+from .policy import DEFAULT_POLICY, POLICIES, ScoringPolicy
+from .classifier import DEFAULT_RULE, DEFAULT_RULES, RuleClassifier
+from .grid import assessment_grid, cell_details, grid_changes
+from .store import AssessmentStore
+from .shared import SharedWorkspace
+from .llm import ClassificationCache, LLMClassifier, normalize_line
+from .importer import InventoryImport, iter_file_chunks, read_header
+from .workspace import DEFAULT_WORKSPACE, Workspace, WorkspaceDB
+from .catalog import SECPAAS_URL, SEVERITY_WEIGHTS, SOLUTIONS, TIER_LABELS, TIER_LABELS_SHORT, VendorCatalog
+from .render import THEMES, MatrixRenderer
+from .rollup import Rollup, group_of
+from .whatif import WhatIf
+from .export import EXPORT_FORMATS, ExportJob, Report
+from .dedupe import merge_duplicates, name_tokens, near_duplicates
+from .profiling import Profiler, estimate_size
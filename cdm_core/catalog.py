@@ -0,0 +1,117 @@
+import numpy as np
+
+from .matrix import CATEGORIES, FUNCTIONS
+
+SECPAAS_URL = "https://secpaas.org.tw/W_SecDocProduct"
+
+# --- 成熟度等級標籤 (0 = 不適用)：完整版與精簡版 ---
+TIER_LABELS = {
+    0: "⚪ N/A (不適用)",
+    1: "🔴 Tier 1 (被動/不足)",
+    2: "🟡 Tier 2 (部分覆蓋)",
+    3: "🟢 Tier 3 (標準化)",
+    4: "🏆 Tier 4 (自動化)"
+}
+TIER_LABELS_SHORT = {
+    0: "⚪ N/A",
+    1: "🔴 Tier 1 (不足)",
+    2: "🟡 Tier 2 (部分)",
+    3: "🟢 Tier 3 (標準)",
+    4: "🏆 Tier 4 (自動)"
+}
+
+# --- 核心資料庫：台灣資安廠商清單 (作為預覽與 AI 推薦基礎) ---
+SOLUTIONS = {
+    ("裝置", "識別"): ["一休資訊", "台達電子", "思邦科技", "瑞恩資訊", "中芯數據", "中華龍網"],
+    ("裝置", "保護"): ["三甲科技", "安碁資訊", "勤業眾信", "趨勢科技", "奧義智慧"],
+    ("裝置", "偵測"): ["元盾資安", "伊雲谷", "動力安全", "誠雲科技"],
+    ("裝置", "應變"): ["中芯數據", "元盾資安", "安碁資訊"],
+    ("裝置", "復原"): ["扇原科技", "肇真數位"],
+
+    ("應用程式", "識別"): ["又碩電腦", "元盾資安", "系微", "保華資安"],
+    ("應用程式", "保護"): ["三甲科技", "台眾電腦", "安侯企管", "瑞恩資訊"],
+    ("應用程式", "偵測"): ["安碁資訊", "鼎原科技"],
+    ("應用程式", "應變"): ["中芯數據", "宏基資訊", "動力安全"],
+    ("應用程式", "復原"): ["安碁資訊"],
+
+    ("網路", "識別"): ["三甲科技", "安碁資訊", "承映資訊"],
+    ("網路", "保護"): ["一休資訊", "台眾電腦", "池安量子", "威碩系統"],
+    ("網路", "偵測"): ["中飛科技", "思邦科技", "雲智維"],
+    ("網路", "應變"): ["三甲科技", "元盾資安", "如梭世代"],
+    ("網路", "復原"): ["如梭世代", "動力安全"],
+
+    ("資料", "識別"): ["台眾電腦", "安碁資訊", "中華電信"],
+    ("資料", "保護"): ["三甲科技", "台灣信威", "帝璽智慧"],
+    ("資料", "偵測"): ["安碁資訊"],
+    ("資料", "應變"): ["三甲科技", "元盾資安"],
+    ("資料", "復原"): ["三甲科技", "云碩科技", "華碩雲端"],
+
+    ("使用者", "識別"): ["一休資訊", "帝濶智慧", "全球系統"],
+    ("使用者", "保護"): ["又碩電腦", "全域科技", "希臘智慧"],
+    ("使用者", "偵測"): ["伊雲谷"],
+    ("使用者", "應變"): ["三甲科技", "肇真數位"],
+    ("使用者", "復原"): ["思邦科技"],
+}
+
+
+# --- 缺口嚴重度權重：組合推薦時優先涵蓋皇冠風險，其次 Tier 1、Tier 2 ---
+SEVERITY_WEIGHTS = {"crown_risk": 3, "tier-1": 2, "tier-2": 1}
+
+
+# --- 廠商目錄：(類別, 功能) -> 廠商清單，另建 廠商 -> 格子 的反向索引 ---
+class VendorCatalog:
+    def __init__(self, solutions=SOLUTIONS):
+        self._solutions = {key: tuple(vendors) for key, vendors in solutions.items()}
+
+        # 反向索引：廠商 x 25 格的布林矩陣 (廠商依首次出現的順序)，建立一次、每次推薦直接取欄；
+        # 最後多一欄全為 False，給不在矩陣內的格子 (索引 -1) 使用
+        self._cells = [(cat, func) for cat in CATEGORIES for func in FUNCTIONS]
+        self._cell_index = {cell: i for i, cell in enumerate(self._cells)}
+        self._vendors = list(dict.fromkeys(v for vendors in self._solutions.values() for v in vendors))
+        vendor_index = {v: i for i, v in enumerate(self._vendors)}
+        self._coverage = np.zeros((len(self._vendors), len(self._cells) + 1), dtype=bool)
+        for key, vendors in self._solutions.items():
+            c = self._cell_index.get(key)
+            if c is not None:
+                self._coverage[[vendor_index[v] for v in vendors], c] = True
+        self._vendor_index = vendor_index
+
+    def vendors(self, category, function):
+        return list(self._solutions.get((category, function), ()))
+
+    def vendor_cells(self, vendor):
+        # 該廠商可處理的格子 [(類別, 功能)]
+        i = self._vendor_index.get(vendor)
+        if i is None:
+            return []
+        return [self._cells[c] for c in np.flatnonzero(self._coverage[i])]
+
+    def preview(self, category, function, limit=4, empty="請點擊右側查詢"):
+        # 處方籤上的廠商範例：最多 limit 家，超過以 ... 表示
+        vendors = self._solutions.get((category, function), ())
+        if not vendors:
+            return empty
+        return "、".join(vendors[:limit]) + ("..." if len(vendors) > limit else "")
+
+    def cover(self, gaps, weights=SEVERITY_WEIGHTS):
+        # gaps：risk_cells() 的 [(類別, 功能, 狀態)]
+        # 貪婪加權集合覆蓋：每輪挑「尚未涵蓋的缺口權重和」最大的廠商 (同分取目錄中較前者)，直到全部涵蓋
+        # 回傳 ([(廠商, 這家新涵蓋的缺口, 權重和)], 目錄中沒有任何廠商可處理的缺口)
+        columns = [self._cell_index.get((cat, func), -1) for cat, func, _ in gaps]
+        weight = np.array([weights.get(status, 1) for _, _, status in gaps], dtype=np.int64)
+        coverage = self._coverage[:, columns]
+
+        # 只保留至少能處理一個缺口的廠商，之後每輪只做一次 (廠商數 x 缺口數) 的矩陣乘法
+        candidates = np.flatnonzero(coverage.any(axis=1))
+        coverage = coverage[candidates]
+        remaining = coverage.any(axis=0)
+        uncoverable = [gap for gap, ok in zip(gaps, remaining) if not ok]
+
+        picks = []
+        while remaining.any():
+            gain = coverage[:, remaining].astype(np.int64) @ weight[remaining]
+            v = int(gain.argmax())
+            newly = coverage[v] & remaining
+            picks.append((self._vendors[candidates[v]], [gap for gap, hit in zip(gaps, newly) if hit], int(gain[v])))
+            remaining &= ~newly
+        return picks, uncoverable
@@ -0,0 +1,106 @@
+import re
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+# --- 分類規則表 (依優先順序) ---
+# keywords：任一關鍵字出現在 (小寫後的) 資產描述中即歸入該類別，排越前面優先。
+# crown：True 表示此類別一律為皇冠寶石；若為關鍵字清單，出現任一關鍵字才是皇冠寶石。
+# 都沒命中時歸入 DEFAULT_RULE 的類別。
+DEFAULT_RULES = [
+    {"category": "資料", "keywords": ["sql", "db", "data", "個資", "database"], "crown": True},
+    {"category": "使用者", "keywords": ["ad", "admin", "user", "帳號", "vpn"], "crown": False},
+    {"category": "網路", "keywords": ["cisco", "switch", "wifi", "router", "net"], "crown": ["核心"]},
+    {"category": "應用程式", "keywords": ["office", "erp", "slack", "app", "aws"], "crown": ["生產"]},
+]
+DEFAULT_RULE = {"category": "裝置", "crown": ["總經理", "nas"]}
+
+
+# --- 分類器共用介面：子類別實作 classify(lines) -> [(類別, 是否皇冠寶石)] ---
+class Classifier:
+    def classify(self, lines):
+        raise NotImplementedError
+
+    def to_assets(self, lines):
+        lines = list(lines)
+        results = self.classify(lines)
+        return pd.DataFrame({
+            "資產名稱": lines,
+            "類別": [category for category, _ in results],
+            "皇冠寶石": [crown for _, crown in results],
+        })
+
+    def iter_classify(self, lines, chunk_size=10000):
+        # 串流分類：lines 可為 iterator，每處理完一批就回傳 (累計筆數, 該批資產 DataFrame)，方便分段更新進度
+        done = 0
+        chunk = []
+        for line in lines:
+            chunk.append(line)
+            if len(chunk) >= chunk_size:
+                done += len(chunk)
+                yield done, self.to_assets(chunk)
+                chunk = []
+        if chunk:
+            done += len(chunk)
+            yield done, self.to_assets(chunk)
+
+
+# --- 規則式分類引擎：所有類別與皇冠關鍵字編譯成一個 pattern，每行只掃一次 ---
+class RuleClassifier(Classifier):
+    def __init__(self, rules=DEFAULT_RULES, default=DEFAULT_RULE):
+        self.rules = list(rules) + [dict(default, keywords=[])]
+        self._default = len(self.rules) - 1
+
+        # 每個關鍵字對應的角色：(規則序號, 是否為皇冠關鍵字)
+        roles = {}
+        for r, rule in enumerate(self.rules):
+            for kw in rule["keywords"]:
+                roles.setdefault(kw.lower(), set()).add((r, False))
+            if isinstance(rule["crown"], (list, tuple)):
+                for kw in rule["crown"]:
+                    roles.setdefault(kw.lower(), set()).add((r, True))
+
+        # 同一位置可能同時命中多個關鍵字 (彼此必為前綴關係，例如 ad / admin)。
+        # pattern 由長到短排列，命中最長者時，其所有前綴關鍵字也一併視為命中：
+        # _rule_of[k] = 命中後最優先的規則序號，_crown_bits[k] = 命中哪些規則的皇冠關鍵字 (bitmask)
+        keywords = sorted(roles, key=len, reverse=True)
+        self._keyword_index = {kw: k for k, kw in enumerate(keywords)}
+        self._rule_of = np.array([
+            min((r for p in keywords if kw.startswith(p) for r, crown in roles[p] if not crown), default=self._default)
+            for kw in keywords
+        ], dtype=np.int64)
+        self._crown_bits = np.array([
+            sum({1 << r for p in keywords if kw.startswith(p) for r, crown in roles[p] if crown})
+            for kw in keywords
+        ], dtype=np.int64)
+        self._categories = np.array([rule["category"] for rule in self.rules], dtype=object)
+        self._always_crown = np.array([rule["crown"] is True for rule in self.rules])
+        self._pattern = re.compile("(?=(" + "|".join(map(re.escape, keywords)) + "))") if keywords else None
+
+    def _classify_arrays(self, lines):
+        n = len(lines)
+        best = np.full(n, self._default, dtype=np.int64)
+        bits = np.zeros(n, dtype=np.int64)
+        if self._pattern is not None and n:
+            # 每行只掃一次，取得所有 (可重疊的) 命中關鍵字，再以陣列運算合併成各行的類別與皇冠旗標
+            findall = self._pattern.findall
+            found = [findall(line.lower()) for line in lines]
+            hits = list(chain.from_iterable(found))
+            if hits:
+                rows = np.repeat(np.arange(n), np.fromiter(map(len, found), dtype=np.int64, count=n))
+                k = np.fromiter(map(self._keyword_index.__getitem__, hits), dtype=np.int64, count=len(hits))
+                np.minimum.at(best, rows, self._rule_of[k])
+                np.bitwise_or.at(bits, rows, self._crown_bits[k])
+        crown = self._always_crown[best] | ((bits >> best) & 1).astype(bool)
+        return self._categories[best], crown
+
+    def classify(self, lines):
+        # 批次分類：回傳與 lines 等長的 [(類別, 是否皇冠寶石)]
+        categories, crown = self._classify_arrays(list(lines))
+        return list(zip(categories.tolist(), crown.tolist()))
+
+    def to_assets(self, lines):
+        lines = list(lines)
+        categories, crown = self._classify_arrays(lines)
+        return pd.DataFrame({"資產名稱": lines, "類別": categories, "皇冠寶石": crown})
@@ -0,0 +1,247 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from .catalog import VendorCatalog
+from .importer import CATEGORY_ALIASES, CROWN_TRUE, iter_file_chunks
+from .matrix import CATEGORIES, FUNCTIONS, calculate_cell_status, compute_matrix, risk_cells
+from .policy import ScoringPolicy
+
+INVENTORY_EXTENSIONS = (".csv", ".xlsx")
+ASSESSMENT_SUFFIX = ".assessments"  # <組織>.assessments.csv：長格式評分 (資產名稱, 功能, 分數)
+
+
+# --- 讀檔：每個組織一份資產清單 (可直接帶五個功能的分數欄)，另可附長格式評分檔 ---
+def discover(directory):
+    # 回傳 [(組織名稱, 資產清單路徑, 評分檔路徑或 None)]，依組織名稱排序
+    inventories, assessments = {}, {}
+    for entry in sorted(os.listdir(directory)):
+        stem, ext = os.path.splitext(entry)
+        if ext.lower() not in INVENTORY_EXTENSIONS:
+            continue
+        path = os.path.join(directory, entry)
+        if stem.endswith(ASSESSMENT_SUFFIX):
+            assessments[stem[:-len(ASSESSMENT_SUFFIX)]] = path
+        else:
+            inventories[stem] = path
+    return [(org, path, assessments.get(org)) for org, path in sorted(inventories.items())]
+
+
+def _read_table(path):
+    with open(path, "rb") as f:
+        chunks = [chunk for _, chunk in iter_file_chunks(f, path)]
+    table = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+    table.columns = [str(c).strip() for c in table.columns]
+    return table
+
+
+def _scores(values, where):
+    # values 的 index 為檔案內的資料列序號 (0 起算，不含表頭)，錯誤訊息以檔案中的列號回報
+    scores = pd.to_numeric(values.replace("", "0"), errors="coerce")
+    bad = scores.isna() | ~scores.isin(range(5))
+    if bad.any():
+        row = bad.idxmax()
+        raise ValueError(f"{where}：分數必須是 0~4，第 {int(row) + 2} 列為 {values[row]!r}")
+    return scores.astype(int)
+
+
+def load_organization(inventory_path, assessments_path=None):
+    # 回傳與頁面相同的 (assets DataFrame, assessments dict)
+    table = _read_table(inventory_path)
+    missing = [c for c in ("資產名稱", "類別") if c not in table.columns]
+    if missing:
+        raise ValueError(f"{os.path.basename(inventory_path)} 缺少欄位：{'、'.join(missing)}")
+
+    table = table.assign(資產名稱=table["資產名稱"].fillna("").astype(str).str.strip())
+    # 去除空白與重複名稱後保留原本的 index，錯誤訊息才對得上檔案中的列號
+    table = table[table["資產名稱"] != ""].drop_duplicates("資產名稱")
+    categories = table["類別"].fillna("").astype(str).str.strip().str.lower().map(CATEGORY_ALIASES)
+    if categories.isna().any():
+        row = categories.isna().idxmax()
+        raise ValueError(
+            f"{os.path.basename(inventory_path)}：第 {int(row) + 2} 列為未知的資產類別 {table['類別'][row]!r} ({table['資產名稱'][row]})"
+        )
+    crown = (
+        table["皇冠寶石"].fillna("").astype(str).str.strip().str.lower().isin(CROWN_TRUE)
+        if "皇冠寶石" in table.columns else pd.Series(False, index=table.index)
+    )
+    assets = pd.DataFrame(
+        {"資產名稱": table["資產名稱"], "類別": categories.astype(object), "皇冠寶石": crown.astype(bool)}
+    ).reset_index(drop=True)
+
+    assessments = {}
+    for func in FUNCTIONS:
+        if func in table.columns:
+            scores = _scores(table[func].fillna("").astype(str).str.strip(), os.path.basename(inventory_path))
+            assessments.update(((name, func), s) for name, s in zip(assets["資產名稱"], scores) if s > 0)
+
+    if assessments_path is not None:
+        long = _read_table(assessments_path)
+        missing = [c for c in ("資產名稱", "功能", "分數") if c not in long.columns]
+        if missing:
+            raise ValueError(f"{os.path.basename(assessments_path)} 缺少欄位：{'、'.join(missing)}")
+        scores = _scores(long["分數"].fillna("").astype(str).str.strip(), os.path.basename(assessments_path))
+        known = set(assets["資產名稱"])
+        for name, func, s in zip(long["資產名稱"].astype(str).str.strip(), long["功能"].astype(str).str.strip(), scores):
+            if name in known and func in FUNCTIONS:
+                # 長格式評分覆蓋清單內的分數；0 代表 N/A
+                if s > 0:
+                    assessments[(name, func)] = s
+                else:
+                    assessments.pop((name, func), None)
+    return assets, assessments
+
+
+# --- 單一組織評分：與「3. 風險戰情室」相同的矩陣與處方籤清單 ---
+def score_organization(organization, inventory_path, assessments_path=None, check=False, policy=None):
+    # policy：ScoringPolicy (None 為預設規則)
+    result = {"organization": organization, "files": [p for p in (inventory_path, assessments_path) if p]}
+    if policy is not None:
+        result["policy"] = policy.name
+    start = time.perf_counter()
+    try:
+        assets, assessments = load_organization(inventory_path, assessments_path)
+        loaded = time.perf_counter()
+        matrix = compute_matrix(assets, assessments, policy)
+        scored = time.perf_counter()
+    except Exception as e:  # 壞檔 (例如損毀的 xlsx) 只記在這個組織的結果，其餘檔案照常處理
+        error = str(e) if isinstance(e, ValueError) else f"{type(e).__name__}: {e}"
+        result.update(error=error, seconds={"total": round(time.perf_counter() - start, 4)})
+        return result
+
+    catalog = VendorCatalog()
+    result["assets"] = len(assets)
+    result["crown_assets"] = int(assets["皇冠寶石"].sum())
+    result["matrix"] = {
+        cat: {func: {"status": matrix[(cat, func)][0], "tier": matrix[(cat, func)][1]} for func in FUNCTIONS}
+        for cat in CATEGORIES
+    }
+    result["recommendations"] = [
+        {"category": cat, "function": func, "status": status, "vendors": catalog.vendors(cat, func)}
+        for cat, func, status in risk_cells(matrix)
+    ]
+    if check:
+        # 逐格以參考實作 calculate_cell_status 重算，確認與 UI 使用的引擎一致
+        result["check_mismatches"] = [
+            {"category": cat, "function": func, "engine": list(matrix[(cat, func)]), "reference": [status, tier]}
+            for cat in CATEGORIES
+            for func in FUNCTIONS
+            for status, tier, _ in [calculate_cell_status(assets, assessments, cat, func)]
+            if (status, tier) != matrix[(cat, func)]
+        ]
+    result["seconds"] = {
+        "load": round(loaded - start, 4),
+        "score": round(scored - loaded, 4),
+        "total": round(time.perf_counter() - start, 4),
+    }
+    return result
+
+
+# --- 輸出 ---
+def write_json(results, out_dir):
+    for result in results:
+        with open(os.path.join(out_dir, f"{result['organization']}.json"), "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+def write_csv(results, out_dir):
+    def write(name, header, rows):
+        # utf-8-sig：Excel 直接開啟不會亂碼
+        with open(os.path.join(out_dir, name), "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            writer.writerows(rows)
+
+    ok = [r for r in results if "error" not in r]
+    write("summary.csv", ["organization", "assets", "crown_assets", "crown_risk", "tier-1", "tier-2", "seconds", "error"], [
+        [r["organization"], r.get("assets", ""), r.get("crown_assets", ""),
+         *[sum(x["status"] == s for x in r.get("recommendations", [])) if "error" not in r else "" for s in ("crown_risk", "tier-1", "tier-2")],
+         r["seconds"]["total"], r.get("error", "")]
+        for r in results
+    ])
+    write("matrix.csv", ["organization", "category", "function", "status", "tier"], [
+        [r["organization"], cat, func, cell["status"], cell["tier"]]
+        for r in ok for cat, row in r["matrix"].items() for func, cell in row.items()
+    ])
+    write("recommendations.csv", ["organization", "category", "function", "status", "vendors"], [
+        [r["organization"], x["category"], x["function"], x["status"], "、".join(x["vendors"])]
+        for r in ok for x in r["recommendations"]
+    ])
+
+
+def run(jobs, tasks, check=False, policy=None, log=sys.stderr):
+    # tasks：discover() 的結果；jobs > 1 時分散到 process pool，依完成順序回報每個檔案的耗時
+    results = []
+
+    def report(result):
+        results.append(result)
+        status = f"錯誤：{result['error']}" if "error" in result else f"{result['assets']} 項資產"
+        print(f"[{len(results)}/{len(tasks)}] {result['organization']:<24} {result['seconds']['total']:8.3f} s  {status}", file=log)
+
+    if jobs == 1:
+        for task in tasks:
+            report(score_organization(*task, check=check, policy=policy))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {pool.submit(score_organization, *task, check=check, policy=policy): task for task in tasks}
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:  # worker 本身失敗 (例如 process 異常結束)：記為該組織的錯誤
+                    organization, *files = futures[future]
+                    result = {
+                        "organization": organization, "files": [p for p in files if p],
+                        "error": f"{type(e).__name__}: {e}", "seconds": {"total": 0.0},
+                    }
+                report(result)
+    return sorted(results, key=lambda r: r["organization"])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m cdm_core", description="CDM 批次評分 (不需開啟 Streamlit 頁面)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    score = commands.add_parser("score", help="計算目錄內每個組織的 CDM 矩陣與處方籤")
+    score.add_argument("directory", help="資產清單目錄：<組織>.csv|xlsx，可另附 <組織>.assessments.csv|xlsx")
+    score.add_argument("-o", "--out", default="cdm_results", help="輸出目錄 (預設 cdm_results)")
+    score.add_argument("-f", "--format", choices=["json", "csv", "both"], default="both")
+    score.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="平行處理的 process 數")
+    score.add_argument("--check", action="store_true", help="逐格以 calculate_cell_status 重算比對，不一致時以非 0 結束")
+    score.add_argument("--policy", help="評分政策 JSON 檔 (格式見 cdm_core/policy.py 的 DEFAULT_POLICY)，預設為 CDM 預設規則")
+    args = parser.parse_args(argv)
+
+    policy = None
+    if args.policy:
+        if args.check:
+            parser.error("--check 以預設規則的參考實作比對，不能與 --policy 同時使用")
+        try:
+            with open(args.policy, encoding="utf-8") as f:
+                # 沒有 name 時以檔名作為政策名稱
+                policy = ScoringPolicy({"name": os.path.splitext(os.path.basename(args.policy))[0], **json.load(f)})
+        except (OSError, ValueError) as e:
+            parser.error(f"無法載入評分政策 {args.policy}：{e}")
+
+    tasks = discover(args.directory)
+    if not tasks:
+        parser.error(f"{args.directory} 內沒有 .csv / .xlsx 資產清單")
+    os.makedirs(args.out, exist_ok=True)
+
+    start = time.perf_counter()
+    results = run(max(1, args.jobs), tasks, check=args.check, policy=policy)
+    elapsed = time.perf_counter() - start
+    if args.format in ("json", "both"):
+        write_json(results, args.out)
+    if args.format in ("csv", "both"):
+        write_csv(results, args.out)
+
+    errors = [r for r in results if "error" in r]
+    mismatched = [r for r in results if r.get("check_mismatches")]
+    print(f"完成 {len(results)} 個組織 ({len(errors)} 個錯誤)，{elapsed:.2f} s，{args.jobs} 個 process，結果在 {args.out}", file=sys.stderr)
+    if mismatched:
+        print(f"⚠️ {len(mismatched)} 個組織的引擎結果與 calculate_cell_status 不一致", file=sys.stderr)
+    return 1 if errors or mismatched else 0
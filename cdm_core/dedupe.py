@@ -0,0 +1,135 @@
+import re
+import unicodedata
+import zlib
+
+import numpy as np
+import pandas as pd
+
+_CJK = "㐀-䶿一-鿿豈-﫿"
+_RUNS = re.compile(f"[{_CJK}]+|[^\\W_{_CJK}]+")
+_DIGIT = re.compile(r"\d")
+_PRIME = np.uint64((1 << 61) - 1)
+
+
+def name_tokens(name):
+    # 名稱正規化 (NFKC、不分大小寫、忽略標點) 後的 token 集合：英數字以字為單位，中文取相鄰兩字
+    text = unicodedata.normalize("NFKC", str(name)).casefold()
+    tokens = set()
+    for run in _RUNS.findall(text):
+        if "㐀" <= run[0] <= "﫿":
+            tokens.update(run[k:k + 2] for k in range(max(len(run) - 1, 1)))
+        else:
+            tokens.add(run)
+    return frozenset(tokens)
+
+
+def _numbers(tokens):
+    # 含數字的 token (編號、IP、型號)：不同編號的資產即使其餘名稱相同也不是重複
+    return frozenset(t for t in tokens if _DIGIT.search(t))
+
+
+def _jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+def _signatures(token_sets, num_perm, seed, chunk=20000):
+    # MinHash 簽章 (N x num_perm)：每個 token 以 crc32 雜湊，再套 num_perm 組 (a * h + b) mod p 取最小值
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 1 << 31, size=(num_perm, 1), dtype=np.uint64)
+    b = rng.integers(0, 1 << 32, size=(num_perm, 1), dtype=np.uint64)
+    out = np.empty((len(token_sets), num_perm), dtype=np.uint64)
+    for start in range(0, len(token_sets), chunk):
+        part = token_sets[start:start + chunk]
+        lengths = np.fromiter((len(t) for t in part), dtype=np.int64, count=len(part))
+        hashes = np.fromiter(
+            (zlib.crc32(token.encode("utf-8")) for tokens in part for token in tokens),
+            dtype=np.uint64, count=int(lengths.sum()),
+        )
+        values = (a * hashes + b) % _PRIME
+        offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        out[start:start + len(part)] = np.minimum.reduceat(values, offsets, axis=1).T
+    return out
+
+
+# --- 近似重複偵測：MinHash + LSH 分桶找候選，再以 Jaccard 相似度確認 ---
+# 只比對落在同一個桶的名稱，整體接近線性；分桶鍵另外混入名稱中的編號，編號不同的名稱不會成為候選。
+# 超過 max_bucket 的桶代表很常見的 token 組合，不展開成配對。
+def near_duplicates(names, existing=(), threshold=0.6, num_perm=64, bands=16, max_bucket=50, seed=0):
+    # names：這次要匯入的名稱；existing：已在清單中的名稱 (只作為比對對象，不會被合併掉)
+    # 回傳合併建議 DataFrame [資產名稱, 合併至, 相似度, 既有資產]：資產名稱 為 names 中建議併掉的項目，
+    # 合併至 為保留的名稱 (既有資產或較早出現的匯入名稱)
+    # 完全相同的名稱不列入：同批重複只比對第一筆，與既有資產同名者匯入時本來就會略過 (不需要人工確認)
+    existing = list(existing)
+    known = set(existing)
+    names = [name for name in dict.fromkeys(names) if name not in known]
+    everything = existing + list(names)
+    n_existing = len(existing)
+    token_sets = [name_tokens(name) for name in everything]
+    usable = np.flatnonzero([bool(t) for t in token_sets])
+    columns = ["資產名稱", "合併至", "相似度", "既有資產"]
+    if len(usable) < 2 or len(usable) == len(usable[usable < n_existing]):
+        return pd.DataFrame(columns=columns)
+
+    signatures = _signatures([token_sets[i] for i in usable], num_perm, seed)
+    numbers = [_numbers(tokens) for tokens in token_sets]
+    number_keys = np.fromiter(
+        (zlib.crc32("\x00".join(sorted(numbers[i])).encode("utf-8")) for i in usable.tolist()),
+        dtype=np.uint64, count=len(usable),
+    )
+    rows = num_perm // bands
+    weights = np.uint64(0x9E3779B97F4A7C15) ** np.arange(rows, dtype=np.uint64)
+    is_new = usable >= n_existing
+    candidates = set()
+    for band in range(bands):
+        keys = (signatures[:, band * rows:(band + 1) * rows] * weights).sum(axis=1) ^ number_keys
+        order = np.argsort(keys, kind="stable")
+        starts = np.flatnonzero(np.r_[True, np.diff(keys[order]) != 0])
+        sizes = np.diff(np.r_[starts, len(order)])
+        # 只展開 2 ~ max_bucket 個名稱的桶 (大部分名稱單獨一桶，不進 Python 迴圈)
+        shared = (sizes >= 2) & (sizes <= max_bucket)
+        for start, size in zip(starts[shared].tolist(), sizes[shared].tolist()):
+            bucket = order[start:start + size]
+            if not is_new[bucket].any():
+                continue
+            members = usable[bucket].tolist()
+            candidates.update(
+                (x, y) for k, x in enumerate(members) for y in members[k + 1:] if y >= n_existing
+            )
+
+    # 確認相似度後依出現順序指派：每個新名稱併入「比它早出現、且本身未被合併」的最相似名稱，
+    # 被合併的項目一定與保留的名稱直接相似 (不會 A~B~C 串成一大群)；既有資產一律保留
+    neighbors = {}
+    for x, y in candidates:
+        if numbers[x] == numbers[y]:
+            similarity = _jaccard(token_sets[x], token_sets[y])
+            if similarity >= threshold:
+                neighbors.setdefault(y, []).append((similarity, x))
+    merged = set()
+    merges = []
+    for i in sorted(neighbors):
+        kept = [(similarity, j) for similarity, j in neighbors[i] if j not in merged]
+        if not kept:
+            continue
+        # 相似度最高者，同分取較早出現的名稱
+        similarity, keep = max(kept, key=lambda pair: (pair[0], -pair[1]))
+        merged.add(i)
+        merges.append((everything[i], everything[keep], round(similarity, 2), keep < n_existing))
+    merges.sort(key=lambda m: (m[1], m[0]))
+    return pd.DataFrame(merges, columns=columns)
+
+
+def merge_duplicates(assets, merges):
+    # 依確認後的合併清單 (合併 欄為 True 的列) 從匯入資料移除重複項；
+    # 被合併掉的資產若是皇冠寶石，保留下來的匯入資產也標為皇冠寶石 (既有資產不變動)
+    # 同名的列先只留第一筆 (與 store.add_assets 相同)，被合併掉的就只有那一筆，保留的名稱不會跟著消失
+    if "合併" in merges:
+        merges = merges[merges["合併"].astype(bool)]
+    merges = merges[merges["資產名稱"] != merges["合併至"]]
+    if merges.empty:
+        return assets
+    assets = assets.drop_duplicates("資產名稱")
+    crown = dict(zip(assets["資產名稱"], assets["皇冠寶石"].astype(bool)))
+    promoted = {keep for name, keep in zip(merges["資產名稱"], merges["合併至"]) if crown.get(name)}
+    kept = assets[~assets["資產名稱"].isin(set(merges["資產名稱"]))].copy()
+    kept["皇冠寶石"] = kept["皇冠寶石"].astype(bool) | kept["資產名稱"].isin(promoted)
+    return kept.reset_index(drop=True)
@@ -0,0 +1,610 @@
+import html
+import os
+import re
+import tempfile
+import threading
+import time
+import weakref
+import zipfile
+import zlib
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+
+from .catalog import SECPAAS_URL, VendorCatalog
+from .matrix import CATEGORIES, FUNCTIONS, risk_cells
+from .render import CHART_COLORS, MatrixRenderer
+
+# --- 報表內容：狀態文字 (不含 emoji，PDF 字型沒有) 與處方籤的標籤 / 診斷 (同戰情室) ---
+STATUS_TEXT = {"no_asset": "無資產", "not_assessed": "待評估", "crown_risk": "關鍵風險"}
+GAP_TEXT = {
+    "crown_risk": ("皇冠風險 (Critical)", "關鍵資產防護不足，需立即改善！"),
+    "tier-1": ("嚴重缺口 (Tier 1)", "缺乏基礎防禦或流程。"),
+    "tier-2": ("建議強化 (Tier 2)", "覆蓋率或標準化不足。"),
+}
+ASSET_COLUMNS = ["資產名稱", "類別", "皇冠寶石"] + FUNCTIONS  # 與批次評分 (python -m cdm_core score) 的清單欄位相同
+_CATEGORY_NAMES = np.array(CATEGORIES, dtype=object)
+_INVALID_XML = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+
+def status_text(status, tier):
+    return STATUS_TEXT.get(status, f"Tier {tier}")
+
+
+# --- 匯出用的快照：矩陣 + 處方籤 + 每項資產的分數，建立後與工作區的後續異動無關 ---
+class Report:
+    def __init__(self, matrix, names, categories, crowns, scores, catalog=None, title="CDM 風險報告", meta=()):
+        # names / categories (代碼) / crowns / scores (N x 5)：AssessmentStore.snapshot() 的陣列
+        # meta：[(標籤, 值)]，列在報表開頭 (工作區、評分政策…)
+        self.matrix = matrix
+        self.names, self.categories, self.crowns, self.scores = names, categories, crowns, scores
+        self.title = title
+        self.meta = [("產生時間", datetime.now().strftime("%Y-%m-%d %H:%M")), *meta, ("資產數", f"{len(names):,}")]
+        catalog = catalog or VendorCatalog()
+        self.gaps = [
+            (cat, func, *GAP_TEXT[status], catalog.vendors(cat, func))
+            for cat, func, status in risk_cells(matrix)
+        ]
+
+    @classmethod
+    def from_shared(cls, shared, policy=None, **kwargs):
+        matrix, rows = shared.snapshot(policy)
+        return cls(matrix, *rows, **kwargs)
+
+    def __len__(self):
+        return len(self.names)
+
+    def asset_rows(self, chunk_size=5000):
+        # 分批產生 [(名稱, 類別, 是否皇冠寶石, [分數 x5])]，一次只有一批轉成 Python 物件
+        for start in range(0, len(self.names), chunk_size):
+            end = start + chunk_size
+            yield list(zip(
+                self.names[start:end].tolist(),
+                _CATEGORY_NAMES[self.categories[start:end]].tolist(),
+                self.crowns[start:end].tolist(),
+                self.scores[start:end].tolist(),
+            ))
+
+
+def _track(progress):
+    # 每寫完一批資產回報累計筆數
+    done = [0]
+
+    def advance(rows):
+        done[0] += rows
+        if progress is not None:
+            progress(done[0])
+    return advance
+
+
+# --- XLSX：直接串流寫出 SpreadsheetML (zip 內的 XML)，字串以 inline string 寫入 ---
+# 不經過 openpyxl 的物件模型，每批資產組成 XML 後即寫入 zip，記憶體與資產數無關。
+_MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_COLUMN_LETTERS = [chr(ord("A") + i) for i in range(26)]
+
+
+def _argb(color):
+    names = {"white": "FFFFFF", "black": "000000"}
+    color = names.get(color, color.lstrip("#"))
+    if len(color) == 3:
+        color = "".join(ch * 2 for ch in color)
+    return "FF" + color.upper()
+
+
+class _XlsxStyles:
+    # 0 一般、1 表頭、其後為各狀態的底色 (取自 classic 樣式)
+    def __init__(self, theme="classic"):
+        colors = CHART_COLORS[theme]
+        self.header = 1
+        self.status = {status: 2 + i for i, status in enumerate(colors)}
+        fills = [_argb("#333333")] + [_argb(background) for background, _ in colors.values()]
+        fonts = [2] + [2 if foreground == "white" else 1 for _, foreground in colors.values()]
+        xfs = ['<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'] + [
+            f'<xf numFmtId="0" fontId="{font}" fillId="{2 + i}" borderId="0" xfId="0" applyFont="1" applyFill="1" applyAlignment="1">'
+            '<alignment horizontal="center" vertical="center" wrapText="1"/></xf>'
+            for i, font in enumerate(fonts)
+        ]
+        self.xml = (
+            f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<styleSheet xmlns="{_MAIN_NS}">'
+            '<fonts count="3"><font><sz val="11"/><name val="Calibri"/></font>'
+            '<font><b/><sz val="11"/><name val="Calibri"/></font>'
+            '<font><b/><sz val="11"/><color rgb="FFFFFFFF"/><name val="Calibri"/></font></fonts>'
+            f'<fills count="{2 + len(fills)}"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill>'
+            + "".join(f'<fill><patternFill patternType="solid"><fgColor rgb="{rgb}"/></patternFill></fill>' for rgb in fills)
+            + '</fills><borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+            '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+            f'<cellXfs count="{len(xfs)}">' + "".join(xfs) + '</cellXfs>'
+            '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles></styleSheet>'
+        )
+
+
+def _xml_text(value):
+    return html.escape(_INVALID_XML.sub("", str(value)), quote=False)
+
+
+class _XlsxWriter:
+    def __init__(self, path, theme="classic"):
+        self._zip = zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED, compresslevel=1)
+        self.styles = _XlsxStyles(theme)
+        self._sheets = []
+
+    def sheet(self, name, widths, freeze_header=False):
+        self._sheets.append(name)
+        return _XlsxSheet(self._zip.open(f"xl/worksheets/sheet{len(self._sheets)}.xml", "w", force_zip64=True), widths, freeze_header)
+
+    def close(self):
+        sheets = "".join(
+            f'<sheet name="{_xml_text(name)}" sheetId="{k}" r:id="rId{k}"/>' for k, name in enumerate(self._sheets, 1)
+        )
+        n = len(self._sheets)
+        parts = {
+            "[Content_Types].xml": (
+                '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                '<Default Extension="xml" ContentType="application/xml"/>'
+                '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+                '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+                + "".join(
+                    f'<Override PartName="/xl/worksheets/sheet{k}.xml" '
+                    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                    for k in range(1, n + 1)
+                )
+                + "</Types>"
+            ),
+            "_rels/.rels": (
+                '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                f'<Relationship Id="rId1" Type="{_REL_NS}/officeDocument" Target="xl/workbook.xml"/></Relationships>'
+            ),
+            "xl/workbook.xml": f'<workbook xmlns="{_MAIN_NS}" xmlns:r="{_REL_NS}"><sheets>{sheets}</sheets></workbook>',
+            "xl/_rels/workbook.xml.rels": (
+                '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                + "".join(
+                    f'<Relationship Id="rId{k}" Type="{_REL_NS}/worksheet" Target="worksheets/sheet{k}.xml"/>'
+                    for k in range(1, n + 1)
+                )
+                + f'<Relationship Id="rId{n + 1}" Type="{_REL_NS}/styles" Target="styles.xml"/></Relationships>'
+            ),
+            "xl/styles.xml": self.styles.xml,
+        }
+        for name, xml in parts.items():
+            if not xml.startswith("<?xml"):
+                xml = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n' + xml
+            self._zip.writestr(name, xml)
+        self._zip.close()
+
+
+class _XlsxSheet:
+    def __init__(self, stream, widths, freeze_header):
+        self._stream = stream
+        self._rows = 0
+        self._width = len(widths)
+        self._filter = freeze_header
+        pane = '<pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/>' if freeze_header else ""
+        cols = "".join(f'<col min="{i}" max="{i}" width="{w}" customWidth="1"/>' for i, w in enumerate(widths, 1))
+        self._write(
+            f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<worksheet xmlns="{_MAIN_NS}">'
+            f'<sheetViews><sheetView workbookViewId="0">{pane}</sheetView></sheetViews>'
+            f'<cols>{cols}</cols><sheetData>'
+        )
+
+    def _write(self, text):
+        self._stream.write(text.encode("utf-8"))
+
+    def rows(self, rows, style=0):
+        # rows：[[值 或 (值, 樣式)]]；字串寫成 inline string，數字寫成數值
+        parts = []
+        for row in rows:
+            self._rows += 1
+            r = self._rows
+            parts.append(f'<row r="{r}">')
+            for letter, value in zip(_COLUMN_LETTERS, row):
+                s = style
+                if isinstance(value, tuple):
+                    value, s = value
+                attrs = f' s="{s}"' if s else ""
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    parts.append(f'<c r="{letter}{r}"{attrs}><v>{value}</v></c>')
+                elif value is not None and value != "":
+                    parts.append(f'<c r="{letter}{r}"{attrs} t="inlineStr"><is><t xml:space="preserve">{_xml_text(value)}</t></is></c>')
+            parts.append("</row>")
+        self._write("".join(parts))
+
+    def close(self):
+        end = "</sheetData>"
+        if self._filter and self._rows > 1:
+            end += f'<autoFilter ref="A1:{_COLUMN_LETTERS[self._width - 1]}{self._rows}"/>'
+        self._write(end + "</worksheet>")
+        self._stream.close()
+
+
+def write_xlsx(report, path, progress=None, theme="classic"):
+    advance = _track(progress)
+    book = _XlsxWriter(path, theme)
+    styles = book.styles
+
+    sheet = book.sheet("矩陣", [14] + [16] * len(FUNCTIONS))
+    sheet.rows([[(report.title, styles.header)]] + [[label, value] for label, value in report.meta] + [[]])
+    sheet.rows([[(text, styles.header) for text in ["CDM"] + FUNCTIONS]])
+    sheet.rows([
+        [(cat, styles.header)] + [
+            (status_text(*report.matrix[(cat, func)]), styles.status[report.matrix[(cat, func)][0]]) for func in FUNCTIONS
+        ]
+        for cat in CATEGORIES
+    ])
+    sheet.close()
+
+    sheet = book.sheet("處方籤", [12, 10, 20, 32, 60, 40], freeze_header=True)
+    sheet.rows([[(text, styles.header) for text in ["類別", "功能", "狀態", "診斷", "建議廠商", "SecPaaS"]]])
+    sheet.rows([[cat, func, label, desc, "、".join(vendors), SECPAAS_URL] for cat, func, label, desc, vendors in report.gaps])
+    sheet.close()
+
+    sheet = book.sheet("資產評分", [40, 12, 10] + [8] * len(FUNCTIONS), freeze_header=True)
+    sheet.rows([[(text, styles.header) for text in ASSET_COLUMNS]])
+    for chunk in report.asset_rows():
+        sheet.rows([[name, category, "是" if crown else "否", *scores] for name, category, crown, scores in chunk])
+        advance(len(chunk))
+    sheet.close()
+    book.close()
+
+
+# --- HTML：單一檔案，矩陣沿用戰情室的樣式，資產表逐批寫出 ---
+_HTML_STYLE = """
+<style>
+    body {font-family: "Noto Sans TC", "Microsoft JhengHei", sans-serif; margin: 24px;}
+    .meta td, .list td, .list th {padding: 4px 8px; text-align: left; height: auto; box-shadow: none; font-weight: normal;}
+    .list {border-collapse: collapse;}
+    .list th {position: sticky; top: 0;}
+    .list tr:nth-child(even) td {background: #f6f6f6;}
+    .crown {color: #d90429; font-weight: bold;}
+</style>
+"""
+
+
+def write_html(report, path, progress=None, theme="classic"):
+    advance = _track(progress)
+    renderer = MatrixRenderer(theme)
+    esc = html.escape
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"<!DOCTYPE html>\n<html lang='zh-Hant'><head><meta charset='utf-8'><title>{esc(report.title)}</title>")
+        f.write(renderer.stylesheet + _HTML_STYLE + "</head><body>\n")
+        f.write(f"<h1>{esc(report.title)}</h1>\n<table class='meta'>")
+        f.write("".join(f"<tr><td>{esc(label)}</td><td>{esc(str(value))}</td></tr>" for label, value in report.meta))
+        f.write("</table>\n<h2>CDM 矩陣</h2>\n" + renderer.table(report.matrix) + "\n")
+
+        f.write(f"<h2>智慧處方籤</h2>\n<p>共 {len(report.gaps)} 個需要強化的防禦區塊。</p>\n")
+        if report.gaps:
+            f.write("<table class='list'><tr><th>類別</th><th>功能</th><th>狀態</th><th>診斷</th><th>建議廠商</th></tr>")
+            f.write("".join(
+                f"<tr><td>{cat}</td><td>{func}</td><td>{label}</td><td>{desc}</td><td>{esc('、'.join(vendors))}</td></tr>"
+                for cat, func, label, desc, vendors in report.gaps
+            ))
+            f.write(f"</table>\n<p><a href='{SECPAAS_URL}'>前往 SecPaaS 資安防護矩陣地圖</a></p>\n")
+
+        f.write("<h2>資產評分</h2>\n<p>分數 0 為 N/A (不適用或未評)。</p>\n<table class='list'><tr>")
+        f.write("".join(f"<th>{column}</th>" for column in ASSET_COLUMNS) + "</tr>\n")
+        for chunk in report.asset_rows():
+            f.write("".join(
+                f"<tr><td{' class=crown' if crown else ''}>{esc(name)}</td><td>{category}</td><td>{'是' if crown else ''}</td>"
+                + "".join(f"<td>{s or 'N/A'}</td>" for s in scores) + "</tr>\n"
+                for name, category, crown, scores in chunk
+            ))
+            advance(len(chunk))
+        f.write("</table>\n</body></html>\n")
+
+
+# --- PDF：自行串流寫出 (每頁寫完即落檔)，不需額外套件 ---
+# 中文使用 PDF 標準的 Adobe CNS1 字型 MSung-Light (不內嵌，由閱讀器提供對應字型)，英數字使用 Helvetica。
+_PAGE_WIDTH, _PAGE_HEIGHT = 595, 842  # A4 直式 (pt)
+_MARGIN = 40
+_ROW_HEIGHT = 13
+
+
+def _pdf_runs(text):
+    # 切成 (字型, 已編碼的字串) 片段：ASCII 走 Helvetica，其餘走 CID 字型 (UCS-2，超出 BMP 的字元以 ? 取代)
+    runs = []
+    for part in re.findall(r"[\x20-\x7e]+|[^\x20-\x7e]+", str(text)):
+        if part[0] <= "\x7e":
+            runs.append(("F1", "(" + part.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"))
+        else:
+            part = "".join(ch if ord(ch) <= 0xFFFF and ch.isprintable() else "?" for ch in part)
+            runs.append(("F2", "<" + part.encode("utf-16-be").hex() + ">"))
+    return runs
+
+
+def _pdf_width(text, size):
+    # 估計寬度：英數字約 0.55 字寬，其餘 1 字寬
+    return sum(0.55 if ch <= "\x7e" else 1.0 for ch in str(text)) * size
+
+
+def _pdf_fit(text, width, size):
+    text = str(text)
+    if _pdf_width(text, size) <= width:
+        return text
+    while text and _pdf_width(text + "…", size) > width:
+        text = text[:-1]
+    return text + "…"
+
+
+class _PdfWriter:
+    def __init__(self, path):
+        self._file = open(path, "wb")
+        self._offsets = {}
+        self._pages = []
+        self._next_id = 4  # 1 Catalog、2 Pages、3 Resources 保留
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        fonts = {
+            "F1": "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+            "F2": (
+                "<< /Type /Font /Subtype /Type0 /BaseFont /MSung-Light /Encoding /UniCNS-UCS2-H /DescendantFonts [<< "
+                "/Type /Font /Subtype /CIDFontType0 /BaseFont /MSung-Light "
+                "/CIDSystemInfo << /Registry (Adobe) /Ordering (CNS1) /Supplement 0 >> /DW 1000 "
+                "/FontDescriptor << /Type /FontDescriptor /FontName /MSung-Light /Flags 6 /FontBBox [-160 -249 1015 1071] "
+                "/ItalicAngle 0 /Ascent 880 /Descent -120 /CapHeight 880 /StemV 93 >> >>] >>"
+            ),
+        }
+        self._object(3, "<< /Font << " + " ".join(f"/{k} {v}" for k, v in fonts.items()) + " >> >>")
+
+    def _write(self, data):
+        self._file.write(data)
+
+    def _object(self, obj_id, body, stream=None):
+        self._offsets[obj_id] = self._file.tell()
+        self._write(f"{obj_id} 0 obj\n".encode("ascii"))
+        if stream is None:
+            self._write(body.encode("ascii") + b"\nendobj\n")
+        else:
+            self._write(body.encode("ascii") + b"\nstream\n" + stream + b"\nendstream\nendobj\n")
+
+    def page(self, commands):
+        # commands：這一頁的內容串流 (PDF 繪圖指令)，壓縮後立即寫入檔案
+        data = zlib.compress("\n".join(commands).encode("latin-1"), 6)
+        content_id, page_id = self._next_id, self._next_id + 1
+        self._next_id += 2
+        self._object(content_id, f"<< /Length {len(data)} /Filter /FlateDecode >>", data)
+        self._object(page_id, f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {_PAGE_WIDTH} {_PAGE_HEIGHT}] /Resources 3 0 R /Contents {content_id} 0 R >>")
+        self._pages.append(page_id)
+
+    def close(self):
+        kids = " ".join(f"{p} 0 R" for p in self._pages)
+        self._object(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self._pages)} >>")
+        self._object(1, "<< /Type /Catalog /Pages 2 0 R >>")
+        xref = self._file.tell()
+        count = self._next_id
+        self._write(f"xref\n0 {count}\n0000000000 65535 f \n".encode("ascii"))
+        self._write("".join(f"{self._offsets[i]:010d} 00000 n \n" for i in range(1, count)).encode("ascii"))
+        self._write(f"trailer\n<< /Size {count} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("ascii"))
+        self._file.close()
+
+
+@lru_cache(maxsize=4096)
+def _pdf_show(text, width, size):
+    # 縮到欄寬內的文字顯示指令；類別、分數等重複的欄位直接取快取
+    return " ".join(f"/{font} {size} Tf {encoded} Tj" for font, encoded in _pdf_runs(_pdf_fit(text, width, size)))
+
+
+def _pdf_text(x, y, text, size=9, color=(0, 0, 0)):
+    # 顏色屬於繪圖狀態 (ET 之後仍有效)，每段文字都重新指定
+    runs = " ".join(f"/{font} {size} Tf {encoded} Tj" for font, encoded in _pdf_runs(text))
+    return f"BT {color[0]:.3f} {color[1]:.3f} {color[2]:.3f} rg {x:.1f} {y:.1f} Td {runs} ET"
+
+
+def _rgb(color):
+    argb = _argb(color)
+    return tuple(int(argb[i:i + 2], 16) / 255 for i in (2, 4, 6))
+
+
+class _PdfPages:
+    # 逐行往下排版，超出頁尾自動換頁；每頁右下角標頁碼
+    def __init__(self, writer, title):
+        self._writer = writer
+        self._title = title
+        self._commands = None
+        self.y = 0
+
+    def _new_page(self):
+        self.flush()
+        self._commands = [_pdf_text(_MARGIN, _PAGE_HEIGHT - 25, self._title, 8, (0.4, 0.4, 0.4))]
+        self.y = _PAGE_HEIGHT - _MARGIN - 10
+
+    def need(self, height):
+        if self._commands is None or self.y - height < _MARGIN:
+            self._new_page()
+
+    def add(self, *commands):
+        self._commands.extend(commands)
+
+    def flush(self):
+        if self._commands:
+            self._commands.append(_pdf_text(_PAGE_WIDTH - _MARGIN - 30, 20, f"{len(self._writer._pages) + 1}", 8))
+            self._writer.page(self._commands)
+        self._commands = None
+
+    def line(self, text, size=9, gap=_ROW_HEIGHT, color=(0, 0, 0)):
+        self.need(gap)
+        self.add(_pdf_text(_MARGIN, self.y, text, size, color))
+        self.y -= gap
+
+    def row(self, cells, widths, size=8, bold=False, fill=None):
+        self.need(_ROW_HEIGHT)
+        if fill:
+            self.add(f"{fill[0]:.3f} {fill[1]:.3f} {fill[2]:.3f} rg {_MARGIN} {self.y - 3:.1f} {sum(widths)} {_ROW_HEIGHT} re f")
+        # 整列一個文字物件，各欄以 Td 相對位移
+        parts = [f"BT {'1 1 1' if bold else '0 0 0'} rg {_MARGIN + 2} {self.y:.1f} Td"]
+        for k, (text, width) in enumerate(zip(cells, widths)):
+            if k:
+                parts.append(f"{widths[k - 1]} 0 Td")
+            parts.append(_pdf_show(str(text), width - 4, size))
+        self.add(" ".join(parts) + " ET")
+        self.y -= _ROW_HEIGHT
+
+
+def write_pdf(report, path, progress=None, theme="classic"):
+    advance = _track(progress)
+    writer = _PdfWriter(path)
+    pages = _PdfPages(writer, report.title)
+    colors = CHART_COLORS[theme]
+    dark = _rgb("#333333")
+
+    pages.line(report.title, 18, 28)
+    for label, value in report.meta:
+        pages.line(f"{label}：{value}", 10, 15)
+
+    # 矩陣：每格畫底色方塊再置中寫狀態文字
+    pages.y -= 10
+    pages.line("CDM 矩陣", 13, 22)
+    cell_w, cell_h, head_w = 80, 40, 75
+    pages.need(cell_h * (len(CATEGORIES) + 1))
+    top = pages.y
+    for f, func in enumerate(FUNCTIONS):
+        x = _MARGIN + head_w + f * cell_w
+        pages.add(f"{dark[0]:.3f} {dark[1]:.3f} {dark[2]:.3f} rg {x + 1} {top - 8} {cell_w - 2} 20 re f")
+        pages.add(_pdf_text(x + (cell_w - _pdf_width(func, 10)) / 2, top - 1, func, 10, (1, 1, 1)))
+    for c, cat in enumerate(CATEGORIES):
+        y = top - 12 - (c + 1) * cell_h
+        pages.add(f"{dark[0]:.3f} {dark[1]:.3f} {dark[2]:.3f} rg {_MARGIN} {y + 1} {head_w - 2} {cell_h - 2} re f")
+        pages.add(_pdf_text(_MARGIN + 6, y + cell_h / 2 - 4, cat, 10, (1, 1, 1)))
+        for f, func in enumerate(FUNCTIONS):
+            status, tier = report.matrix[(cat, func)]
+            background, foreground = (_rgb(color) for color in colors[status])
+            text = status_text(status, tier)
+            x = _MARGIN + head_w + f * cell_w
+            pages.add(f"{background[0]:.3f} {background[1]:.3f} {background[2]:.3f} rg {x + 1} {y + 1} {cell_w - 2} {cell_h - 2} re f")
+            pages.add(_pdf_text(x + (cell_w - _pdf_width(text, 10)) / 2, y + cell_h / 2 - 4, text, 10, foreground))
+    pages.y = top - 12 - (len(CATEGORIES) + 1) * cell_h - 20
+
+    # 處方籤：廠商清單依欄寬折行
+    pages.line(f"智慧處方籤：共 {len(report.gaps)} 個需要強化的防禦區塊", 13, 22)
+    for cat, func, label, desc, vendors in report.gaps:
+        pages.line(f"{label}：[{cat} - {func}]  {desc}", 10, 15)
+        line = "建議廠商："
+        for vendor in vendors:
+            if _pdf_width(line + vendor, 9) > _PAGE_WIDTH - 2 * _MARGIN - 20:
+                pages.line("    " + line, 9)
+                line = ""
+            line += vendor + "、"
+        pages.line("    " + (line.rstrip("、") or "請至 SecPaaS 查詢"), 9, 16)
+    if report.gaps:
+        pages.line(f"SecPaaS 資安防護矩陣地圖：{SECPAAS_URL}", 9, 16, (0.1, 0.3, 0.7))
+
+    # 資產評分：新頁開始，每頁重複表頭
+    pages.flush()
+    widths = [205, 60, 50] + [40] * len(FUNCTIONS)
+    per_page = int((_PAGE_HEIGHT - 2 * _MARGIN - 10) // _ROW_HEIGHT) - 1
+    written = 0
+    for chunk in report.asset_rows():
+        for name, category, crown, scores in chunk:
+            if written % per_page == 0:
+                pages.flush()
+                pages.row(ASSET_COLUMNS, widths, bold=True, fill=dark)
+            pages.row([name, category, "是" if crown else "", *(s or "N/A" for s in scores)], widths)
+            written += 1
+        advance(len(chunk))
+    pages.flush()
+    writer.close()
+
+
+# --- 匯出格式：名稱 -> (顯示名稱, 副檔名, MIME, 寫檔函式) ---
+EXPORT_FORMATS = {
+    "xlsx": ("Excel (.xlsx)", ".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", write_xlsx),
+    "html": ("網頁 (.html)", ".html", "text/html", write_html),
+    "pdf": ("PDF (.pdf)", ".pdf", "application/pdf", write_pdf),
+}
+
+
+# 頁面下載的上限：下載時整個檔案讀進記憶體 (Streamlit 的下載按鈕只收 bytes)，
+# 讀出後留在工作階段裡直到開始新的匯出或工作階段結束；超過上限的匯出視為失敗並刪除暫存檔
+MAX_DOWNLOAD_BYTES = 200 * 2**20
+
+
+class _Cancelled(Exception):
+    pass
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+# --- 背景匯出：在獨立執行緒寫入暫存檔，頁面只輪詢進度，不會卡住 ---
+class ExportJob:
+    def __init__(self, report, fmt, theme="classic"):
+        label, extension, self.mime, self._write = EXPORT_FORMATS[fmt]
+        self.report = report
+        self.total = len(report)
+        self.format = fmt
+        self.theme = theme
+        self.file_name = f"cdm-report-{datetime.now():%Y%m%d-%H%M}{extension}"
+        fd, self.path = tempfile.mkstemp(prefix="cdm-export-", suffix=extension)
+        os.close(fd)
+        # 工作被丟棄 (工作階段結束、被新的匯出取代) 或程式結束時刪除暫存檔
+        self._cleanup = weakref.finalize(self, _remove_file, self.path)
+        self._data = None
+        self.rows_done = 0
+        self.error = None
+        self.seconds = None
+        self._cancel = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"cdm-export-{fmt}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    @property
+    def running(self):
+        return self._thread.is_alive()
+
+    @property
+    def ok(self):
+        return self.seconds is not None and self.error is None
+
+    @property
+    def progress(self):
+        return self.rows_done / self.total if self.total else 1.0
+
+    def _progress(self, rows):
+        if self._cancel.is_set():
+            raise _Cancelled
+        self.rows_done = rows
+
+    def _run(self):
+        start = time.perf_counter()
+        try:
+            self._write(self.report, self.path, self._progress, self.theme)
+            size = os.path.getsize(self.path)
+            if size > MAX_DOWNLOAD_BYTES:
+                self.error = f"匯出檔 {size / 1e6:.1f} MB 超過頁面下載上限 {MAX_DOWNLOAD_BYTES / 1e6:.0f} MB，請拆成較小的工作區"
+        except _Cancelled:
+            self.error = "已取消"
+        except Exception as e:  # 背景執行緒的例外不會傳到頁面，記下來由頁面顯示
+            self.error = f"{type(e).__name__}: {e}"
+        if self.error is not None:
+            self._cleanup()
+        self.report = None  # 寫完即釋放快照
+        self.seconds = time.perf_counter() - start
+
+    def cancel(self):
+        self._cancel.set()
+
+    def read(self):
+        # 第一次讀取時把檔案讀進記憶體並刪除暫存檔，之後重複下載沿用同一份 bytes
+        if self._data is None:
+            with open(self.path, "rb") as f:
+                self._data = f.read()
+            self._cleanup()
+        return self._data
+
+    def size(self):
+        if self._data is not None:
+            return len(self._data)
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def discard(self):
+        # 取消並釋放匯出結果 (開始新的匯出時)；執行中的工作由背景執行緒收尾時刪除暫存檔
+        self.cancel()
+        self._data = None
+        if not self.running:
+            self._cleanup()
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+from .matrix import FUNCTIONS
+
+
+# --- 批次評分表格：一列一項資產，五個功能欄位放目前分數 (0 = N/A 或未評) ---
+def assessment_grid(store, category, crown_only=False, unscored_only=False):
+    names, crown, scores = store.rows(store.ids_in_category(category))
+
+    grid = pd.DataFrame(scores.astype(np.int64), columns=FUNCTIONS)
+    grid.insert(0, "資產名稱", names)
+    grid.insert(1, "皇冠寶石", crown)
+
+    keep = np.ones(len(grid), dtype=bool)
+    if crown_only:
+        keep &= crown
+    if unscored_only:
+        # 只要還有任一功能是 0，就視為尚未完成評分
+        keep &= (scores == 0).any(axis=1)
+    return grid[keep].reset_index(drop=True)
+
+
+def grid_changes(before, after):
+    # 比對編輯前後的表格，只回傳有變動的 {(資產名稱, 功能): 分數}，供一次批次寫回
+    old = before[FUNCTIONS].to_numpy(dtype=np.int64)
+    new = after[FUNCTIONS].fillna(0).to_numpy(dtype=np.int64)
+    names = before['資產名稱'].to_numpy()
+    rows, cols = np.nonzero(old != new)
+    return {(names[r], FUNCTIONS[c]): int(new[r, c]) for r, c in zip(rows, cols)}
+
+
+# --- 格子下鑽：只在使用者打開某一格時才計算，由類別索引直接取該格的資產 ---
+def cell_details(store, category, function):
+    # 回傳 (有評分的資產 DataFrame，最差的在前；未評分資產數)
+    # 排序：皇冠低分 (造成 crown_risk 者) -> 分數由低到高 -> 原本的資產順序
+    names, crown, scores = store.rows(store.ids_in_category(category))
+    scores = scores[:, FUNCTIONS.index(function)].astype(np.int64)
+    assessed = scores > 0
+    names, crown, scores = names[assessed], crown[assessed], scores[assessed]
+    crown_low = crown & (scores < 3)
+    order = np.lexsort((scores, ~crown_low))
+    details = pd.DataFrame({
+        "資產名稱": names[order],
+        "皇冠寶石": crown[order],
+        "分數": scores[order],
+        "皇冠風險": crown_low[order],
+    })
+    return details, int((~assessed).sum())
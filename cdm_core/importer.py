@@ -0,0 +1,188 @@
+import codecs
+import os
+
+import pandas as pd
+
+from .matrix import CATEGORIES
+
+# 類別欄位可接受的別名 (小寫比對)，其餘值交給分類引擎判斷
+CATEGORY_ALIASES = {
+    "device": "裝置", "devices": "裝置", "設備": "裝置", "主機": "裝置",
+    "application": "應用程式", "applications": "應用程式", "app": "應用程式", "應用": "應用程式", "系統": "應用程式",
+    "network": "網路", "networks": "網路", "網絡": "網路",
+    "data": "資料", "數據": "資料",
+    "user": "使用者", "users": "使用者", "person": "使用者", "人員": "使用者", "帳號": "使用者",
+}
+CATEGORY_ALIASES.update({c: c for c in CATEGORIES})
+CROWN_TRUE = {"true", "1", "y", "yes", "v", "x", "是", "✓", "✔", "👑", "皇冠寶石"}
+
+
+def _file_kind(filename):
+    ext = os.path.splitext(filename)[1].lower()
+    if ext in (".xlsx", ".xlsm"):
+        return "xlsx"
+    if ext in (".csv", ".txt"):
+        return "csv"
+    raise ValueError(f"不支援的檔案格式: {ext or filename}")
+
+
+def _decodes(file, encoding, limit, block_size=1 << 20):
+    # 從目前位置逐段嚴格解碼 (不保留內容)，檢查完把檔案指標還原
+    start = file.tell()
+    decoder = codecs.getincrementaldecoder(encoding)()
+    checked = 0
+    try:
+        while limit is None or checked < limit:
+            block = file.read(block_size if limit is None else min(block_size, limit - checked))
+            if not block:
+                decoder.decode(b"", final=True)
+                break
+            decoder.decode(block, final=False)
+            checked += len(block)
+        return True
+    except UnicodeDecodeError:
+        return False
+    finally:
+        file.seek(start)
+
+
+def _sniff_encoding(file, limit=None):
+    # UTF-8 (含 BOM) 解得開就用 UTF-8，否則視為 Big5 (cp950) 匯出；兩者都解不開時仍以 UTF-8 讀取 (無效位元組以 � 取代)
+    # limit：只檢查檔頭的位元組數 (讀欄位名稱時)；None 為檢查整個檔案，
+    # 避免前段全是英數字的 cp950 檔被誤判為 UTF-8、讀到中途才解碼失敗
+    if _decodes(file, "utf-8", limit) or not _decodes(file, "cp950", limit):
+        return "utf-8-sig"
+    return "cp950"
+
+
+def _unique_columns(header):
+    columns, seen = [], {}
+    for i, name in enumerate(header):
+        name = str(name).strip() if name is not None and str(name).strip() else f"欄位{i + 1}"
+        k = seen.get(name, 0)
+        seen[name] = k + 1
+        columns.append(name if k == 0 else f"{name}.{k}")
+    return columns
+
+
+def _open_sheet(file):
+    try:
+        from openpyxl import load_workbook
+    except ImportError as e:
+        raise ImportError("讀取 Excel 檔需要 openpyxl：pip install openpyxl") from e
+    # read_only 模式逐列讀取，不會把整張工作表載入記憶體
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    return workbook, workbook.active
+
+
+def read_header(file, filename):
+    # 只讀第一列欄位名稱 (給欄位對應介面用)，讀完把檔案指標還原
+    file.seek(0)
+    try:
+        if _file_kind(filename) == "csv":
+            return list(pd.read_csv(file, nrows=0, encoding=_sniff_encoding(file, limit=65536),
+                                    encoding_errors="replace", dtype=str).columns)
+        workbook, sheet = _open_sheet(file)
+        try:
+            header = next(sheet.iter_rows(values_only=True), ())
+        finally:
+            workbook.close()
+        return _unique_columns(header)
+    finally:
+        file.seek(0)
+
+
+def iter_file_chunks(file, filename, chunk_size=20000):
+    # 串流讀取 CSV / XLSX：每次回傳 (進度 0~1, 最多 chunk_size 列的字串 DataFrame)
+    file.seek(0, os.SEEK_END)
+    size = file.tell() or 1
+    file.seek(0)
+    if _file_kind(filename) == "csv":
+        # 少數無法以選定編碼解開的位元組以 � 取代，不中斷匯入
+        reader = pd.read_csv(file, chunksize=chunk_size, dtype=str, keep_default_na=False,
+                             encoding=_sniff_encoding(file), encoding_errors="replace", skipinitialspace=True)
+        with reader:
+            for chunk in reader:
+                yield min(file.tell() / size, 1.0), chunk
+        return
+
+    workbook, sheet = _open_sheet(file)
+    try:
+        rows = sheet.iter_rows(values_only=True)
+        columns = _unique_columns(next(rows, ()))
+        total = max((sheet.max_row or 0) - 1, 1)
+        done, buffer = 0, []
+        for row in rows:
+            buffer.append(["" if v is None else str(v) for v in row[:len(columns)]])
+            if len(buffer) >= chunk_size:
+                done += len(buffer)
+                yield min(done / total, 1.0), pd.DataFrame(buffer, columns=columns[:max(map(len, buffer))])
+                buffer = []
+        if buffer:
+            yield 1.0, pd.DataFrame(buffer, columns=columns[:max(map(len, buffer))])
+    finally:
+        workbook.close()
+
+
+# --- 檔案匯入：逐批對應欄位、去重、分類，最後一次寫入 store ---
+# 類別 / 皇冠寶石欄位未對應 (None) 或值無法辨識時，該列交給 classifier 判斷。
+# store 可以是 AssessmentStore 或 SharedWorkspace：已在清單中的名稱每批查一次 (共用工作區在 lock 內查)。
+class InventoryImport:
+    def __init__(self, store, classifier, name_column, category_column=None, crown_column=None):
+        self.store = store
+        self.classifier = classifier
+        self.name_column = name_column
+        self.category_column = category_column
+        self.crown_column = crown_column
+        self._seen = set()
+        self._frames = []
+        self.read = 0
+        self.skipped = 0  # 空白名稱、檔內重複、或已在清單中
+        self.classified = 0
+
+    def _column(self, chunk, column):
+        values = chunk[column] if column in chunk else pd.Series("", index=chunk.index)
+        return values.fillna("").astype(str).str.strip()
+
+    def feed(self, chunk):
+        self.read += len(chunk)
+        names = self._column(chunk, self.name_column)
+        keep = []
+        values = names.tolist()
+        for name, exists in zip(values, self.store.has_assets(values)):
+            new = bool(name) and name not in self._seen and not exists
+            if new:
+                self._seen.add(name)
+            keep.append(new)
+        chunk, names = chunk[keep], names[keep]
+        self.skipped += len(keep) - len(names)
+        if not len(names):
+            return 0
+
+        categories = pd.Series(pd.NA, index=names.index, dtype=object)
+        crown = pd.Series(pd.NA, index=names.index, dtype=object)
+        if self.category_column is not None:
+            categories = self._column(chunk, self.category_column).str.lower().map(CATEGORY_ALIASES)
+        if self.crown_column is not None:
+            crown = self._column(chunk, self.crown_column).str.lower().isin(CROWN_TRUE).astype(object)
+
+        unresolved = categories.isna() | crown.isna()
+        if unresolved.any():
+            guessed = self.classifier.classify(names[unresolved].tolist())
+            categories[unresolved] = categories[unresolved].fillna(
+                pd.Series([c for c, _ in guessed], index=names.index[unresolved]))
+            crown[unresolved] = crown[unresolved].fillna(
+                pd.Series([k for _, k in guessed], index=names.index[unresolved]))
+            self.classified += int(unresolved.sum())
+
+        self._frames.append(pd.DataFrame({
+            "資產名稱": names.to_numpy(),
+            "類別": categories.to_numpy(),
+            "皇冠寶石": crown.astype(bool).to_numpy(),
+        }))
+        return len(names)
+
+    def result(self):
+        if not self._frames:
+            return pd.DataFrame(columns=["資產名稱", "類別", "皇冠寶石"])
+        return pd.concat(self._frames, ignore_index=True)
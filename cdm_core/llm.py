@@ -0,0 +1,208 @@
+import http.client
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .classifier import Classifier, RuleClassifier
+from .matrix import CATEGORIES
+
+DEFAULT_ENDPOINT = os.environ.get("CDM_LLM_ENDPOINT", "http://localhost:11434")
+DEFAULT_MODEL = os.environ.get("CDM_LLM_MODEL", "llama3.1")
+DEFAULT_CACHE_PATH = os.environ.get(
+    "CDM_LLM_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "cdm", "llm_classifications.sqlite")
+)
+
+PROMPT = """你是企業資安資產盤點助理。請將下列每一行資產描述，分類到 CDM 資產類別之一：{categories}，
+並判斷是否為皇冠寶石 (一旦失守會嚴重衝擊營運的關鍵資產)。
+只回傳 JSON，格式為 {{"results": [{{"category": "類別", "crown": true 或 false}}, ...]}}，
+results 的筆數與順序必須與輸入完全相同。
+
+{items}"""
+
+
+def normalize_line(line):
+    # 快取鍵：全形/半形統一、小寫、壓縮空白，同一份 CMDB 匯出的格式差異視為同一筆
+    return " ".join(unicodedata.normalize("NFKC", line).lower().split())
+
+
+# --- 分類結果的持久快取 (SQLite)：key = 正規化後的資產描述 ---
+class ClassificationCache:
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS classifications ("
+                "key TEXT PRIMARY KEY, category TEXT NOT NULL, crown INTEGER NOT NULL, model TEXT)"
+            )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM classifications").fetchone()[0]
+
+    def get_many(self, keys, batch=500):
+        keys = list(keys)
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), batch):
+                part = keys[start:start + batch]
+                rows = self._conn.execute(
+                    f"SELECT key, category, crown FROM classifications WHERE key IN ({','.join('?' * len(part))})",
+                    part,
+                )
+                found.update((key, (category, bool(crown))) for key, category, crown in rows)
+        return found
+
+    def put_many(self, items, model=None):
+        # items: {key: (類別, 是否皇冠寶石)}
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO classifications (key, category, crown, model) VALUES (?, ?, ?, ?)",
+                [(key, category, int(crown), model) for key, (category, crown) in items.items()],
+            )
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM classifications")
+
+
+# --- 本地 LLM 分類引擎 (Ollama /api/generate) ---
+# 查快取 -> 未命中的不重複描述切成 batch -> 有上限的 thread pool 並行送出 (逾時 + 重試)，
+# 模型失敗、回應格式不符、或超過整體時間預算時，該批改用關鍵字規則。
+# 只有模型的結果會寫入快取，規則結果下次匯入會再交給模型。
+# iter_classify 分段匯入時，各段共用同一個時間預算與連續失敗計數 (模型過慢或離線只等一次)。
+class LLMClassifier(Classifier):
+    def __init__(self, endpoint=DEFAULT_ENDPOINT, model=DEFAULT_MODEL, cache=None, fallback=None,
+                 batch_size=20, max_workers=4, timeout=30.0, retries=2, backoff=0.5,
+                 max_failures=3, time_budget=None):
+        self.endpoint = endpoint.rstrip("/")
+        self.model = model
+        self.cache = cache
+        self.fallback = fallback if fallback is not None else RuleClassifier()
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_failures = max_failures  # 連續失敗幾批後視為模型離線，其餘批次直接用規則
+        self.time_budget = time_budget  # 每次 classify (或整個 iter_classify) 的總秒數上限，None 表示不限
+        self.stats = {"cached": 0, "llm": 0, "fallback": 0}
+        self._state = None  # iter_classify 期間共用的狀態
+
+    def _request(self, lines):
+        items = "\n".join(f"{i}. {line}" for i, line in enumerate(lines, 1))
+        body = json.dumps({
+            "model": self.model,
+            "prompt": PROMPT.format(categories="、".join(CATEGORIES), items=items),
+            "format": "json",
+            "stream": False,
+            "options": {"temperature": 0},
+        }).encode("utf-8")
+        request = urllib.request.Request(
+            self.endpoint + "/api/generate", data=body, headers={"Content-Type": "application/json"}
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            reply = json.loads(response.read().decode("utf-8"))
+        return self._parse(reply.get("response", ""), len(lines))
+
+    @staticmethod
+    def _parse(text, expected):
+        results = json.loads(text)
+        if isinstance(results, dict):
+            results = results.get("results")
+        if not isinstance(results, list) or len(results) != expected:
+            raise ValueError("LLM 回應筆數不符")
+        parsed = []
+        for item in results:
+            category = item.get("category") if isinstance(item, dict) else None
+            if category not in CATEGORIES:
+                raise ValueError(f"LLM 回應未知類別: {category}")
+            crown = item.get("crown")
+            if isinstance(crown, str):
+                crown = crown.strip().lower() in ("true", "yes", "1", "是")
+            parsed.append((category, bool(crown)))
+        return parsed
+
+    def _classify_batch(self, lines, state):
+        # 回傳模型結果；放棄時回傳 None，由呼叫端改用規則
+        for attempt in range(self.retries + 1):
+            if state["failures"] >= self.max_failures:
+                return None
+            if state["deadline"] is not None and time.monotonic() >= state["deadline"]:
+                return None
+            try:
+                results = self._request(lines)
+            except (OSError, ValueError, TypeError, AttributeError, urllib.error.URLError, http.client.HTTPException):
+                # 連線失敗 / 逾時 / HTTP 錯誤 / 回應不完整 / 回應格式不符 (例如 "response": null)
+                if attempt < self.retries:
+                    time.sleep(self.backoff * 2 ** attempt)
+                continue
+            with state["lock"]:
+                state["failures"] = 0
+            return results
+        with state["lock"]:
+            state["failures"] += 1
+        return None
+
+    def _new_state(self):
+        return {
+            "failures": 0,
+            "lock": threading.Lock(),
+            "deadline": time.monotonic() + self.time_budget if self.time_budget is not None else None,
+        }
+
+    def iter_classify(self, lines, chunk_size=10000):
+        self._state = self._new_state()
+        try:
+            yield from super().iter_classify(lines, chunk_size)
+        finally:
+            self._state = None
+
+    def classify(self, lines):
+        lines = list(lines)
+        keys = [normalize_line(line) for line in lines]
+        known = self.cache.get_many(set(keys)) if self.cache is not None else {}
+
+        # 同一份匯出中重複的描述只問一次
+        pending = {}
+        for key, line in zip(keys, lines):
+            if key not in known and key not in pending:
+                pending[key] = line
+        cached = sum(1 for key in keys if key in known)
+
+        resolved = {}
+        if pending:
+            pending_keys = list(pending)
+            batches = [pending_keys[i:i + self.batch_size] for i in range(0, len(pending_keys), self.batch_size)]
+            state = self._state if self._state is not None else self._new_state()
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = {
+                    pool.submit(self._classify_batch, [pending[key] for key in batch], state): batch
+                    for batch in batches
+                }
+                for future in as_completed(futures):
+                    batch = futures[future]
+                    results = future.result()
+                    if results is None:
+                        results = self.fallback.classify([pending[key] for key in batch])
+                        known.update(zip(batch, results))
+                    else:
+                        resolved.update(zip(batch, results))
+            if self.cache is not None and resolved:
+                self.cache.put_many(resolved, model=self.model)
+            known.update(resolved)
+
+        llm = sum(1 for key in keys if key in resolved)
+        self.stats["cached"] += cached
+        self.stats["llm"] += llm
+        self.stats["fallback"] += len(lines) - cached - llm
+        return [known[key] for key in keys]
@@ -0,0 +1,235 @@
+import numpy as np
+import pandas as pd
+
+# --- CDM 矩陣維度 ---
+CATEGORIES = ["裝置", "應用程式", "網路", "資料", "使用者"]
+FUNCTIONS = ["識別", "保護", "偵測", "應變", "復原"]
+
+_FUNCTION_INDEX = {f: i for i, f in enumerate(FUNCTIONS)}
+
+
+# --- 參考實作：逐格計算 (原 app.py 的 calculate_cell_status) ---
+def calculate_cell_status(assets, assessments, category, function):
+    # 1. 找資產
+    df = assets
+    if df.empty: return "no_asset", 0, []
+
+    related_assets = df[df['類別'] == category]
+    if related_assets.empty: return "no_asset", 0, []
+
+    scores = []
+    has_crown_risk = False
+    details = []
+
+    # 2. 算分數
+    for index, row in related_assets.iterrows():
+        asset_name = row['資產名稱']
+        is_crown = row['皇冠寶石']
+        key = (asset_name, function)
+
+        # 預設 0 (N/A)
+        score = assessments.get(key, 0)
+
+        if score > 0: # 有評分才算
+            scores.append(score)
+            details.append(f"{asset_name}: Tier {score}")
+            # 皇冠法則：皇冠資產分數 < 3 (Tier 1 or 2) 即為風險
+            if is_crown and score < 3:
+                has_crown_risk = True
+
+    # 3. 判定狀態
+    if not scores: return "not_assessed", 0, [] # 有資產但全 N/A 或未評
+
+    if has_crown_risk: return "crown_risk", 1, details
+
+    # 平均法則
+    avg_score = sum(scores) / len(scores)
+    if avg_score < 1.5: return "tier-1", 1, details
+    elif avg_score < 2.5: return "tier-2", 2, details
+    elif avg_score < 3.5: return "tier-3", 3, details
+    else: return "tier-4", 4, details
+
+
+# --- 向量化引擎：資產 x 分數 一次 join，再依 (類別, 功能) 分組 ---
+def score_arrays(assets, assessments):
+    # 類別轉成 0~4 的代碼 (不在清單內的類別為 -1，不納入統計)
+    categories = assets['類別']
+    codes = pd.Categorical(categories.where(categories.isin(CATEGORIES)), categories=CATEGORIES).codes.astype(np.int64)
+    crown = assets['皇冠寶石'].fillna(False).astype(bool).to_numpy()
+
+    # assessments 依功能拆成 {資產名稱: 分數}，再以資產名稱 join 回資產表
+    per_function = [{} for _ in FUNCTIONS]
+    for (asset_name, function), score in assessments.items():
+        i = _FUNCTION_INDEX.get(function)
+        if i is not None:
+            per_function[i][asset_name] = score
+
+    names = assets['資產名稱']
+    scores = np.zeros((len(assets), len(FUNCTIONS)), dtype=np.int64)
+    for i, lookup in enumerate(per_function):
+        if lookup:
+            scores[:, i] = names.map(lookup).fillna(0).to_numpy(dtype=np.int64)
+    return codes, crown, scores
+
+
+def aggregate_cells(codes, crown, scores):
+    # 回傳每格的統計量：類別資產數、有效評分總和、有效評分筆數、皇冠低分筆數
+    n_cat = len(CATEGORIES)
+    valid = codes >= 0
+    codes, crown, scores = codes[valid], crown[valid], scores[valid]
+
+    assessed = scores > 0
+    crown_low = assessed & (scores < 3) & crown[:, None]
+
+    asset_counts = np.bincount(codes, minlength=n_cat)
+    sums = np.zeros((n_cat, len(FUNCTIONS)), dtype=np.int64)
+    counts = np.zeros_like(sums)
+    crown_lows = np.zeros_like(sums)
+    for f in range(len(FUNCTIONS)):
+        sums[:, f] = np.bincount(codes, weights=scores[:, f] * assessed[:, f], minlength=n_cat)
+        counts[:, f] = np.bincount(codes, weights=assessed[:, f], minlength=n_cat)
+        crown_lows[:, f] = np.bincount(codes, weights=crown_low[:, f], minlength=n_cat)
+    return asset_counts, sums, counts, crown_lows
+
+
+def score_histogram(codes, crown, scores):
+    # 每格的分數分佈 (類別, 功能, 是否皇冠寶石, 分數) 的資產數，分數 0 (N/A) 不計；
+    # 評分政策 (ScoringPolicy) 的平均、最低分、各類別皇冠門檻等都由分佈算出
+    n_cat, n_func = len(CATEGORIES), len(FUNCTIONS)
+    valid = codes >= 0
+    codes, crown, scores = codes[valid], crown[valid].astype(np.int64), np.clip(scores[valid], 0, 4)
+    index = ((codes[:, None] * n_func + np.arange(n_func)) * 2 + crown[:, None]) * 5 + scores
+    return np.bincount(index[scores > 0], minlength=n_cat * n_func * 10).reshape(n_cat, n_func, 2, 5)
+
+
+def classify_cells(asset_counts, sums, counts, crown_lows):
+    # 與 calculate_cell_status 相同的判定規則，可同時處理任意前置維度 (例如多個單位)
+    asset_counts = np.broadcast_to(np.asarray(asset_counts)[..., None], np.shape(sums))
+    counts = np.asarray(counts)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        avg = np.where(counts > 0, np.asarray(sums) / np.maximum(counts, 1), 0.0)
+
+    conditions = [
+        asset_counts == 0,
+        counts == 0,
+        np.asarray(crown_lows) > 0,
+        avg < 1.5,
+        avg < 2.5,
+        avg < 3.5,
+    ]
+    statuses = np.select(conditions, ["no_asset", "not_assessed", "crown_risk", "tier-1", "tier-2", "tier-3"], "tier-4")
+    tiers = np.select(conditions, [0, 0, 1, 1, 2, 3], 4)
+    return statuses, tiers
+
+
+def compute_matrix(assets, assessments, policy=None):
+    # 一次計算整個 5x5 矩陣，回傳 {(類別, 功能): (狀態, Tier)}；policy 為 ScoringPolicy (None 為預設規則)
+    codes, crown, scores = score_arrays(assets, assessments)
+    if policy is None:
+        statuses, tiers = classify_cells(*aggregate_cells(codes, crown, scores))
+    else:
+        asset_counts = np.bincount(codes[codes >= 0], minlength=len(CATEGORIES))
+        statuses, tiers = policy.classify(asset_counts, score_histogram(codes, crown, scores))
+    return {
+        (cat, func): (str(statuses[c, f]), int(tiers[c, f]))
+        for c, cat in enumerate(CATEGORIES)
+        for f, func in enumerate(FUNCTIONS)
+    }
+
+
+RISK_STATUSES = ("crown_risk", "tier-1", "tier-2")
+
+
+def risk_cells(matrix):
+    # 需要處方籤的格子 [(類別, 功能, 狀態)]，依矩陣的列、欄順序
+    return [
+        (cat, func, matrix[(cat, func)][0])
+        for cat in CATEGORIES
+        for func in FUNCTIONS
+        if matrix[(cat, func)][0] in RISK_STATUSES
+    ]
+
+
+# --- 增量矩陣快取：每格維護 總和 / 筆數 / 皇冠低分筆數與分數分佈，新增、改分、刪除皆為 O(1) ---
+# 預設規則只重新判定被標記的格子；其他評分政策由分佈一次判定 25 格，結果保留到下一次異動。
+_CATEGORY_INDEX = {c: i for i, c in enumerate(CATEGORIES)}
+
+
+class MatrixCache:
+    def __init__(self):
+        n_cat, n_func = len(CATEGORIES), len(FUNCTIONS)
+        self.asset_counts = np.zeros(n_cat, dtype=np.int64)
+        self.sums = np.zeros((n_cat, n_func), dtype=np.int64)
+        self.counts = np.zeros((n_cat, n_func), dtype=np.int64)
+        self.crown_lows = np.zeros((n_cat, n_func), dtype=np.int64)
+        self.histogram = np.zeros((n_cat, n_func, 2, 5), dtype=np.int64)
+        self._matrix = {}
+        self._dirty = {(c, f) for c in range(n_cat) for f in range(n_func)}
+        self._policy_matrices = {}  # ScoringPolicy -> 矩陣，任何異動即清空
+
+    @classmethod
+    def from_assets(cls, assets, assessments):
+        return cls.from_arrays(*score_arrays(assets, assessments))
+
+    @classmethod
+    def from_arrays(cls, codes, crown, scores):
+        cache = cls()
+        cache.asset_counts, cache.sums, cache.counts, cache.crown_lows = aggregate_cells(codes, crown, scores)
+        cache.histogram = score_histogram(codes, crown, scores)
+        return cache
+
+    def _apply(self, c, f, is_crown, score, sign):
+        if score > 0:
+            self.sums[c, f] += sign * score
+            self.counts[c, f] += sign
+            if is_crown and score < 3:
+                self.crown_lows[c, f] += sign
+            self.histogram[c, f, int(bool(is_crown)), min(score, 4)] += sign
+        self._dirty.add((c, f))
+        self._policy_matrices.clear()
+
+    def add_asset(self, category, is_crown, scores=()):
+        # scores：依 FUNCTIONS 順序的既有分數 (新資產通常全為 0)
+        c = _CATEGORY_INDEX.get(category)
+        if c is None: return
+        self.asset_counts[c] += 1
+        for f in range(len(FUNCTIONS)):
+            self._dirty.add((c, f))
+        self._policy_matrices.clear()
+        for f, score in enumerate(scores):
+            self._apply(c, f, is_crown, score, +1)
+
+    def remove_asset(self, category, is_crown, scores=()):
+        c = _CATEGORY_INDEX.get(category)
+        if c is None: return
+        self.asset_counts[c] -= 1
+        for f in range(len(FUNCTIONS)):
+            self._dirty.add((c, f))
+        self._policy_matrices.clear()
+        for f, score in enumerate(scores):
+            self._apply(c, f, is_crown, score, -1)
+
+    def update_score(self, category, is_crown, function, old, new):
+        c, f = _CATEGORY_INDEX.get(category), _FUNCTION_INDEX.get(function)
+        if c is None or f is None or old == new: return
+        self._apply(c, f, is_crown, old, -1)
+        self._apply(c, f, is_crown, new, +1)
+
+    def matrix(self, policy=None):
+        # 只重新判定被標記的格子，其餘直接沿用上次結果
+        if policy is not None:
+            if policy not in self._policy_matrices:
+                self._policy_matrices[policy] = policy.matrix(self.asset_counts, self.histogram)
+            return self._policy_matrices[policy]
+        if self._dirty:
+            statuses, tiers = classify_cells(self.asset_counts, self.sums, self.counts, self.crown_lows)
+            for c, f in self._dirty:
+                self._matrix[(CATEGORIES[c], FUNCTIONS[f])] = (str(statuses[c, f]), int(tiers[c, f]))
+            self._dirty.clear()
+        return self._matrix
+
+    def verify(self, assets, assessments, policy=None):
+        # 一致性檢查：與完整重算比對，回傳不一致的格子 {(類別, 功能): (快取值, 重算值)}
+        expected = compute_matrix(assets, assessments, policy)
+        cached = self.matrix(policy)
+        return {cell: (cached[cell], expected[cell]) for cell in expected if cached[cell] != expected[cell]}
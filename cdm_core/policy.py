@@ -0,0 +1,134 @@
+import numpy as np
+
+from .matrix import CATEGORIES, FUNCTIONS
+
+# --- 評分政策：宣告式設定 (dict，可直接由 JSON 載入)，未列出的欄位沿用 DEFAULT_POLICY ---
+# aggregate：每格分數的彙總方式，mean (平均，依 weights 加權) / min (最低分) / median (中位數)
+# weights：mean 時皇冠寶石 (crown) 與一般資產 (other) 的權重，須大於 0
+# crown_threshold：皇冠寶石分數低於此值即為 crown_risk；None 為不套用皇冠法則
+# cutoffs：彙總分數低於 cutoffs[0] / [1] / [2] 分別為 tier-1 / tier-2 / tier-3，其餘為 tier-4
+# crown_threshold 與 cutoffs 也可寫成 {類別: 值}，未列出的類別取 "default" (沒有 default 時取 DEFAULT_POLICY 的值)
+DEFAULT_POLICY = {
+    "name": "CDM 預設",
+    "aggregate": "mean",
+    "weights": {"crown": 1, "other": 1},
+    "crown_threshold": 3,
+    "cutoffs": [1.5, 2.5, 3.5],
+}
+POLICIES = [
+    DEFAULT_POLICY,
+    {"name": "皇冠加權", "weights": {"crown": 2, "other": 1}},
+    {"name": "最低分", "aggregate": "min"},
+    {"name": "資料類從嚴", "crown_threshold": {"資料": 4}, "cutoffs": {"資料": [2, 3, 4]}},
+]
+AGGREGATE_LABELS = {"mean": "平均", "min": "最低分", "median": "中位數"}
+
+_STATUSES = np.array(["no_asset", "not_assessed", "crown_risk", "tier-1", "tier-2", "tier-3", "tier-4"])
+_TIERS = np.array([0, 0, 1, 1, 2, 3, 4])
+
+
+def _per_category(value, fallback, field):
+    # 所有類別同一個值，或 {類別: 值}
+    if not isinstance(value, dict):
+        return [value] * len(CATEGORIES)
+    unknown = set(value) - set(CATEGORIES) - {"default"}
+    if unknown:
+        raise ValueError(f"評分政策 {field}：未知的類別 {'、'.join(sorted(unknown))}")
+    default = value.get("default", fallback)
+    return [value.get(c, default) for c in CATEGORIES]
+
+
+# --- 政策編譯：建立時把設定轉成各類別的門檻陣列，判定時整個矩陣 (可含前置維度) 一次以陣列運算完成 ---
+# 輸入為每格的分數分佈 (score_histogram / MatrixCache.histogram)：[..., 類別, 功能, 是否皇冠寶石, 分數]，
+# 平均、加權平均、最低分、中位數、各類別的皇冠門檻都能由分佈直接算出，不必回到逐筆資產。
+class ScoringPolicy:
+    def __init__(self, policy=DEFAULT_POLICY):
+        unknown = set(policy) - set(DEFAULT_POLICY)
+        if unknown:
+            raise ValueError(f"未知的評分政策欄位：{'、'.join(sorted(unknown))}")
+        spec = {**DEFAULT_POLICY, **policy}
+        self.spec = spec
+        self.name = spec["name"]
+
+        self.aggregate = spec["aggregate"]
+        if self.aggregate not in AGGREGATE_LABELS:
+            raise ValueError(f"評分政策 aggregate 必須是 {'、'.join(AGGREGATE_LABELS)}：{self.aggregate!r}")
+
+        weights = {**DEFAULT_POLICY["weights"], **spec["weights"]}
+        if set(weights) != {"crown", "other"} or min(weights.values()) <= 0:
+            raise ValueError(f"評分政策 weights 須為 crown / other 兩個大於 0 的權重：{spec['weights']!r}")
+        self._weights = np.array([weights["other"], weights["crown"]])  # 依是否皇冠寶石 (0 / 1) 取權重
+
+        thresholds = _per_category(spec["crown_threshold"], DEFAULT_POLICY["crown_threshold"], "crown_threshold")
+        thresholds = np.array([0 if t is None else t for t in thresholds], dtype=float)
+        levels = np.arange(5)
+        # 各類別「皇冠寶石的哪些分數算低分」(類別 x 分數)；分數 0 (N/A) 不在分佈內
+        self._crown_low = (levels[None, :] < thresholds[:, None]) & (levels[None, :] > 0)
+
+        cutoffs = _per_category(spec["cutoffs"], DEFAULT_POLICY["cutoffs"], "cutoffs")
+        try:
+            self._cutoffs = np.array(cutoffs, dtype=float).reshape(len(CATEGORIES), 3)
+        except ValueError:
+            raise ValueError(f"評分政策 cutoffs 須為 3 個門檻：{spec['cutoffs']!r}") from None
+        if (np.diff(self._cutoffs, axis=1) < 0).any():
+            raise ValueError(f"評分政策 cutoffs 須由小到大：{spec['cutoffs']!r}")
+
+    def _aggregate(self, histogram):
+        # 每格的彙總分數 (..., 類別, 功能)；沒有評分的格子為 0
+        levels = np.arange(histogram.shape[-1])
+        if self.aggregate == "mean":
+            per_class = histogram.sum(axis=-1)
+            totals = (histogram * levels).sum(axis=-1)
+            denominator = (per_class * self._weights).sum(axis=-1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                return np.where(denominator > 0, (totals * self._weights).sum(axis=-1) / denominator, 0.0)
+        combined = histogram.sum(axis=-2)[..., 1:]
+        cumulative = combined.cumsum(axis=-1)
+        n = cumulative[..., -1:]
+        if self.aggregate == "min":
+            return np.where(n[..., 0] > 0, (cumulative == 0).sum(axis=-1) + 1, 0).astype(float)
+        # median：第 (n+1)//2 與 n//2+1 筆 (由小到大) 的平均，n 為奇數時兩者相同
+        lower = (cumulative < (n + 1) // 2).sum(axis=-1) + 1
+        upper = (cumulative < n // 2 + 1).sum(axis=-1) + 1
+        return np.where(n[..., 0] > 0, (lower + upper) / 2, 0.0)
+
+    def classify(self, asset_counts, histogram):
+        # asset_counts：(..., 類別)；histogram：(..., 類別, 功能, 2, 5)；回傳 (狀態, Tier) 陣列 (..., 類別, 功能)
+        histogram = np.asarray(histogram)
+        asset_counts = np.asarray(asset_counts)[..., None]
+        counts = histogram[..., 1:].sum(axis=(-2, -1))
+        crown_lows = (histogram[..., 1, :] * self._crown_low[:, None, :]).sum(axis=-1)
+        tiers = (self._aggregate(histogram)[..., None] >= self._cutoffs[:, None, :]).sum(axis=-1) + 1
+        codes = np.select([asset_counts == 0, counts == 0, crown_lows > 0], [0, 1, 2], tiers + 2)
+        return _STATUSES[codes], _TIERS[codes]
+
+    def matrix(self, asset_counts, histogram):
+        # 與 compute_matrix 相同格式：{(類別, 功能): (狀態, Tier)}
+        statuses, tiers = self.classify(asset_counts, histogram)
+        return {
+            (cat, func): (str(statuses[c, f]), int(tiers[c, f]))
+            for c, cat in enumerate(CATEGORIES)
+            for f, func in enumerate(FUNCTIONS)
+        }
+
+    def describe(self):
+        # 一行摘要 (儀表板顯示用)
+        spec = self.spec
+        parts = [AGGREGATE_LABELS[self.aggregate]]
+        if self.aggregate == "mean" and self._weights[0] != self._weights[1]:
+            parts[0] += f" (皇冠寶石權重 {self._weights[1]:g}、一般 {self._weights[0]:g})"
+
+        def by_category(values, fmt):
+            # 多數類別的值，其餘類別列在括號內
+            labels = [fmt(v) for v in values]
+            common = max(labels, key=labels.count)
+            others = "、".join(f"{c} {label}" for c, label in zip(CATEGORIES, labels) if label != common)
+            return f"{common} ({others})" if others else common
+
+        thresholds = _per_category(spec["crown_threshold"], DEFAULT_POLICY["crown_threshold"], "crown_threshold")
+        if any(thresholds):
+            parts.append("皇冠寶石低於 " + by_category(thresholds, lambda t: f"{t:g}" if t else "不適用") + " 即為風險")
+        else:
+            parts.append("不套用皇冠法則")
+        parts.append("門檻 " + by_category(self._cutoffs, lambda row: " / ".join(f"{v:g}" for v in row)))
+        return "；".join(parts)
@@ -0,0 +1,173 @@
+import contextlib
+import json
+from array import array
+import sys
+import time
+import types
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+# 直方圖的上界 (秒)，Prometheus histogram 的 le 標籤
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SECTION_LABELS = {
+    "rerun": "整次重跑",
+    "matrix": "矩陣計算",
+    "html": "矩陣 HTML",
+    "inventory": "資產清單",
+    "assessment": "評分元件",
+    "import": "檔案匯入",
+    "ai_import": "AI 匯入",
+}
+_DISABLED = contextlib.nullcontext()
+_LEAF_TYPES = {str, bytes, int, float, bool, type(None), array}  # 不再參照其他物件的值
+
+
+def _leaf_size(values, seen):
+    # 容器內全是字串、數字等葉節點時一次去重加總 (不逐一遞迴)；否則回傳 None
+    if not all(type(v) in _LEAF_TYPES for v in values):
+        return None
+    fresh = {id(v): v for v in values if id(v) not in seen}
+    seen.update(fresh)
+    return sum(map(sys.getsizeof, fresh.values()))
+
+
+def _items_size(values, seen):
+    size = _leaf_size(values, seen)
+    if size is None:
+        size = sum(estimate_size(v, _seen=seen) for v in values)
+    return size
+
+
+def estimate_size(obj, exclude=(), _seen=None):
+    # 物件大約佔用的記憶體 (bytes)：numpy / pandas 取資料本身的大小 (含字串)，容器與一般物件遞迴加總；
+    # 同一個物件只算一次，exclude 中的物件 (例如所有 session 共用的資料庫連線) 不列入
+    seen = {id(o) for o in exclude} if _seen is None else _seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, np.ndarray):
+        size = obj.nbytes
+        if obj.dtype == object:
+            size += _items_size(obj.ravel().tolist(), seen)
+        return size
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += _items_size(list(obj), seen) + _items_size(list(obj.values()), seen)
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        size += _items_size(list(obj), seen)
+    elif hasattr(obj, "__dict__") and not isinstance(obj, (type, types.ModuleType, types.FunctionType, types.MethodType)):
+        size += estimate_size(vars(obj), _seen=seen)
+    return size
+
+
+# --- 執行效能量測：以區段 (section) 計時，預設關閉 ---
+# 關閉時 section() 直接回傳共用的空 context，熱路徑上只多一次屬性判斷；
+# 開啟時每個區段保留最近 history 次的時間 (摘要表) 與累計直方圖 (Prometheus 匯出)，
+# 每次重跑結束記錄量測值 (session state 大小、元件數…)，全部另存一份結構化記錄。
+class Profiler:
+    def __init__(self, history=200):
+        self.enabled = False
+        self.samples = {}  # 區段 -> 最近 history 次的秒數
+        self.totals = {}  # 區段 -> [次數, 總秒數, 各 bucket 的次數]
+        self.gauges = {}  # 名稱 -> 數值 或 {標籤: 數值}，最近一次重跑
+        self.events = deque(maxlen=history * 10)  # 結構化記錄
+        self._history = history
+        self._run_start = None
+        self._sizes = {}  # id(物件) -> (版本, bytes)
+
+    def section(self, name):
+        if not self.enabled:
+            return _DISABLED
+        return self._timer(name)
+
+    @contextlib.contextmanager
+    def _timer(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def observe(self, name, seconds):
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples[name] = deque(maxlen=self._history)
+            self.totals[name] = [0, 0.0, [0] * len(BUCKETS)]
+        samples.append(seconds)
+        total = self.totals[name]
+        total[0] += 1
+        total[1] += seconds
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                total[2][i] += 1
+        self.events.append({"ts": round(time.time(), 3), "section": name, "seconds": round(seconds, 6)})
+
+    # --- 整次重跑：頁面最上方 begin()，最下方 end() ---
+    def begin(self):
+        self._run_start = time.perf_counter() if self.enabled else None
+
+    def end(self, **gauges):
+        # 中途 st.rerun() 的重跑不會走到 end()，下一次 begin() 重新開始
+        if self._run_start is None:
+            return
+        self.observe("rerun", time.perf_counter() - self._run_start)
+        self._run_start = None
+        gauges = {k: v for k, v in gauges.items() if v is not None}
+        self.gauges.update(gauges)
+        self.events.append({"ts": round(time.time(), 3), "gauges": gauges})
+
+    def cached_size(self, obj, version, exclude=()):
+        # 大型物件 (例如數萬項資產的共用工作區) 只在 version 變動時重新估算，其餘重跑沿用上次的結果
+        hit = self._sizes.get(id(obj))
+        if hit is None or hit[0] != version:
+            hit = (version, estimate_size(obj, exclude))
+            self._sizes = {id(obj): hit}
+        return hit[1]
+
+    # --- 輸出 ---
+    def summary(self):
+        rows = []
+        for name, samples in self.samples.items():
+            values = np.array(samples) * 1000
+            rows.append((
+                SECTION_LABELS.get(name, name), self.totals[name][0], values[-1],
+                float(np.median(values)), float(np.percentile(values, 95)), values.max(),
+            ))
+        return pd.DataFrame(rows, columns=["區段", "次數", "最近 (ms)", "中位數 (ms)", "p95 (ms)", "最大 (ms)"]).round(1)
+
+    def log_lines(self):
+        # JSON Lines：每行一筆區段時間或一次重跑的量測值
+        return "\n".join(json.dumps(event, ensure_ascii=False) for event in self.events)
+
+    def prometheus(self, labels=None):
+        # Prometheus 文字格式：區段時間為 histogram，量測值為 gauge；labels 為每個指標都加上的標籤
+        def fmt(extra=None):
+            merged = {**(labels or {}), **(extra or {})}
+            if not merged:
+                return ""
+            escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in merged.values())
+            return "{" + ",".join(f'{k}="{v}"' for k, v in zip(merged, escaped)) + "}"
+
+        lines = [
+            "# HELP cdm_section_duration_seconds Time spent in instrumented sections.",
+            "# TYPE cdm_section_duration_seconds histogram",
+        ]
+        for name, (count, total, buckets) in self.totals.items():
+            for bound, hits in zip(BUCKETS, buckets):
+                lines.append(f"cdm_section_duration_seconds_bucket{fmt({'section': name, 'le': bound})} {hits}")
+            lines.append(f"cdm_section_duration_seconds_bucket{fmt({'section': name, 'le': '+Inf'})} {count}")
+            lines.append(f"cdm_section_duration_seconds_sum{fmt({'section': name})} {total:.6f}")
+            lines.append(f"cdm_section_duration_seconds_count{fmt({'section': name})} {count}")
+        for name, value in self.gauges.items():
+            lines.append(f"# TYPE cdm_{name} gauge")
+            if isinstance(value, dict):
+                lines.extend(f"cdm_{name}{fmt({'key': key})} {v}" for key, v in value.items())
+            else:
+                lines.append(f"cdm_{name}{fmt()} {value}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,164 @@
+from functools import lru_cache
+
+import pandas as pd
+
+from .matrix import CATEGORIES, FUNCTIONS
+
+# --- 矩陣樣式：classic = app.py 的淺色版，ai = app_ai.py 的深色強化版 ---
+THEMES = {
+    "classic": """
+    <style>
+        table {width: 100%; border-collapse: separate; border-spacing: 3px;}
+        th {background-color: #333; color: white; padding: 8px; font-size: 0.85em;}
+        td {
+            padding: 5px; height: 70px; text-align: center; 
+            border-radius: 6px; font-weight: bold; font-size: 0.9em; color: black;
+            box-shadow: 1px 1px 3px rgba(0,0,0,0.1);
+        }
+        .cat-head {background-color: #555; color: white; width: 15%;}
+        
+        .s-no-asset {background-color: #e0e0e0; color: #aaa; border: 1px dashed #ccc;}
+        .s-pending {background-color: #f8f9fa; color: #888;}
+        .s-crown-risk {background-color: #ff4b4b; color: white; border: 3px solid #ffd700; animation: pulse 2s infinite;}
+        .s-t1 {background-color: #ffcccc; border: 1px solid red;}
+        .s-t2 {background-color: #fff3cd; border: 1px solid orange;}
+        .s-t3 {background-color: #d1e7dd; border: 1px solid green;}
+        .s-t4 {background-color: #fff3cd; border: 2px solid gold;}
+        
+        @keyframes pulse { 0% {box-shadow: 0 0 0 0 rgba(255, 75, 75, 0.7);} 70% {box-shadow: 0 0 0 10px rgba(255, 75, 75, 0);} 100% {box-shadow: 0 0 0 0 rgba(255, 75, 75, 0);} }
+    </style>
+""",
+    "ai": """
+    <style>
+        table {width: 100%; border-collapse: separate; border-spacing: 4px;}
+        th {background-color: #2b2d42; color: white; padding: 10px; font-size: 0.9em; text-transform: uppercase;}
+        td {
+            padding: 8px; height: 80px; text-align: center; 
+            border-radius: 8px; font-weight: bold; font-size: 0.95em; color: black;
+            box-shadow: 2px 2px 5px rgba(0,0,0,0.2); transition: all 0.3s ease;
+        }
+        td:hover {transform: scale(1.02);}
+        .cat-head {background-color: #4a4e69; color: white; width: 15%;}
+        
+        .s-no-asset {background-color: #edf2f4; color: #8d99ae; border: 1px dashed #8d99ae;}
+        .s-pending {background-color: #f8f9fa; color: #6c757d;}
+        .s-crown-risk {background-color: #d90429; color: white; border: 3px solid #ffd700; animation: pulse 1.5s infinite;}
+        .s-t1 {background-color: #ef233c; color: white;}
+        .s-t2 {background-color: #ffb703; color: black;}
+        .s-t3 {background-color: #52b788; color: white;}
+        .s-t4 {background-color: #7209b7; color: white; border: 2px solid #ffd700;}
+        
+        @keyframes pulse { 0% {box-shadow: 0 0 0 0 rgba(217, 4, 41, 0.7);} 70% {box-shadow: 0 0 0 10px rgba(217, 4, 41, 0);} 100% {box-shadow: 0 0 0 0 rgba(217, 4, 41, 0);} }
+    </style>
+""",
+}
+
+# 各狀態的 (CSS class, 顯示文字)；tier-N 狀態依等級套用 s-tN
+_STATUS_CELLS = {
+    "no_asset": ("s-no-asset", "無資產"),
+    "not_assessed": ("s-pending", "待評估"),
+    "crown_risk": ("s-crown-risk", "⚠️ 關鍵風險"),
+}
+
+
+# 原生圖表的 (底色, 文字色)，取自各樣式的 CSS
+CHART_COLORS = {
+    "classic": {
+        "no_asset": ("#e0e0e0", "#aaa"),
+        "not_assessed": ("#f8f9fa", "#888"),
+        "crown_risk": ("#ff4b4b", "white"),
+        "tier-1": ("#ffcccc", "black"),
+        "tier-2": ("#fff3cd", "black"),
+        "tier-3": ("#d1e7dd", "black"),
+        "tier-4": ("#fff3cd", "black"),
+    },
+    "ai": {
+        "no_asset": ("#edf2f4", "#8d99ae"),
+        "not_assessed": ("#f8f9fa", "#6c757d"),
+        "crown_risk": ("#d90429", "white"),
+        "tier-1": ("#ef233c", "white"),
+        "tier-2": ("#ffb703", "black"),
+        "tier-3": ("#52b788", "white"),
+        "tier-4": ("#7209b7", "white"),
+    },
+}
+
+
+def matrix_key(matrix):
+    # 25 格 (狀態, 等級) 依列、欄順序組成的 tuple，作為快取鍵
+    return tuple(matrix[(cat, func)] for cat in CATEGORIES for func in FUNCTIONS)
+
+
+# --- 風險矩陣 HTML：樣式與表頭只在建立時組一次 ---
+# 格子依 (狀態, 等級) 序列化一次，列依 5 格內容快取，整張表依 25 格內容快取 (LRU)，
+# 格子沒變就不會重新組字串。stylesheet 與 table() 分開，頁面可以只送一次 CSS。
+class MatrixRenderer:
+    def __init__(self, theme="classic", cache_size=256):
+        if theme not in THEMES:
+            raise ValueError(f"未知的矩陣樣式: {theme}")
+        self.theme = theme
+        self.stylesheet = THEMES[theme]
+        self._head = (
+            "    <table>\n        <tr><th>CDM</th>\n        "
+            + "".join(f"<th>{f}</th>" for f in FUNCTIONS)
+            + "</tr>"
+        )
+        self._cell = lru_cache(maxsize=None)(self.cell)
+        self._row = lru_cache(maxsize=cache_size * len(CATEGORIES))(self._build_row)
+        self._table = lru_cache(maxsize=cache_size)(self._build_table)
+
+    @staticmethod
+    def cell(status, tier):
+        css_class, display_text = _STATUS_CELLS.get(status, (f"s-t{tier}", f"Tier {tier}"))
+        return f"<td class='{css_class}'>{display_text}</td>"
+
+    def _build_row(self, cat, cells):
+        return f"<tr><td class='cat-head'>{cat}</td>" + "".join(self._cell(*cell) for cell in cells) + "</tr>"
+
+    def _build_table(self, key):
+        n = len(FUNCTIONS)
+        rows = (self._row(cat, key[c * n:(c + 1) * n]) for c, cat in enumerate(CATEGORIES))
+        return self._head + "".join(rows) + "</table>"
+
+    def table(self, matrix):
+        # 只有表格 (不含 CSS)；matrix：{(類別, 功能): (狀態, 等級)}
+        return self._table(matrix_key(matrix))
+
+    def render(self, matrix):
+        # CSS + 表格，可直接交給 st.markdown
+        return self.stylesheet + self.table(matrix)
+
+    def cache_info(self):
+        return self._table.cache_info()
+
+    def chart(self, matrix):
+        # 原生圖表 (Altair heatmap)：只送 25 筆資料，不送 HTML 字串
+        try:
+            import altair as alt
+        except ImportError as e:
+            raise ImportError("原生圖表需要 altair：pip install altair") from e
+        colors = CHART_COLORS[self.theme]
+        data = pd.DataFrame([
+            {"類別": cat, "功能": func, "狀態": status, "顯示": self._label(status, tier)}
+            for cat in CATEGORIES
+            for func in FUNCTIONS
+            for status, tier in [matrix[(cat, func)]]
+        ])
+        domain = list(colors)
+        base = alt.Chart(data).encode(
+            x=alt.X("功能:N", sort=FUNCTIONS, title=None, axis=alt.Axis(orient="top", labelAngle=0)),
+            y=alt.Y("類別:N", sort=CATEGORIES, title=None),
+        )
+        cells = base.mark_rect(cornerRadius=6, stroke="white", strokeWidth=3).encode(
+            color=alt.Color("狀態:N", scale=alt.Scale(domain=domain, range=[colors[s][0] for s in domain]), legend=None),
+            tooltip=["類別", "功能", "顯示"],
+        )
+        labels = base.mark_text(fontWeight="bold").encode(
+            text="顯示:N",
+            color=alt.Color("狀態:N", scale=alt.Scale(domain=domain, range=[colors[s][1] for s in domain]), legend=None),
+        )
+        return (cells + labels).properties(height=70 * len(CATEGORIES)).resolve_scale(color="independent")
+
+    @staticmethod
+    def _label(status, tier):
+        return _STATUS_CELLS.get(status, (None, f"Tier {tier}"))[1]
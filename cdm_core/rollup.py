@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+
+from .matrix import CATEGORIES, FUNCTIONS, RISK_STATUSES, classify_cells
+
+UNGROUPED = "未分組"
+
+
+def group_of(unit):
+    # 工作區命名慣例「群組/單位」，沒有 / 的歸入未分組
+    group, sep, _ = unit.partition("/")
+    return group.strip() if sep and group.strip() else UNGROUPED
+
+
+def _as_matrix(statuses, tiers):
+    return {
+        (cat, func): (str(statuses[c, f]), int(tiers[c, f]))
+        for c, cat in enumerate(CATEGORIES)
+        for f, func in enumerate(FUNCTIONS)
+    }
+
+
+# --- 多單位彙總：每個單位一組 (類別資產數, 總和, 筆數, 皇冠低分筆數)，群組 / 全企業只做陣列加總 ---
+# 加總後再以 classify_cells 判定，等同把所有單位的資產合併後套用 calculate_cell_status：
+# 平均 = 總和 / 筆數，任一單位有皇冠低分 (crown_lows > 0) 即為 crown_risk。
+class Rollup:
+    def __init__(self, units, asset_counts, sums, counts, crown_lows, groups=None):
+        self.units = list(units)
+        self.groups = list(groups) if groups is not None else [group_of(u) for u in self.units]
+        self.asset_counts = np.asarray(asset_counts, dtype=np.int64).reshape(len(self.units), len(CATEGORIES))
+        shape = (len(self.units), len(CATEGORIES), len(FUNCTIONS))
+        self.sums = np.asarray(sums, dtype=np.int64).reshape(shape)
+        self.counts = np.asarray(counts, dtype=np.int64).reshape(shape)
+        self.crown_lows = np.asarray(crown_lows, dtype=np.int64).reshape(shape)
+        self.group_names = sorted(set(self.groups), key=lambda g: (g == UNGROUPED, g))
+        group_index = {g: i for i, g in enumerate(self.group_names)}
+        self._group_codes = np.array([group_index[g] for g in self.groups], dtype=np.int64)
+        self._unit_index = {u: i for i, u in enumerate(self.units)}
+
+    @classmethod
+    def from_stores(cls, stores):
+        # stores：{單位名稱: AssessmentStore}，直接取用各 store 增量維護的矩陣快取
+        caches = [store.matrix_cache for store in stores.values()]
+        return cls(
+            list(stores),
+            [c.asset_counts for c in caches],
+            [c.sums for c in caches],
+            [c.counts for c in caches],
+            [c.crown_lows for c in caches],
+        )
+
+    @classmethod
+    def from_workspaces(cls, db):
+        return cls(*db.unit_aggregates())
+
+    def group_aggregates(self):
+        # (G, ...) 的群組統計量：依群組代碼做一次 np.add.at
+        out = []
+        for values in (self.asset_counts, self.sums, self.counts, self.crown_lows):
+            total = np.zeros((len(self.group_names),) + values.shape[1:], dtype=np.int64)
+            np.add.at(total, self._group_codes, values)
+            out.append(total)
+        return out
+
+    def unit_matrix(self, unit):
+        u = self._unit_index[unit]
+        return _as_matrix(*classify_cells(self.asset_counts[u], self.sums[u], self.counts[u], self.crown_lows[u]))
+
+    def group_matrix(self, group):
+        members = self._group_codes == self.group_names.index(group)
+        return _as_matrix(*classify_cells(*(values[members].sum(axis=0) for values in self._stacked())))
+
+    def enterprise_matrix(self):
+        return _as_matrix(*classify_cells(*(values.sum(axis=0) for values in self._stacked())))
+
+    def _stacked(self):
+        return self.asset_counts, self.sums, self.counts, self.crown_lows
+
+    def members(self, group):
+        return [u for u, g in zip(self.units, self.groups) if g == group]
+
+    def _summary(self, names, aggregates, extra=None):
+        statuses, _ = classify_cells(*aggregates)
+        frame = pd.DataFrame({"名稱": names, "資產數": aggregates[0].sum(axis=1)})
+        if extra is not None:
+            frame.insert(1, *extra)
+        for status in RISK_STATUSES:
+            frame[status] = (statuses == status).sum(axis=(1, 2))
+        frame["已評估格數"] = ((statuses != "no_asset") & (statuses != "not_assessed")).sum(axis=(1, 2))
+        return frame
+
+    def group_summary(self):
+        # 每個群組一列：單位數、資產數、各風險狀態的格數
+        units = np.bincount(self._group_codes, minlength=len(self.group_names))
+        return self._summary(self.group_names, self.group_aggregates(), ("單位數", units))
+
+    def unit_summary(self, group=None):
+        keep = np.ones(len(self.units), dtype=bool) if group is None else self._group_codes == self.group_names.index(group)
+        names = [u for u, k in zip(self.units, keep) if k]
+        return self._summary(names, [values[keep] for values in self._stacked()])
@@ -0,0 +1,61 @@
+from array import array
+
+import numpy as np
+
+
+def _normalize(text):
+    return str(text).casefold()
+
+
+# --- 資產名稱搜尋索引：trigram 倒排索引 (子字串搜尋) + 排序陣列 (前綴搜尋) ---
+# 以 store 的資產 id 為單位、只會往後追加：新增的資產在下一次查詢前併入，
+# 已刪除的資產由 store 在查詢後以 alive 遮罩排除；store 重新編號 (compact) 時整個重建。
+class NameIndex:
+    def __init__(self):
+        self._names = []  # id -> 正規化名稱
+        self._postings = {}  # trigram -> array('q') 的 id (遞增)
+        self._sorted = None  # (排序後的名稱, 對應 id)，前綴查詢時才建立
+
+    def __len__(self):
+        return len(self._names)
+
+    def extend(self, names):
+        # names：接在目前最後一個 id 之後的資產名稱
+        start = len(self._names)
+        for i, name in enumerate(names, start):
+            key = _normalize(name)
+            self._names.append(key)
+            for gram in {key[k:k + 3] for k in range(len(key) - 2)}:
+                postings = self._postings.get(gram)
+                if postings is None:
+                    postings = self._postings[gram] = array("q")
+                postings.append(i)
+        if len(self._names) > start:
+            self._sorted = None
+
+    def search(self, text):
+        # 回傳名稱符合的 id (遞增排序)：3 個字以上為子字串比對，較短的查詢比對名稱開頭
+        query = _normalize(text).strip()
+        if len(query) < 3:
+            return self._prefix(query)
+        postings = [self._postings.get(query[k:k + 3]) for k in range(len(query) - 2)]
+        if any(p is None for p in postings):
+            return np.zeros(0, dtype=np.int64)
+        postings.sort(key=len)
+        ids = np.frombuffer(postings[0], dtype=np.int64)
+        for p in postings[1:]:
+            if not len(ids):
+                break
+            ids = ids[np.isin(ids, np.frombuffer(p, dtype=np.int64), assume_unique=True)]
+        # 含有所有 trigram 不代表是子字串，最後只對候選名稱確認一次
+        return ids[np.fromiter((query in self._names[i] for i in ids.tolist()), dtype=bool, count=len(ids))]
+
+    def _prefix(self, query):
+        if self._sorted is None:
+            names = np.array(self._names, dtype=str)
+            order = np.argsort(names, kind="stable")
+            self._sorted = (names[order], order.astype(np.int64))
+        names, ids = self._sorted
+        lo = np.searchsorted(names, query, side="left")
+        hi = np.searchsorted(names, query + "\U0010ffff", side="left")
+        return np.sort(ids[lo:hi])
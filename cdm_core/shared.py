@@ -0,0 +1,142 @@
+import threading
+
+from .matrix import CATEGORIES, FUNCTIONS
+
+ALL_CELLS = frozenset((c, f) for c in CATEGORIES for f in FUNCTIONS)
+
+
+# --- 多人共用工作區：同一個 process 內所有 session 共用一個 AssessmentStore ---
+# 寫入一律經過這裡 (以 lock 串行化)，每次寫入版本 +1，並記下每個 (資產, 功能) 最後被寫入的版本；
+# 送出評分時帶著「畫面讀取時的版本」(base)，期間被別人改成其他值的格子視為衝突、不寫入 (樂觀鎖)；
+# 自己在 base 之後寫過的格子不算衝突。
+# 異動記錄 (版本, 作者, 矩陣格子, 資產) 給其他 session 輪詢：平時只比對版本號，有變動才取之後的記錄。
+# 讀取也要經過這裡 (read / matrix / snapshot)：寫入會更新矩陣快取、刪除資產時可能重新編號 id，
+# 不持有 lock 直接讀 store 可能讀到一半的狀態，或拿到已指向其他資產的 id。
+class SharedWorkspace:
+    def __init__(self, store, log_size=10000):
+        self.store = store
+        self.version = 0
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._cell_versions = {}  # (資產名稱, 功能) -> (最後寫入的版本, 作者)，資產刪除時一併移除
+        self._asset_versions = {}  # 資產名稱 -> 最後新增的版本，資產刪除時一併移除
+        self._log = []  # [(版本, 作者, 矩陣格子, 資產名稱)]，版本連續遞增
+        self._log_size = log_size
+
+    def _commit(self, author, cells, names):
+        # 呼叫端需持有 lock
+        self.version += 1
+        self._log.append((self.version, author, frozenset(cells), frozenset(names)))
+        if len(self._log) > self._log_size:
+            del self._log[:len(self._log) - self._log_size // 2]
+        self._changed.notify_all()
+        return self.version
+
+    # --- 資產 ---
+    def add_asset(self, name, category, is_crown, author=None):
+        with self._lock:
+            if not self.store.add_asset(name, category, is_crown):
+                return False
+            # 類別多一項資產，會影響該類別每個功能的格子 (例如 no_asset -> not_assessed)
+            version = self._commit(author, ((category, f) for f in FUNCTIONS), [name])
+            self._asset_versions[name] = version
+            return True
+
+    def add_assets(self, assets, author=None):
+        with self._lock:
+            names = [name for name in dict.fromkeys(assets["資產名稱"]) if not self.store.has_asset(name)]
+            added = self.store.add_assets(assets)
+            if added:
+                categories = {self.store.category_of(name) for name in names}
+                version = self._commit(author, ((c, f) for c in categories for f in FUNCTIONS), names)
+                self._asset_versions.update((name, version) for name in names)
+            return added
+
+    def remove_assets(self, names, author=None):
+        with self._lock:
+            names = [name for name in names if self.store.has_asset(name)]
+            categories = {self.store.category_of(name) for name in names}
+            removed = self.store.remove_assets(names)
+            if removed:
+                self._commit(author, ((c, f) for c in categories for f in FUNCTIONS), names)
+                # 已刪除資產的評分一律視為衝突 (key 不在 store)，重新新增時會記下新的版本，不必保留舊記錄
+                for name in names:
+                    self._asset_versions.pop(name, None)
+                    for function in FUNCTIONS:
+                        self._cell_versions.pop((name, function), None)
+            return removed
+
+    # --- 評分 ---
+    def update(self, scores, base=None, author=None):
+        # scores：{(資產名稱, 功能): 分數}；base：讀取畫面資料時的版本 (None 為不檢查，直接覆寫)
+        # 回傳衝突 {(資產名稱, 功能): 目前分數}，資產已被刪除時為 None；其餘評分照常寫入
+        with self._lock:
+            conflicts, changed = {}, {}
+            for key, score in scores.items():
+                if key not in self.store:
+                    conflicts[key] = None
+                    continue
+                current = self.store[key]
+                if current == score:
+                    continue
+                if base is not None:
+                    version, writer = self._cell_versions.get(key, (0, None))
+                    if (version > base and (writer != author or author is None)) or self._asset_versions.get(key[0], 0) > base:
+                        conflicts[key] = current
+                        continue
+                changed[key] = score
+            if changed:
+                self.store.update(changed)
+                cells = {(self.store.category_of(name), function) for name, function in changed}
+                version = self._commit(author, cells, {name for name, _ in changed})
+                self._cell_versions.update((key, (version, author)) for key in changed)
+            return conflicts
+
+    # --- 一致的讀取：持有 lock 期間沒有寫入 ---
+    def read(self, fn, *args):
+        # 以 store 執行唯讀的 fn(store, *args)，回傳 (版本, 結果)；版本可作為之後 update 的 base
+        # 結果須是複本 (例如 store.rows、assessment_grid)，不可留著 store 的 id 在 lock 外使用
+        with self._lock:
+            return self.version, fn(self.store, *args)
+
+    def has_assets(self, names):
+        # 名稱是否已在清單 (例如匯入時每批檢查一次)
+        with self._lock:
+            return self.store.has_assets(names)
+
+    def matrix(self, policy=None):
+        # 矩陣快取只在持有 lock 時判定、更新；回傳複本，之後的異動不影響
+        with self._lock:
+            return dict(self.store.matrix(policy))
+
+    def verify(self, policy=None):
+        with self._lock:
+            return self.store.verify(policy)
+
+    def snapshot(self, policy=None):
+        # 矩陣與資產在同一個版本 (例如匯出報表)
+        with self._lock:
+            return self.store.matrix(policy), self.store.snapshot()
+
+    # --- 異動通知 ---
+    def changes_since(self, version, author=None):
+        # 回傳 (目前版本, 異動的矩陣格子, 異動的資產)；author 自己的寫入不列入
+        # version 早於保留的記錄時無法得知細節，回傳全部格子 (整個矩陣重新整理)
+        with self._lock:
+            current = self.version
+            if version >= current:
+                return current, set(), set()
+            if not self._log or self._log[0][0] > version + 1:
+                return current, set(ALL_CELLS), set()
+            cells, names = set(), set()
+            for _, who, changed_cells, changed_names in self._log[version + 1 - self._log[0][0]:]:
+                if author is None or who != author:
+                    cells |= changed_cells
+                    names |= changed_names
+            return current, cells, names
+
+    def wait(self, version, timeout=None):
+        # 阻塞到版本超過 version (或逾時)，回傳目前版本；給不經過 Streamlit 輪詢的使用端 (例如負載測試)
+        with self._changed:
+            self._changed.wait_for(lambda: self.version > version, timeout)
+            return self.version
@@ -0,0 +1,271 @@
+import numpy as np
+import pandas as pd
+
+from .matrix import CATEGORIES, FUNCTIONS, MatrixCache
+from .search import NameIndex
+
+_CATEGORY_INDEX = {c: i for i, c in enumerate(CATEGORIES)}
+_FUNCTION_INDEX = {f: i for i, f in enumerate(FUNCTIONS)}
+
+
+# --- 緊湊的資產 / 評分儲存：每項資產一個整數 id ---
+# 分數為 int8 的 N x 5 矩陣、類別為 categorical 代碼、皇冠寶石為 bool 陣列。
+# 對頁面提供與原本 assessments dict 相同的 get / set 語意：key = (資產名稱, 功能)。
+# 陣列預留容量、滿了才加倍 (新增為攤銷 O(1))；名稱 -> id 的 dict 即重複檢查用的索引。
+class AssessmentStore:
+    def __init__(self, capacity=64):
+        self._ids = {}  # 資產名稱 -> id
+        self._n = 0  # 已使用的 id 數 (含已刪除)
+        self._names = np.empty(capacity, dtype=object)
+        self._category = np.empty(capacity, dtype=np.int8)
+        self._crown = np.empty(capacity, dtype=bool)
+        self._scores = np.zeros((capacity, len(FUNCTIONS)), dtype=np.int8)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._frame = None
+        self._frame_upto = 0  # _frame 涵蓋到的 id，之後新增的資產在讀取 assets 時才併入
+        self.matrix_cache = MatrixCache()
+        self._name_index = None  # 名稱搜尋索引，第一次搜尋時才建立
+        self.journal = None  # 持久層 (例如 Workspace)：每次異動只寫入有變更的列
+
+    @classmethod
+    def from_arrays(cls, names, categories, crowns, scores):
+        # 由既有資料 (例如資料庫) 一次建立：categories 為 CATEGORIES 的代碼，scores 為 N x 5
+        store = cls(capacity=0)
+        n = len(names)
+        store._names = np.asarray(names, dtype=object)
+        store._category = np.asarray(categories, dtype=np.int8)
+        store._crown = np.asarray(crowns, dtype=bool)
+        store._scores = np.asarray(scores, dtype=np.int8).reshape(n, len(FUNCTIONS))
+        store._alive = np.ones(n, dtype=bool)
+        store._n = n
+        store._ids = {name: i for i, name in enumerate(store._names.tolist())}
+        if len(store._ids) != n:
+            raise ValueError("資產名稱重複")
+        store.matrix_cache = MatrixCache.from_arrays(
+            store._category.astype(np.int64), store._crown, store._scores.astype(np.int64))
+        return store
+
+    # --- 資產 ---
+    def __len__(self):
+        return len(self._ids)
+
+    def has_asset(self, name):
+        return name in self._ids
+
+    def has_assets(self, names):
+        return [name in self._ids for name in names]
+
+    def category_of(self, name):
+        return CATEGORIES[self._category[self._ids[name]]]
+
+    def _reserve(self, extra):
+        need = self._n + extra
+        capacity = len(self._alive)
+        if need <= capacity:
+            return
+        while capacity < need:
+            capacity = max(capacity * 2, 64)
+
+        def grow(array):
+            grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+            grown[:self._n] = array[:self._n]
+            return grown
+
+        self._names = grow(self._names)
+        self._category = grow(self._category)
+        self._crown = grow(self._crown)
+        self._scores = grow(self._scores)
+        self._alive = grow(self._alive)
+
+    def add_asset(self, name, category, is_crown):
+        # 單筆新增：索引查重 + 寫入預留的位置，不複製既有資料
+        if name in self._ids:
+            return False
+        if category not in _CATEGORY_INDEX:
+            raise ValueError(f"未知的資產類別: {category}")
+        self._reserve(1)
+        i = self._n
+        self._names[i] = name
+        self._category[i] = _CATEGORY_INDEX[category]
+        self._crown[i] = bool(is_crown)
+        self._alive[i] = True
+        self._ids[name] = i
+        self._n += 1
+        self.matrix_cache.add_asset(category, bool(is_crown))
+        if self.journal is not None:
+            self.journal.add_assets([name], [_CATEGORY_INDEX[category]], [bool(is_crown)])
+        return True
+
+    def add_assets(self, assets):
+        # 已存在或同批重複的名稱會略過 (保留第一筆)，回傳實際新增筆數
+        names, categories, crowns = [], [], []
+        seen = set()
+        for name, category, is_crown in zip(assets['資產名稱'], assets['類別'], assets['皇冠寶石']):
+            if name in self._ids or name in seen:
+                continue
+            if category not in _CATEGORY_INDEX:
+                raise ValueError(f"未知的資產類別: {category}")
+            seen.add(name)
+            names.append(name)
+            categories.append(_CATEGORY_INDEX[category])
+            crowns.append(bool(is_crown))
+        if not names:
+            return 0
+
+        self._reserve(len(names))
+        start, end = self._n, self._n + len(names)
+        self._ids.update((name, start + i) for i, name in enumerate(names))
+        self._names[start:end] = names
+        self._category[start:end] = categories
+        self._crown[start:end] = crowns
+        self._alive[start:end] = True
+        self._n = end
+        for category, is_crown in zip(categories, crowns):
+            self.matrix_cache.add_asset(CATEGORIES[category], is_crown)
+        if self.journal is not None:
+            self.journal.add_assets(names, categories, crowns)
+        return len(names)
+
+    def remove_assets(self, names):
+        removed = []
+        for name in names:
+            i = self._ids.pop(name, None)
+            if i is None:
+                continue
+            self.matrix_cache.remove_asset(CATEGORIES[self._category[i]], self._crown[i], self._scores[i].tolist())
+            self._scores[i] = 0
+            self._alive[i] = False
+            removed.append(name)
+        if removed:
+            self._frame = None
+            if self.journal is not None:
+                self.journal.remove_assets(removed)
+            # 已刪除的 id 過多時重新編號，避免陣列只增不減
+            if self._n > 1024 and len(self._ids) < self._n // 2:
+                self._compact()
+        return len(removed)
+
+    def _compact(self):
+        keep = np.flatnonzero(self._alive[:self._n])
+        self._names = self._names[keep]
+        self._category = self._category[keep]
+        self._crown = self._crown[keep]
+        self._scores = self._scores[keep]
+        self._alive = np.ones(len(keep), dtype=bool)
+        self._n = len(keep)
+        self._ids = {name: i for i, name in enumerate(self._names)}
+        self._name_index = None  # id 已重新編號
+
+    def _alive_ids(self, start=0):
+        return start + np.flatnonzero(self._alive[start:self._n])
+
+    def _build_frame(self, ids):
+        return pd.DataFrame({
+            "資產名稱": self._names[ids],
+            "類別": pd.Categorical.from_codes(self._category[ids], categories=CATEGORIES),
+            "皇冠寶石": self._crown[ids],
+        })
+
+    @property
+    def assets(self):
+        # 與原本 st.session_state.assets 相同欄位的 DataFrame，資產異動前重複使用同一份；
+        # 只有新增時，把新增的部分一次併入 (連續新增多筆只付一次合併的成本)；
+        # 先記下 _n：共用 store 時其他 session 可能在建立期間新增資產，留到下一次再併入
+        n = self._n
+        frame = self._frame
+        if frame is None or not len(frame):
+            frame = self._build_frame(np.flatnonzero(self._alive[:n]))
+        elif self._frame_upto < n:
+            tail = self._build_frame(self._frame_upto + np.flatnonzero(self._alive[self._frame_upto:n]))
+            frame = pd.concat([frame, tail], ignore_index=True)
+        self._frame, self._frame_upto = frame, n
+        return frame
+
+    def find(self, text="", categories=None, crown_only=False):
+        # 資產清單的伺服器端篩選：名稱 (經 NameIndex)、類別、皇冠寶石，回傳符合且仍存在的 id (依新增順序)
+        if text.strip():
+            if self._name_index is None:
+                self._name_index = NameIndex()
+            self._name_index.extend(self._names[len(self._name_index):self._n].tolist())
+            ids = self._name_index.search(text)
+        else:
+            ids = np.arange(self._n)
+        keep = self._alive[ids]
+        if categories is not None:
+            keep &= np.isin(self._category[ids], [_CATEGORY_INDEX[c] for c in categories])
+        if crown_only:
+            keep &= self._crown[ids]
+        return ids[keep]
+
+    def assets_at(self, ids):
+        # 指定 id 的資產 (與 assets 相同欄位)：分頁表格只建立當頁的 DataFrame
+        return self._build_frame(ids)
+
+    def ids_in_category(self, category):
+        return np.flatnonzero(self._alive[:self._n] & (self._category[:self._n] == _CATEGORY_INDEX[category]))
+
+    def rows(self, ids):
+        # 回傳指定 id 的 (名稱, 皇冠寶石, 分數矩陣)
+        return self._names[ids], self._crown[ids], self._scores[ids]
+
+    def snapshot(self):
+        # 目前資產的 (名稱, 類別代碼, 皇冠寶石, 分數) 複本 (依新增順序)，之後的異動不影響 (例如匯出報表)
+        ids = self._alive_ids()
+        return self._names[ids], self._category[ids], self._crown[ids], self._scores[ids]
+
+    def arrays(self):
+        # 給向量化引擎 (aggregate_cells) 使用的 (類別代碼, 皇冠寶石, 分數)
+        ids = self._alive_ids()
+        return self._category[ids].astype(np.int64), self._crown[ids], self._scores[ids].astype(np.int64)
+
+    # --- 評分：與原本 dict 相同的 get / set 語意 ---
+    def _locate(self, key):
+        name, function = key
+        return self._ids[name], _FUNCTION_INDEX[function]
+
+    def __contains__(self, key):
+        name, function = key
+        return name in self._ids and function in _FUNCTION_INDEX
+
+    def __getitem__(self, key):
+        i, f = self._locate(key)
+        return int(self._scores[i, f])
+
+    def get(self, key, default=0):
+        if key not in self:
+            return default
+        return self[key] or default
+
+    def _set(self, key, score):
+        # 回傳是否有變更
+        i, f = self._locate(key)
+        old = int(self._scores[i, f])
+        if old == score:
+            return False
+        self._scores[i, f] = score
+        self.matrix_cache.update_score(CATEGORIES[self._category[i]], self._crown[i], key[1], old, score)
+        return True
+
+    def __setitem__(self, key, score):
+        if self._set(key, score) and self.journal is not None:
+            self.journal.set_scores([(key[0], _FUNCTION_INDEX[key[1]], score)])
+
+    def update(self, scores):
+        # 多筆評分一次寫入持久層 (例如批次表格送出)
+        changed = [(key[0], _FUNCTION_INDEX[key[1]], score) for key, score in scores.items() if self._set(key, score)]
+        if changed and self.journal is not None:
+            self.journal.set_scores(changed)
+
+    def items(self):
+        # 只列出有評分 (> 0) 的項目
+        ids, fs = np.nonzero(self._scores[:self._n] * self._alive[:self._n, None])
+        for i, f in zip(ids, fs):
+            yield (self._names[i], FUNCTIONS[f]), int(self._scores[i, f])
+
+    # --- 矩陣 ---
+    def matrix(self, policy=None):
+        return self.matrix_cache.matrix(policy)
+
+    def verify(self, policy=None):
+        # 一致性檢查：增量快取 vs. 以資產表 + 評分完整重算
+        return self.matrix_cache.verify(self.assets, dict(self.items()), policy)
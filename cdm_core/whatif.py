@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+
+from .matrix import CATEGORIES, FUNCTIONS, classify_cells
+
+_CATEGORY_INDEX = {c: i for i, c in enumerate(CATEGORIES)}
+_FUNCTION_INDEX = {f: i for i, f in enumerate(FUNCTIONS)}
+_N_CELLS = len(CATEGORIES) * len(FUNCTIONS)
+
+
+# --- What-if 模擬：假設性的分數調整直接套在每格統計量上，不動到 store ---
+# 每個調整 (資產, 功能, 新分數) 只改變一格的 (總和, 筆數, 皇冠低分筆數)；
+# 方案 = 調整的子集合。S 個方案的統計量 = 目前統計量 + 方案矩陣 (S x A) @ 調整量 (A x 75)，
+# 再以 classify_cells 一次判定 S 個矩陣 (與儀表板相同的規則)。候選方案以格子為單位時，
+# 同一格的調整量先加總，改以 (S x G) @ (G x 75) 計算，記憶體與資產數無關。
+# 建立時複製統計量與各類別資產的分數，之後不再讀 store (共用工作區時在 SharedWorkspace.read 內建立)。
+class WhatIf:
+    def __init__(self, store):
+        cache = store.matrix_cache
+        self._rows = {category: store.rows(store.ids_in_category(category)) for category in CATEGORIES}
+        self.asset_counts = cache.asset_counts.copy()
+        self.base = np.stack([cache.sums, cache.counts, cache.crown_lows]).reshape(1, 3 * _N_CELLS)
+        self.base_statuses, _ = classify_cells(cache.asset_counts, cache.sums, cache.counts, cache.crown_lows)
+
+    def upgrades(self, target=3, crown_only=True, cells=None, cost_per_step=1):
+        # 候選調整：已評分但低於 target 的 (資產, 功能) 提升到 target，成本 = 提升級數 x cost_per_step
+        # cells：只考慮這些格子 [(類別, 功能)]，None 為全部
+        frames = []
+        for category in CATEGORIES:
+            names, crown, scores = self._rows[category]
+            for f, function in enumerate(FUNCTIONS):
+                if cells is not None and (category, function) not in cells:
+                    continue
+                old = scores[:, f].astype(np.int64)
+                keep = (old > 0) & (old < target)
+                if crown_only:
+                    keep &= crown
+                if keep.any():
+                    frames.append(pd.DataFrame({
+                        "資產名稱": names[keep],
+                        "類別": category,
+                        "功能": function,
+                        "皇冠寶石": crown[keep],
+                        "目前": old[keep],
+                        "目標": target,
+                        "成本": (target - old[keep]) * cost_per_step,
+                    }))
+        if not frames:
+            return pd.DataFrame(columns=["資產名稱", "類別", "功能", "皇冠寶石", "目前", "目標", "成本"])
+        return pd.concat(frames, ignore_index=True)
+
+    def _cells(self, actions):
+        # 每個調整所在的格子編號 (類別 x 5 + 功能)
+        return (
+            actions["類別"].map(_CATEGORY_INDEX).to_numpy(dtype=np.int64) * len(FUNCTIONS)
+            + actions["功能"].map(_FUNCTION_INDEX).to_numpy(dtype=np.int64)
+        )
+
+    def _deltas(self, actions, rows=None, n_rows=None):
+        # 調整對 (總和, 筆數, 皇冠低分筆數) x 25 格的變化量，累加到 rows 指定的列 -> (n_rows, 75)
+        # rows 為 None 時每個調整一列 (A, 75)；同一 (資產, 功能) 只能出現一次
+        cells = self._cells(actions)
+        if rows is None:
+            rows, n_rows = np.arange(len(actions)), len(actions)
+        old = actions["目前"].to_numpy(dtype=np.int64)
+        new = actions["目標"].to_numpy(dtype=np.int64)
+        crown = actions["皇冠寶石"].to_numpy(dtype=bool)
+        deltas = np.zeros((n_rows, 3, _N_CELLS), dtype=np.float64)
+        np.add.at(deltas, (rows, 0, cells), new - old)
+        np.add.at(deltas, (rows, 1, cells), (new > 0).astype(np.int64) - (old > 0))
+        np.add.at(deltas, (rows, 2, cells), (crown & (new > 0) & (new < 3)).astype(np.int64) - (crown & (old > 0) & (old < 3)))
+        return deltas.reshape(n_rows, 3 * _N_CELLS)
+
+    def _evaluate(self, deltas, plans, chunk):
+        # plans (S, K) @ deltas (K, 75) 加到目前統計量後判定；每批最多約 400 萬個元素轉成浮點數
+        stats = np.empty((len(plans), 3 * _N_CELLS), dtype=np.int64)
+        chunk = max(1, min(chunk, 2**22 // max(1, plans.shape[1])))
+        for start in range(0, len(plans), chunk):
+            # 以浮點矩陣乘法 (BLAS) 累加；數值皆為小整數，四捨五入後與整數運算相同
+            part = plans[start:start + chunk].astype(np.float64)
+            stats[start:start + chunk] = self.base + np.rint(part @ deltas).astype(np.int64)
+        sums, counts, crown_lows = stats.reshape(len(plans), 3, len(CATEGORIES), len(FUNCTIONS)).transpose(1, 0, 2, 3)
+        return classify_cells(self.asset_counts, sums, counts, crown_lows)
+
+    def evaluate(self, actions, plans, chunk=2048):
+        # plans：(S, A) 布林矩陣，第 s 列為第 s 個方案採用的調整；回傳 (statuses, tiers)，形狀 (S, 5, 5)
+        plans = np.atleast_2d(np.asarray(plans, dtype=bool))
+        return self._evaluate(self._deltas(actions), plans, chunk)
+
+    def matrix(self, actions, plan=None):
+        # 單一方案套用後的矩陣 {(類別, 功能): (狀態, Tier)}；plan 為 None 時套用全部調整
+        plan = np.ones(len(actions), dtype=bool) if plan is None else plan
+        statuses, tiers = self.evaluate(actions, plan[None, :])
+        return {
+            (cat, func): (str(statuses[0, c, f]), int(tiers[0, c, f]))
+            for c, cat in enumerate(CATEGORIES)
+            for f, func in enumerate(FUNCTIONS)
+        }
+
+    # --- 以格子為單位的方案：(S, G) 遮罩，G 為調整分布的格子數 (最多 25)，與資產數無關 ---
+    def plan_cells(self, actions):
+        # 遮罩各欄對應的格子 [(類別, 功能)]，依類別、功能順序；第二個回傳值為每個調整所在的欄
+        cells, group_of = np.unique(self._cells(actions), return_inverse=True)
+        return [(CATEGORIES[c // len(FUNCTIONS)], FUNCTIONS[c % len(FUNCTIONS)]) for c in cells.tolist()], group_of
+
+    def cell_plans(self, actions, limit=10000, seed=0):
+        # 候選方案：以格子為單位整批提升 (清掉一格皇冠風險需該格所有皇冠低分資產一起提升)
+        # 格子數少時列舉全部組合，否則隨機抽樣 (密度不一的子集合 + 每格單獨 + 全部)
+        g = len(self.plan_cells(actions)[0])
+        if g == 0:
+            return np.zeros((1, 0), dtype=bool)
+        if g < 31 and 2 ** g <= limit:
+            masks = (np.arange(2 ** g)[:, None] >> np.arange(g)) & 1
+        else:
+            rng = np.random.default_rng(seed)
+            density = rng.random((limit, 1))
+            masks = rng.random((limit, g)) < density
+            masks[:g + 2] = np.vstack([np.zeros(g), np.ones(g), np.eye(g)])[:min(g + 2, limit)]
+        return masks.astype(bool)
+
+    def expand(self, actions, mask):
+        # 單一格子遮罩 -> 該方案採用的調整 (A,) 布林陣列
+        return np.asarray(mask, dtype=bool)[self.plan_cells(actions)[1]]
+
+    def evaluate_cells(self, actions, masks, chunk=2048):
+        # masks：cell_plans 的 (S, G) 遮罩；每格的調整量先加總成 (G, 75)，不展開成 (S, A)
+        masks = np.atleast_2d(np.asarray(masks, dtype=bool))
+        cells, group_of = self.plan_cells(actions)
+        return self._evaluate(self._deltas(actions, group_of, len(cells)), masks, chunk)
+
+    def rank(self, actions, masks, budget=None, top=10):
+        # masks：cell_plans 的 (S, G) 遮罩；依 皇冠風險格數 -> Tier 1 格數 -> Tier 2 格數 -> 成本 排序 (皆為少者優先)，
+        # 只保留成本在預算內的方案
+        masks = np.atleast_2d(np.asarray(masks, dtype=bool))
+        cells, group_of = self.plan_cells(actions)
+        group_cost = np.bincount(group_of, weights=actions["成本"].to_numpy(dtype=np.float64), minlength=len(cells))
+        group_size = np.bincount(group_of, minlength=len(cells))
+        cost = masks.astype(np.float64) @ group_cost
+        statuses, _ = self.evaluate_cells(actions, masks)
+        counts = {status: (statuses == status).sum(axis=(1, 2)) for status in ("crown_risk", "tier-1", "tier-2")}
+        base = {status: int((self.base_statuses == status).sum()) for status in counts}
+
+        order = np.lexsort((cost, counts["tier-2"], counts["tier-1"], counts["crown_risk"]))
+        if budget is not None:
+            order = order[cost[order] <= budget]
+        order = order[:top]
+        return pd.DataFrame({
+            "方案": order,
+            "調整數": masks[order].astype(np.int64) @ group_size,
+            "成本": cost[order],
+            "皇冠風險": counts["crown_risk"][order],
+            "消除皇冠風險": base["crown_risk"] - counts["crown_risk"][order],
+            "tier-1": counts["tier-1"][order],
+            "tier-2": counts["tier-2"][order],
+        })
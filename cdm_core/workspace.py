@@ -0,0 +1,399 @@
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .matrix import CATEGORIES, FUNCTIONS, aggregate_cells
+from .shared import SharedWorkspace
+from .store import AssessmentStore
+
+DEFAULT_DB_PATH = os.environ.get(
+    "CDM_DB_PATH", os.path.join(os.path.expanduser("~"), ".local", "share", "cdm", "workspaces.sqlite")
+)
+DEFAULT_WORKSPACE = "預設工作區"
+
+_CATEGORY_INDEX = {c: i for i, c in enumerate(CATEGORIES)}
+_SCORE_COLUMNS = [f"s{f}" for f in range(len(FUNCTIONS))]  # 依 FUNCTIONS 順序的分數欄位
+KEYFRAME_EVERY = 50  # 每隔幾個快照存一次完整內容，還原任一快照最多套用這麼多個差異
+
+
+# --- 工作區資料庫 (SQLite WAL)：多個評估專案並存，每個資產一列 (含 5 個功能分數) ---
+# 連線由所有 session 共用 (以 lock 保護)；store 的每次異動只寫入有變更的列。
+class WorkspaceDB:
+    def __init__(self, path=DEFAULT_DB_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS workspaces ("
+                "id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL, "
+                "created_at TEXT DEFAULT CURRENT_TIMESTAMP, updated_at TEXT DEFAULT CURRENT_TIMESTAMP)"
+            )
+            # version：每次寫入 +1，用來判斷單位的彙總快取是否過期 (舊資料庫自動補欄位)
+            columns = [row[1] for row in self._conn.execute("PRAGMA table_info(workspaces)")]
+            if "version" not in columns:
+                self._conn.execute("ALTER TABLE workspaces ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS assets ("
+                "workspace_id INTEGER NOT NULL REFERENCES workspaces(id) ON DELETE CASCADE, "
+                "name TEXT NOT NULL, category TEXT NOT NULL, crown INTEGER NOT NULL, "
+                + ", ".join(f"{c} INTEGER NOT NULL DEFAULT 0" for c in _SCORE_COLUMNS)
+                + ", PRIMARY KEY (workspace_id, name))"
+            )
+            # 歷史快照：keyframe 存完整資產，其餘只存與前一個快照不同的列 (deleted = 1 為刪除)，seq 保留資產順序；
+            # cells 為快照當下每格統計量 (asset_counts + sums + counts + crown_lows 的 int64)，趨勢圖不必還原資產
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS snapshots ("
+                "id INTEGER PRIMARY KEY, "
+                "workspace_id INTEGER NOT NULL REFERENCES workspaces(id) ON DELETE CASCADE, "
+                "label TEXT NOT NULL, created_at TEXT DEFAULT CURRENT_TIMESTAMP, "
+                "keyframe INTEGER NOT NULL, asset_count INTEGER NOT NULL, changed INTEGER NOT NULL, cells BLOB NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS snapshot_assets ("
+                "snapshot_id INTEGER NOT NULL REFERENCES snapshots(id) ON DELETE CASCADE, "
+                "seq INTEGER NOT NULL, name TEXT NOT NULL, category INTEGER NOT NULL, crown INTEGER NOT NULL, "
+                + ", ".join(f"{c} INTEGER NOT NULL" for c in _SCORE_COLUMNS)
+                + ", deleted INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (snapshot_id, seq)) WITHOUT ROWID"
+            )
+        self._aggregates = {}  # workspace_id -> (version, 每格統計量)
+        self._last_snapshot = {}  # workspace_id -> (最新快照 id, 內容)，下一次建立快照時不必還原
+        self._shared = {}  # 工作區名稱 -> SharedWorkspace (process 內共用)
+        self._shared_lock = threading.Lock()  # 與 _lock 分開：載入工作區時會取得 _lock
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # --- 工作區 ---
+    def names(self):
+        with self._lock:
+            return [name for name, in self._conn.execute("SELECT name FROM workspaces ORDER BY created_at, id")]
+
+    def _workspace_id(self, name, create=True):
+        row = self._conn.execute("SELECT id FROM workspaces WHERE name = ?", (name,)).fetchone()
+        if row is not None:
+            return row[0]
+        if not create:
+            raise KeyError(name)
+        with self._conn:
+            return self._conn.execute("INSERT INTO workspaces (name) VALUES (?)", (name,)).lastrowid
+
+    def create(self, name):
+        with self._lock:
+            self._workspace_id(name)
+
+    def delete(self, name):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM workspaces WHERE name = ?", (name,))
+            self._last_snapshot.clear()  # 快照 id 可能被之後新建的快照重複使用
+        with self._shared_lock:
+            self._shared.pop(name, None)
+
+    def load(self, name, create=True):
+        # 讀出整個工作區成為 AssessmentStore，之後的異動會自動寫回
+        with self._lock:
+            workspace_id = self._workspace_id(name, create)
+            rows = self._conn.execute(
+                f"SELECT name, category, crown, {', '.join(_SCORE_COLUMNS)} FROM assets "
+                "WHERE workspace_id = ? ORDER BY rowid",
+                (workspace_id,),
+            ).fetchall()
+        if rows:
+            columns = list(zip(*rows))
+            store = AssessmentStore.from_arrays(
+                columns[0],
+                [_CATEGORY_INDEX[c] for c in columns[1]],
+                columns[2],
+                list(zip(*columns[3:])),
+            )
+        else:
+            store = AssessmentStore()
+        store.journal = Workspace(self, workspace_id, name)
+        return store
+
+    def shared(self, name, create=True):
+        # 同一個工作區在 process 內只載入一次，所有 session 經由 SharedWorkspace 讀寫同一份資料
+        with self._shared_lock:
+            workspace = self._shared.get(name)
+            if workspace is None:
+                workspace = self._shared[name] = SharedWorkspace(self.load(name, create))
+            return workspace
+
+    def save(self, name, store):
+        # 以 store 的內容覆寫工作區 (例如把未存檔的 session 另存)，並讓 store 之後寫入此工作區
+        names = store.assets["資產名稱"].tolist()
+        categories, crowns, scores = store.arrays()
+        rows = [
+            (name_, CATEGORIES[c], int(k), *map(int, s))
+            for name_, c, k, s in zip(names, categories.tolist(), crowns.tolist(), scores.tolist())
+        ]
+        with self._lock:
+            workspace_id = self._workspace_id(name)
+            with self._conn:
+                self._conn.execute("DELETE FROM assets WHERE workspace_id = ?", (workspace_id,))
+                self._conn.executemany(
+                    f"INSERT INTO assets (workspace_id, name, category, crown, {', '.join(_SCORE_COLUMNS)}) "
+                    f"VALUES ({workspace_id}, ?, ?, ?, {', '.join('?' * len(_SCORE_COLUMNS))})",
+                    rows,
+                )
+                self._touch(workspace_id)
+        store.journal = Workspace(self, workspace_id, name)
+        with self._shared_lock:
+            self._shared.pop(name, None)  # 共用中的舊內容已被覆寫，下次 shared() 重新載入
+        return store
+
+    # --- 多單位彙總：每個工作區的每格統計量 (同 MatrixCache)，只重算有異動的工作區 ---
+    def unit_aggregates(self, batch=500):
+        # 回傳 (工作區名稱清單, asset_counts (U,5), sums (U,5,5), counts (U,5,5), crown_lows (U,5,5))
+        n_cat, n_func = len(CATEGORIES), len(FUNCTIONS)
+        per_function = ", ".join(
+            f"SUM({c} > 0), SUM({c}), SUM(crown AND {c} > 0 AND {c} < 3)" for c in _SCORE_COLUMNS
+        )
+        with self._lock:
+            workspaces = self._conn.execute("SELECT id, name, version FROM workspaces ORDER BY created_at, id").fetchall()
+            stale = [(i, v) for i, _, v in workspaces if self._aggregates.get(i, (None,))[0] != v]
+            for start in range(0, len(stale), batch):
+                part = stale[start:start + batch]
+                fresh = {i: (v, np.zeros(n_cat, dtype=np.int64), np.zeros((3, n_cat, n_func), dtype=np.int64)) for i, v in part}
+                rows = self._conn.execute(
+                    f"SELECT workspace_id, category, COUNT(*), {per_function} FROM assets "
+                    f"WHERE workspace_id IN ({','.join('?' * len(part))}) GROUP BY workspace_id, category",
+                    [i for i, _ in part],
+                )
+                for workspace_id, category, n, *stats in rows:
+                    c = _CATEGORY_INDEX.get(category)
+                    if c is None:
+                        continue
+                    _, asset_counts, cells = fresh[workspace_id]
+                    asset_counts[c] = n
+                    # stats 依功能排列：(筆數, 總和, 皇冠低分) x 5
+                    cells[:, c, :] = np.array(stats, dtype=np.int64).reshape(n_func, 3).T[[1, 0, 2]]
+                self._aggregates.update(fresh)
+            live = {i for i, _, _ in workspaces}
+            for i in list(self._aggregates):
+                if i not in live:
+                    del self._aggregates[i]
+
+        names = [name for _, name, _ in workspaces]
+        if not workspaces:
+            return names, np.zeros((0, n_cat), dtype=np.int64), *(np.zeros((0, n_cat, n_func), dtype=np.int64),) * 3
+        asset_counts = np.stack([self._aggregates[i][1] for i, _, _ in workspaces])
+        cells = np.stack([self._aggregates[i][2] for i, _, _ in workspaces])
+        return names, asset_counts, cells[:, 0], cells[:, 1], cells[:, 2]
+
+    # --- 歷史快照：差異儲存，每 KEYFRAME_EVERY 個存一次完整內容 ---
+    def snapshot(self, name, label=None):
+        # 以工作區目前內容建立快照，回傳快照 id
+        with self._lock:
+            workspace_id = self._workspace_id(name, create=False)
+            current = {
+                row[0]: (_CATEGORY_INDEX[row[1]], *row[2:])
+                for row in self._conn.execute(
+                    f"SELECT name, category, crown, {', '.join(_SCORE_COLUMNS)} FROM assets "
+                    "WHERE workspace_id = ? ORDER BY rowid",
+                    (workspace_id,),
+                )
+            }
+            previous, keyframe_id = self._conn.execute(
+                "SELECT MAX(id), MAX(CASE WHEN keyframe THEN id END) FROM snapshots WHERE workspace_id = ?",
+                (workspace_id,),
+            ).fetchone()
+            deltas = 0 if previous is None else self._conn.execute(
+                "SELECT COUNT(*) FROM snapshots WHERE workspace_id = ? AND id > ?", (workspace_id, keyframe_id)
+            ).fetchone()[0]
+
+            if previous is None or deltas + 1 >= KEYFRAME_EVERY:
+                keyframe, rows = True, [(name_, *values, 0) for name_, values in current.items()]
+            else:
+                cached = self._last_snapshot.get(workspace_id)
+                before = cached[1] if cached and cached[0] == previous else self._state(workspace_id, previous)
+                rows = [(name_, *values, 0) for name_, values in current.items() if before.get(name_) != values]
+                rows += [(name_, 0, 0, *(0,) * len(_SCORE_COLUMNS), 1) for name_ in before if name_ not in current]
+                # 差異超過一半時直接存完整內容，還原時不必再往前找
+                keyframe = len(rows) * 2 > len(current)
+                if keyframe:
+                    rows = [(name_, *values, 0) for name_, values in current.items()]
+
+            values = np.array(list(current.values()), dtype=np.int64).reshape(len(current), 2 + len(_SCORE_COLUMNS))
+            cells = np.concatenate([a.ravel() for a in aggregate_cells(values[:, 0], values[:, 1].astype(bool), values[:, 2:])])
+            with self._conn:
+                snapshot_id = self._conn.execute(
+                    "INSERT INTO snapshots (workspace_id, label, keyframe, asset_count, changed, cells) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (workspace_id, label or "", int(keyframe), len(current), len(rows), cells.astype(np.int64).tobytes()),
+                ).lastrowid
+                self._insert_snapshot_rows(snapshot_id, rows)
+            self._last_snapshot[workspace_id] = (snapshot_id, current)
+        return snapshot_id
+
+    def snapshots(self, name):
+        # [(id, 標籤, 建立時間, 資產數, 儲存列數, 是否完整)]，依建立順序
+        with self._lock:
+            workspace_id = self._workspace_id(name, create=False)
+            return self._conn.execute(
+                "SELECT id, label, created_at, asset_count, changed, keyframe FROM snapshots "
+                "WHERE workspace_id = ? ORDER BY id",
+                (workspace_id,),
+            ).fetchall()
+
+    def delete_snapshot(self, snapshot_id):
+        # 刪除後下一個快照若是差異，改存成完整內容，之後的快照仍可還原
+        with self._lock:
+            row = self._conn.execute("SELECT workspace_id FROM snapshots WHERE id = ?", (snapshot_id,)).fetchone()
+            if row is None:
+                return
+            following = self._conn.execute(
+                "SELECT id, keyframe FROM snapshots WHERE workspace_id = ? AND id > ? ORDER BY id LIMIT 1",
+                (row[0], snapshot_id),
+            ).fetchone()
+            self._last_snapshot.pop(row[0], None)
+            with self._conn:
+                if following is not None and not following[1]:
+                    state = self._state(row[0], following[0])
+                    self._conn.execute("DELETE FROM snapshot_assets WHERE snapshot_id = ?", (following[0],))
+                    self._insert_snapshot_rows(following[0], [(name_, *values, 0) for name_, values in state.items()])
+                    self._conn.execute(
+                        "UPDATE snapshots SET keyframe = 1, changed = ? WHERE id = ?", (len(state), following[0])
+                    )
+                self._conn.execute("DELETE FROM snapshots WHERE id = ?", (snapshot_id,))
+
+    def _insert_snapshot_rows(self, snapshot_id, rows):
+        self._conn.executemany(
+            f"INSERT INTO snapshot_assets (snapshot_id, seq, name, category, crown, {', '.join(_SCORE_COLUMNS)}, deleted) "
+            f"VALUES ({snapshot_id}, {', '.join('?' * (5 + len(_SCORE_COLUMNS)))})",
+            [(seq, *row) for seq, row in enumerate(rows)],
+        )
+
+    def _state(self, workspace_id, snapshot_id):
+        # 還原快照內容 {資產名稱: (類別代碼, 皇冠, s0..s4)}：從最近的 keyframe 起依序套用差異
+        rows = self._conn.execute(
+            f"SELECT a.name, a.category, a.crown, {', '.join('a.' + c for c in _SCORE_COLUMNS)}, a.deleted "
+            "FROM snapshot_assets a JOIN snapshots s ON s.id = a.snapshot_id "
+            "WHERE s.workspace_id = ? AND s.id <= ? AND s.id >= ("
+            "SELECT MAX(id) FROM snapshots WHERE workspace_id = ? AND id <= ? AND keyframe = 1) "
+            "ORDER BY s.id, a.seq",
+            (workspace_id, snapshot_id, workspace_id, snapshot_id),
+        )
+        state = {}
+        for name, *values, deleted in rows:
+            if deleted:
+                state.pop(name, None)
+            else:
+                state[name] = tuple(values)
+        return state
+
+    def snapshot_store(self, snapshot_id):
+        # 快照內容的 AssessmentStore (唯讀用途，不接 journal)
+        with self._lock:
+            row = self._conn.execute("SELECT workspace_id FROM snapshots WHERE id = ?", (snapshot_id,)).fetchone()
+            if row is None:
+                raise KeyError(snapshot_id)
+            state = self._state(row[0], snapshot_id)
+        if not state:
+            return AssessmentStore()
+        values = list(zip(*state.values()))
+        return AssessmentStore.from_arrays(list(state), values[0], values[1], list(zip(*values[2:])))
+
+    def snapshot_diff(self, old_id, new_id):
+        # 任意兩個快照的差異：(新增的資產, 刪除的資產, 變動 DataFrame [資產名稱, 類別, 欄位, 前, 後])
+        # 兩端各自從最近的 keyframe 還原，成本與快照總數無關
+        with self._lock:
+            ids = {i: w for i, w in self._conn.execute(
+                "SELECT id, workspace_id FROM snapshots WHERE id IN (?, ?)", (old_id, new_id))}
+            if old_id not in ids or new_id not in ids:
+                raise KeyError(old_id if old_id not in ids else new_id)
+            before = self._state(ids[old_id], old_id)
+            after = self._state(ids[new_id], new_id)
+        added = [name for name in after if name not in before]
+        removed = [name for name in before if name not in after]
+        changes = []
+        for name, new in after.items():
+            old = before.get(name)
+            if old is None or old == new:
+                continue
+            category = CATEGORIES[new[0]]
+            if old[0] != new[0]:
+                changes.append((name, category, "類別", CATEGORIES[old[0]], category))
+            if old[1] != new[1]:
+                changes.append((name, category, "皇冠寶石", bool(old[1]), bool(new[1])))
+            changes.extend(
+                (name, category, FUNCTIONS[f], a, b) for f, (a, b) in enumerate(zip(old[2:], new[2:])) if a != b
+            )
+        return added, removed, pd.DataFrame(changes, columns=["資產名稱", "類別", "欄位", "前", "後"])
+
+    def snapshot_cells(self, name):
+        # 趨勢用：每個快照的每格統計量，只讀 snapshots 表，不還原資產
+        # 回傳 (快照清單, asset_counts (K,5), sums (K,5,5), counts (K,5,5), crown_lows (K,5,5))
+        n_cat, n_func = len(CATEGORIES), len(FUNCTIONS)
+        with self._lock:
+            workspace_id = self._workspace_id(name, create=False)
+            rows = self._conn.execute(
+                "SELECT id, label, created_at, cells FROM snapshots WHERE workspace_id = ? ORDER BY id", (workspace_id,)
+            ).fetchall()
+        cells = np.array([np.frombuffer(blob, dtype=np.int64) for *_, blob in rows], dtype=np.int64)
+        cells = cells.reshape(len(rows), n_cat + 3 * n_cat * n_func)
+        per_cell = cells[:, n_cat:].reshape(len(rows), 3, n_cat, n_func)
+        return [row[:3] for row in rows], cells[:, :n_cat], per_cell[:, 0], per_cell[:, 1], per_cell[:, 2]
+
+    # --- 增量寫入 (由 Workspace 呼叫) ---
+    def _touch(self, workspace_id):
+        self._conn.execute(
+            "UPDATE workspaces SET updated_at = CURRENT_TIMESTAMP, version = version + 1 WHERE id = ?", (workspace_id,)
+        )
+
+    def _write(self, workspace_id, sql, rows):
+        with self._lock, self._conn:
+            self._conn.executemany(sql, rows)
+            self._touch(workspace_id)
+
+    def insert_assets(self, workspace_id, names, categories, crowns):
+        self._write(
+            workspace_id,
+            "INSERT OR REPLACE INTO assets (workspace_id, name, category, crown) VALUES (?, ?, ?, ?)",
+            [(workspace_id, name, CATEGORIES[c], int(k)) for name, c, k in zip(names, categories, crowns)],
+        )
+
+    def delete_assets(self, workspace_id, names):
+        self._write(
+            workspace_id,
+            "DELETE FROM assets WHERE workspace_id = ? AND name = ?",
+            [(workspace_id, name) for name in names],
+        )
+
+    def update_scores(self, workspace_id, changes):
+        # changes: [(資產名稱, 功能序號, 分數)]，依功能分組後各用一個 UPDATE
+        by_function = {}
+        for name, f, score in changes:
+            by_function.setdefault(f, []).append((int(score), workspace_id, name))
+        with self._lock, self._conn:
+            for f, rows in by_function.items():
+                self._conn.executemany(
+                    f"UPDATE assets SET {_SCORE_COLUMNS[f]} = ? WHERE workspace_id = ? AND name = ?", rows
+                )
+            self._touch(workspace_id)
+
+
+# --- store.journal：把 AssessmentStore 的異動轉成對應工作區的增量寫入 ---
+class Workspace:
+    def __init__(self, db, workspace_id, name):
+        self.db = db
+        self.id = workspace_id
+        self.name = name
+
+    def add_assets(self, names, categories, crowns):
+        self.db.insert_assets(self.id, names, categories, crowns)
+
+    def remove_assets(self, names):
+        self.db.delete_assets(self.id, names)
+
+    def set_scores(self, changes):
+        self.db.update_scores(self.id, changes)
@@ -0,0 +1,852 @@
+import sqlite3
+import uuid
+
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from cdm_core import (
+    CATEGORIES,
+    DEFAULT_POLICY,
+    DEFAULT_WORKSPACE,
+    EXPORT_FORMATS,
+    FUNCTIONS,
+    POLICIES,
+    RISK_STATUSES,
+    SECPAAS_URL,
+    TIER_LABELS_SHORT,
+    AssessmentStore,
+    ExportJob,
+    InventoryImport,
+    MatrixRenderer,
+    Profiler,
+    Report,
+    Rollup,
+    RuleClassifier,
+    ScoringPolicy,
+    SharedWorkspace,
+    VendorCatalog,
+    WhatIf,
+    WorkspaceDB,
+    assessment_grid,
+    cell_details,
+    classify_cells,
+    estimate_size,
+    grid_changes,
+    iter_file_chunks,
+    merge_duplicates,
+    near_duplicates,
+    read_header,
+    risk_cells,
+)
+
+# --- 兩個入口 (app.py 經典版、app_ai.py AI 版) 共用的頁面與面板 ---
+# 兩版只差在文案、分數標籤、矩陣樣式與第一頁的匯入方式：入口設定後呼叫 CdmApp.run，
+# 第一頁由入口提供 (可使用這裡的匯入、合併確認與資產清單)。計算一律在 cdm_core，這裡只有 Streamlit 元件。
+
+
+# --- 靜態資料：廠商目錄、矩陣樣式與評分政策來自 cdm_core，每個 process 只建立一次 ---
+@st.cache_resource
+def load_catalog():
+    return VendorCatalog()
+
+
+@st.cache_resource
+def load_renderer(theme):
+    return MatrixRenderer(theme)
+
+
+# 評分政策：每個 process 編譯一次；矩陣快取以政策物件為 key 保留結果，切換政策不必重算
+@st.cache_resource
+def load_policies():
+    return {spec["name"]: ScoringPolicy(spec) for spec in POLICIES}
+
+
+# 工作區資料庫 (SQLite)：所有 session 共用一個連線
+@st.cache_resource
+def load_workspace_db():
+    return WorkspaceDB()
+
+
+# 分類引擎：匯入檔未對應類別 / 皇冠寶石欄位時使用，規則只在每個 process 編譯一次
+@st.cache_resource
+def load_classifier():
+    return RuleClassifier()
+
+
+def widget_count():
+    # 本次重跑建立的元件數：取自 Streamlit 內部的執行狀態，版本不同取不到時略過
+    ctx = get_script_run_ctx()
+    ids = getattr(getattr(ctx, "shared", ctx), "widget_ids_this_run", None)
+    if ids is None:
+        return None
+    return len(ids.snapshot() if hasattr(ids, "snapshot") else ids)
+
+
+class CdmApp:
+    # name：效能匯出的 app 標籤；pages：三個頁面的名稱；tier_labels：評分元件的分數標籤；
+    # texts：各版不同的文案 (見 app.py 的 TEXTS)
+    def __init__(self, name, title, pages, theme, tier_labels, texts, caption=None):
+        self.name = name
+        self.title = title
+        self.caption = caption
+        self.pages = pages
+        self.renderer = load_renderer(theme)
+        self.tier_labels = tier_labels
+        self.texts = texts
+
+        # 資料庫無法開啟時只保存在 session 中
+        try:
+            self.workspace_db = load_workspace_db()
+        except (OSError, sqlite3.Error):
+            self.workspace_db = None
+
+        # --- 效能量測：側邊欄「效能診斷」開啟時才計時，關閉時各區段幾乎沒有額外成本 ---
+        if 'profiler' not in st.session_state:
+            st.session_state.profiler = Profiler()
+        self.profiler = st.session_state.profiler
+        self.profiler.enabled = st.session_state.get('profiling', False)
+        self.profiler.begin()
+
+        # --- 初始化 Session State ---
+        if 'workspace' not in st.session_state:
+            st.session_state.workspace = DEFAULT_WORKSPACE
+        if st.session_state.get('store_workspace') != st.session_state.workspace:
+            # 資產與評分集中在 AssessmentStore：評分以 store[(資產名稱, 功能)] 讀取 (0~4)，
+            # 並同步維護戰情室的增量矩陣快取；同一個工作區由所有 session 共用 (SharedWorkspace)，
+            # 寫入一律經過 shared (版本檢查、通知其他分析師)，每次異動自動寫回資料庫
+            st.session_state.shared = (
+                self.workspace_db.shared(st.session_state.workspace) if self.workspace_db
+                else SharedWorkspace(AssessmentStore())
+            )
+            st.session_state.store_workspace = st.session_state.workspace
+            st.session_state.seen_version = st.session_state.shared.version
+        self.shared = st.session_state.shared
+        if 'author' not in st.session_state:
+            st.session_state.author = uuid.uuid4().hex  # 區分自己與其他 session 的寫入
+        self.author = st.session_state.author
+        # 上一次整頁重跑之後，其他分析師異動的矩陣格子 (戰情室標示用)
+        st.session_state.seen_version, self.live_cells, _ = self.shared.changes_since(st.session_state.seen_version, self.author)
+        if 'current_page' not in st.session_state:
+            st.session_state.current_page = pages[0]
+
+    def go(self, page):
+        st.session_state.current_page = page
+        st.rerun()
+
+    def run(self, inventory_page):
+        # inventory_page(app)：第一頁的內容 (標題、匯入方式)，下一步按鈕由這裡加上
+        self.navigation()
+        self.workspace_switcher()
+        page = st.session_state.current_page
+        if page == self.pages[0]:
+            inventory_page(self)
+            st.divider()
+            if st.button("下一步：防禦診斷 👉", use_container_width=True):
+                self.go(self.pages[1])
+        elif page == self.pages[1]:
+            self.assessment_page()
+        elif page == self.pages[2]:
+            self.dashboard_page()
+        self.profiling_sidebar()
+
+    # --- 側邊欄導航 (與 Session State 連動)：點選側邊欄或頁面上的按鈕都會更新 current_page ---
+    def navigation(self):
+        st.sidebar.title(self.title)
+        if self.caption:
+            st.sidebar.caption(self.caption)
+        selected = st.sidebar.radio("導航", self.pages, index=self.pages.index(st.session_state.current_page))
+        if selected != st.session_state.current_page:
+            self.go(selected)
+
+    # --- 工作區切換 ---
+    def workspace_switcher(self):
+        workspace_db = self.workspace_db
+        st.sidebar.divider()
+        st.sidebar.subheader("💾 工作區")
+        if workspace_db is None:
+            st.sidebar.warning("無法開啟工作區資料庫，資料僅保存在本次瀏覽中")
+            return
+        workspaces = workspace_db.names()
+        chosen = st.sidebar.selectbox("目前工作區", workspaces, index=workspaces.index(st.session_state.workspace))
+        if chosen != st.session_state.workspace:
+            st.session_state.workspace = chosen
+            st.rerun()
+        with st.sidebar.expander("➕ 新增工作區"):
+            new_workspace = st.text_input("工作區名稱", key="new_workspace")
+            if st.button("建立並切換", use_container_width=True) and new_workspace.strip():
+                workspace_db.create(new_workspace.strip())
+                st.session_state.workspace = new_workspace.strip()
+                st.rerun()
+        st.sidebar.caption(f"已自動儲存 {len(self.shared.store)} 項資產")
+        self.live_updates()
+
+    # --- 多人同步：定期比對共用工作區的版本號，其他分析師有異動時才取異動記錄 ---
+    # 戰情室直接整頁重跑 (矩陣只重新判定、重繪有異動的格子)；其他頁面只提示，避免打斷編輯中的表格
+    def live_updates(self):
+        shared, author = self.shared, self.author
+
+        @st.fragment(run_every=5)
+        def live_updates():
+            version, cells, names = shared.changes_since(st.session_state.seen_version, author)
+            if not cells:
+                st.session_state.seen_version = version
+                st.caption(f"👥 多人共用中 · 版本 {version}")
+            elif st.session_state.current_page == self.pages[2]:
+                st.rerun()
+            else:
+                st.caption(f"🔄 其他分析師已更新 {len(names)} 項資產 ({len(cells)} 個矩陣格子)，切換頁面即可看到")
+
+        with st.sidebar:
+            live_updates()
+
+    # ==========================================
+    # 頁面 1: 資產盤點的共用區塊
+    # ==========================================
+    def stage_import(self, assets):
+        # 匯入前的近似重複檢查：有疑似重複時先暫存，於 merge_review 列出合併清單確認後才寫入；否則直接寫入
+        # 回傳匯入的資產數，暫存待確認時回傳 None
+        existing = self.shared.read(lambda current: current.assets["資產名稱"].tolist())[1]
+        merges = near_duplicates(assets["資產名稱"].tolist(), existing=existing)
+        if merges.empty:
+            return self.shared.add_assets(assets, self.author)
+        st.session_state.pending_import = (assets, merges.assign(合併=True))
+        return None
+
+    def file_import(self, classifier):
+        # 從 CSV / Excel 檔批次匯入：逐批讀取，最後一次寫入；未對應的欄位交給 classifier
+        texts = self.texts
+        with st.expander(texts["import_expander"], expanded=False):
+            uploaded = st.file_uploader("資產清單檔案", type=["csv", "xlsx"])
+            if uploaded is None:
+                return
+            try:
+                columns = read_header(uploaded, uploaded.name)
+            except Exception as e:
+                st.error(f"無法讀取檔案：{e}")
+                return
+            if not columns:
+                return
+            unmapped = texts["import_unmapped"]
+            guess = next((i for i, c in enumerate(columns) if "名稱" in c or "name" in c.lower()), 0)
+            m1, m2, m3 = st.columns(3)
+            with m1: name_col = st.selectbox("資產名稱欄位", columns, index=guess)
+            with m2: cat_col = st.selectbox("類別欄位", [unmapped] + columns)
+            with m3: crown_col = st.selectbox("皇冠寶石欄位", [unmapped] + columns)
+
+            if st.button("📥 開始匯入", type="primary"):
+                job = InventoryImport(
+                    self.shared, classifier, name_col,
+                    category_column=None if cat_col == unmapped else cat_col,
+                    crown_column=None if crown_col == unmapped else crown_col,
+                )
+                bar = st.progress(0, text="讀取中...")
+                try:
+                    with self.profiler.section("import"):
+                        for progress, chunk in iter_file_chunks(uploaded, uploaded.name):
+                            job.feed(chunk)
+                            bar.progress(progress, text=texts["import_progress"].format(read=job.read, classified=job.classified))
+                except Exception as e:
+                    # 讀到中途失敗 (格式錯誤等)：資產在讀完後才一次寫入，此時尚未匯入任何資產
+                    bar.empty()
+                    st.error(f"無法讀取檔案 (已讀取 {job.read} 列，尚未匯入)：{e}")
+                else:
+                    added = self.stage_import(job.result())
+                    bar.empty()
+                    counts = {"read": job.read, "skipped": job.skipped, "classified": job.classified}
+                    if added is None:
+                        st.info(texts["import_review"].format(**counts))
+                    else:
+                        st.success(texts["import_done"].format(added=added, **counts))
+
+    def merge_review(self):
+        # 合併確認：勾選的項目不匯入，併入右側保留的名稱
+        if "pending_import" not in st.session_state:
+            return
+        pending_assets, merges = st.session_state.pending_import
+        st.warning(f"⚠️ 這次匯入的 {len(pending_assets)} 項資產中，有 {len(merges)} 項與其他名稱高度相似，請確認是否合併：")
+        reviewed = st.data_editor(
+            merges,
+            column_config={"合併": st.column_config.CheckboxColumn("合併", help="勾選 = 不匯入此項，視為右側名稱的重複")},
+            disabled=["資產名稱", "合併至", "相似度", "既有資產"],
+            hide_index=True,
+            use_container_width=True,
+            key="merge_review",
+        )
+        r1, r2 = st.columns(2)
+        with r1:
+            if st.button("✅ 確認並匯入", type="primary", use_container_width=True):
+                added = self.shared.add_assets(merge_duplicates(pending_assets, reviewed), self.author)
+                del st.session_state.pending_import
+                st.toast(f"已匯入 {added} 項資產，合併 {int(reviewed['合併'].sum())} 項重複")
+                st.rerun()
+        with r2:
+            if st.button("✖️ 取消匯入", use_container_width=True):
+                del st.session_state.pending_import
+                st.rerun()
+
+    def asset_list(self, title):
+        # 資產清單；尚無資產時回傳 False
+        shared = self.shared
+        if not len(shared.store):
+            return False
+        with self.profiler.section("inventory"):
+            st.subheader(title)
+            # 伺服器端篩選與分頁：名稱經 store 的搜尋索引，只有當頁的資產會建立 DataFrame 並送到瀏覽器
+            f1, f2, f3 = st.columns([3, 2, 1])
+            with f1: query = st.text_input("🔍 搜尋資產名稱", placeholder="3 個字以上比對名稱任一部分，較短時比對開頭")
+            with f2: shown_categories = st.multiselect("篩選類別", CATEGORIES, placeholder="全部類別")
+            with f3:
+                st.write("")
+                crown_filter = st.checkbox("只看 👑", help="只列出皇冠寶石")
+            # 共用工作區可能在兩次讀取之間重新編號 id：搜尋與取出當頁都在同一次 read 內完成，id 不帶出 lock
+            def matches(current):
+                return current.find(query, shown_categories or None, crown_filter)
+            _, n_found = shared.read(lambda current: len(matches(current)))
+            page_size = 100
+            pages = max(1, -(-n_found // page_size))
+            p1, p2 = st.columns([1, 3])
+            with p1: page = st.number_input("頁次", min_value=1, max_value=pages, value=1)
+            with p2:
+                st.write("")
+                st.caption(f"符合 {n_found} / {len(shared.store)} 項資產，第 {page}/{pages} 頁 (每頁 {page_size} 項)")
+            _, page_assets = shared.read(lambda current: current.assets_at(matches(current)[(page - 1) * page_size:page * page_size]))
+
+            # 皇冠寶石整欄一次上色 (只處理當頁)
+            gold = {True: 'background-color: #ffd700; color: black', False: ''}
+            table = st.dataframe(
+                page_assets.style.apply(lambda col: col.map(gold), subset=['皇冠寶石']),
+                use_container_width=True,
+                hide_index=True,
+                on_select="rerun",
+                selection_mode="multi-row"
+            )
+            selected = table.selection.rows
+            if selected and st.button(f"🗑️ 刪除選取的 {len(selected)} 項資產"):
+                shared.remove_assets(page_assets['資產名稱'].iloc[selected], self.author)
+                st.rerun()
+        return True
+
+    # ==========================================
+    # 頁面 2: 防禦診斷 (Assessment)
+    # ==========================================
+    def assessment_page(self):
+        shared, author, labels, texts = self.shared, self.author, self.tier_labels, self.texts
+        st.header("🩺 步驟二：防禦成熟度診斷")
+        target_category = st.selectbox("請選擇要評估的類別：", CATEGORIES)
+        _, n_in_cat = shared.read(lambda current: len(current.ids_in_category(target_category)))
+
+        if n_in_cat == 0:
+            st.warning(texts["assessment_empty"].format(category=target_category))
+        else:
+            st.info(texts["assessment_intro"].format(n=n_in_cat))
+
+            # 篩選與分頁：畫面上的元件數量只跟每頁筆數有關，不隨資產總數成長
+            f1, f2, f3, f4 = st.columns([3, 2, 2, 2])
+            with f1: mode = st.radio("評估模式", ["📋 批次表格", "🔘 逐項評分"], horizontal=True)
+            with f2: crown_only = st.checkbox("👑 只看皇冠寶石")
+            with f3: unscored_only = st.checkbox("⏳ 只看未完成評分")
+            with f4: page_size = st.selectbox("每頁筆數", [25, 50, 100, 200], index=1)
+
+            # base = 表格內容讀取時的版本：送出時用來偵測別人在期間改過的格子
+            base, grid = shared.read(assessment_grid, target_category, crown_only, unscored_only)
+            n_pages = max(1, -(-len(grid) // page_size))
+            page_no = st.number_input(f"頁碼 (共 {n_pages} 頁 / {len(grid)} 筆)", min_value=1, max_value=n_pages, value=1, step=1)
+            page = grid.iloc[(page_no - 1) * page_size: page_no * page_size]
+
+            # 表格與每一列評分都是獨立的 fragment：互動時只重跑該區塊，並標記受影響的矩陣格子
+            @st.fragment
+            def grid_editor(page, base):
+                # 表格放在 form 內：編輯時不觸發重跑，按下儲存才一次寫回
+                with st.form(f"grid_{target_category}"):
+                    edited = st.data_editor(
+                        page,
+                        column_config={
+                            "皇冠寶石": st.column_config.CheckboxColumn("👑"),
+                            **{f: st.column_config.SelectboxColumn(f, options=[0, 1, 2, 3, 4], format_func=labels.get, required=True) for f in FUNCTIONS},
+                        },
+                        disabled=["資產名稱", "皇冠寶石"],
+                        hide_index=True,
+                        use_container_width=True
+                    )
+                    saved = st.form_submit_button("💾 儲存本頁評分", type="primary", use_container_width=True)
+                if saved:
+                    changes = grid_changes(page, edited)
+                    conflicts = shared.update(changes, base, author)
+                    # page 與 base 是整頁重跑時讀取的 (fragment 重跑沿用同一份)：寫入後整頁重跑重新讀取，
+                    # 下一次儲存才會與剛寫入的分數比對 (否則改回原值會被視為沒有變動)
+                    st.session_state.grid_saved = (len(changes) - len(conflicts), conflicts)
+                    st.rerun()
+
+            def save_score(key, widget, base):
+                # 點選後寫入；期間被其他分析師改過則不寫入 (重跑時選項會回到目前分數)
+                conflicts = shared.update({key: st.session_state[widget]}, base, author)
+                if conflicts:
+                    current = conflicts[key]
+                    st.session_state[f"conflict_{widget}"] = f"⚠️ {key[0]} / {key[1]} " + ("已被刪除" if current is None else f"已被其他分析師改為 {labels[current]}") + "，未寫入"
+
+            @st.fragment
+            def assessment_row(asset, is_crown, func):
+                crown_label = "👑" if is_crown else ""
+
+                key = (asset, func)
+                widget = f"radio_{asset}_{func}"
+                base, current_val = shared.read(lambda current: current.get(key, 0))
+                # 選項一律跟著共用工作區的目前分數 (其他分析師改過也會反映)；寫入在 save_score
+                st.session_state[widget] = current_val
+
+                with st.container():
+                    c1, c2 = st.columns([1, 2])
+                    with c1:
+                        st.markdown(f"#### {asset} {crown_label}")
+                        if is_crown: st.caption("⚠️ 關鍵資產")
+                    with c2:
+                        st.radio(
+                            f"成熟度 ({asset}-{func})",
+                            options=[0, 1, 2, 3, 4],
+                            format_func=labels.get,
+                            key=widget,
+                            on_change=save_score,
+                            args=(key, widget, base),
+                            horizontal=True # 電腦版好看，手機版會自動適應
+                        )
+                        # 衝突訊息由 save_score 留下，在 fragment 內顯示 (callback 內不輸出元件)
+                        conflict = st.session_state.pop(f"conflict_{widget}", None)
+                        if conflict:
+                            st.toast(conflict)
+                    st.divider()
+
+            # 批次表格上一次儲存的結果 (儲存後整頁重跑；篩選後本頁可能已沒有資產，因此在表格外顯示)
+            if 'grid_saved' in st.session_state:
+                n_saved, conflicts = st.session_state.pop('grid_saved')
+                st.success(f"已更新 {n_saved} 筆評分")
+                if conflicts:
+                    st.warning(f"⚠️ 有 {len(conflicts)} 筆評分在你編輯期間已被其他分析師修改 (或資產已刪除)，未寫入：")
+                    st.dataframe(
+                        pd.DataFrame(
+                            [(name, func, "已刪除" if score is None else labels[score]) for (name, func), score in conflicts.items()],
+                            columns=["資產名稱", "功能", "目前分數"],
+                        ),
+                        hide_index=True,
+                        use_container_width=True,
+                    )
+
+            with self.profiler.section("assessment"):
+                if page.empty:
+                    st.info("沒有符合篩選條件的資產。")
+                elif mode == "📋 批次表格":
+                    grid_editor(page, base)
+                else:
+                    # 使用 Tabs 分功能評估
+                    tabs = st.tabs(["識別 (ID)", "保護 (PR)", "偵測 (DE)", "應變 (RS)", "復原 (RC)"])
+
+                    for i, func in enumerate(FUNCTIONS):
+                        with tabs[i]:
+                            for asset, is_crown in zip(page['資產名稱'], page['皇冠寶石']):
+                                assessment_row(asset, is_crown, func)
+
+        col_prev, col_next = st.columns(2)
+        with col_prev:
+            if st.button("👈 上一步", use_container_width=True):
+                self.go(self.pages[0])
+        with col_next:
+            if st.button("下一步：進入戰情室 👉", use_container_width=True):
+                self.go(self.pages[2])
+
+    # ==========================================
+    # 頁面 3: 風險戰情室 (Dashboard)
+    # ==========================================
+    def show_matrix(self, matrix):
+        if self.as_chart:
+            st.altair_chart(self.renderer.chart(matrix), use_container_width=True)
+        else:
+            with self.profiler.section("html"):
+                html = self.renderer.table(matrix)
+            st.markdown(html, unsafe_allow_html=True)
+
+    def dashboard_page(self):
+        st.header(self.texts["dashboard_header"])
+
+        if self.live_cells:
+            st.info("🔄 其他分析師剛更新了：" + "、".join(f"{c}-{f}" for c, f in sorted(self.live_cells)))
+
+        # 檢視範圍與矩陣呈現方式
+        v1, v2 = st.columns(2)
+        with v1:
+            scope = "📍 目前工作區"
+            if self.workspace_db is not None:
+                scope = st.radio("檢視範圍", ["📍 目前工作區", "🏢 集團彙總"], horizontal=True)
+        with v2:
+            self.as_chart = st.radio("矩陣呈現", ["🧩 HTML 表格", "📊 原生圖表"], horizontal=True) == "📊 原生圖表"
+
+        # HTML 表格的 CSS 只在整頁重跑時送一次：fragment 重跑與同頁多個矩陣都只送表格本身 (未變動的矩陣直接取快取)；
+        # 原生圖表只送 25 格資料，集團彙總等多矩陣畫面不必傳大量 HTML
+        if not self.as_chart:
+            st.markdown(self.renderer.stylesheet, unsafe_allow_html=True)
+
+        if scope == "🏢 集團彙總":
+            self.rollup_dashboard()
+        else:
+            self.risk_dashboard()
+            self.whatif_panel()
+            if self.workspace_db is not None:
+                self.history_panel()
+            self.export_panel()
+
+        st.write("")
+        if st.button(self.texts["restart"], use_container_width=True):
+            self.go(self.pages[0])
+
+    # 矩陣與處方籤包成 fragment，可獨立於頁面其餘部分重跑
+    def risk_dashboard(self):
+        shared, texts, show_matrix = self.shared, self.texts, self.show_matrix
+
+        @st.fragment
+        def risk_dashboard():
+            policies = load_policies()
+            p1, p2 = st.columns(2)
+            with p1:
+                policy = policies[st.selectbox(
+                    "📐 評分政策", list(policies), key="policy",
+                    help="戰情室矩陣與處方籤依此政策判定；集團彙總、What-if 與歷史趨勢仍依 CDM 預設規則",
+                )]
+            with p2:
+                compared = st.multiselect("並列比較", [name for name in policies if name != policy.name], key="compared_policies")
+            st.caption(f"📐 {policy.describe()}")
+
+            # 直接讀取共用工作區增量維護的矩陣快取 (每格統計量與分數分佈)，依政策判定後保留到下一次異動
+            with self.profiler.section("matrix"):
+                matrix = shared.matrix(policy)
+            recommendation_list = risk_cells(matrix)
+
+            # --- 繪製風險矩陣 ---
+            show_matrix(matrix)
+
+            # --- 並列比較：其他政策由同一份分數分佈判定，另列出判定不同的格子 ---
+            if compared:
+                others = {name: shared.matrix(policies[name]) for name in compared}
+                for column, (name, other) in zip(st.columns(len(others)), others.items()):
+                    with column:
+                        st.markdown(f"**{name}**")
+                        st.caption(policies[name].describe())
+                        show_matrix(other)
+                differing = [
+                    [cat, func, matrix[(cat, func)][0]] + [other[(cat, func)][0] for other in others.values()]
+                    for cat, func in matrix
+                    if any(other[(cat, func)] != matrix[(cat, func)] for other in others.values())
+                ]
+                if differing:
+                    st.caption(f"與「{policy.name}」判定不同的格子：{len(differing)} 格")
+                    st.dataframe(
+                        pd.DataFrame(differing, columns=["類別", "功能", policy.name] + list(others)),
+                        hide_index=True,
+                        use_container_width=True,
+                    )
+                else:
+                    st.caption(f"所選政策與「{policy.name}」的判定完全相同。")
+
+            if st.checkbox("🧮 一致性檢查", help="以完整重算比對增量快取，確認兩者結果相同"):
+                mismatches = shared.verify(policy)
+                if mismatches:
+                    st.error(f"快取與完整重算有 {len(mismatches)} 格不一致：{mismatches}")
+                else:
+                    st.success("✅ 快取與完整重算結果一致")
+
+            # --- 格子下鑽：選了格子才由類別索引取出該格的資產 (最差的在前，分頁顯示) ---
+            cells = [cell for cell in matrix if matrix[cell][0] != "no_asset"]
+            picked = st.selectbox(
+                "🔍 檢視格子內的資產",
+                [None] + cells,
+                format_func=lambda cell: "(選擇格子)" if cell is None else f"{cell[0]} - {cell[1]} ({matrix[cell][0]})",
+            )
+            if picked is not None:
+                _, (details, unscored) = shared.read(cell_details, *picked)
+                page_size = 50
+                pages = max(1, -(-len(details) // page_size))
+                d1, d2 = st.columns([1, 3])
+                with d1:
+                    page = st.number_input("頁次", min_value=1, max_value=pages, value=1, key=f"detail_page_{picked}")
+                with d2:
+                    st.caption(f"已評分 {len(details)} 項 (第 {page}/{pages} 頁，每頁 {page_size} 項)，未評分 / N/A {unscored} 項。皇冠低分者排在最前。")
+                shown = details.iloc[(page - 1) * page_size:page * page_size]
+                st.dataframe(
+                    shown.assign(分數=shown["分數"].map(TIER_LABELS_SHORT)),
+                    hide_index=True,
+                    use_container_width=True,
+                )
+
+            # --- 智慧處方籤 ---
+            st.divider()
+            st.subheader(texts["prescription_header"])
+
+            if recommendation_list:
+                st.write(texts["prescription_intro"].format(n=len(recommendation_list)))
+
+                # 跨缺口的最少廠商組合：依嚴重度加權 (皇冠 > Tier 1 > Tier 2) 的貪婪集合覆蓋
+                picks, uncoverable = load_catalog().cover(recommendation_list)
+                if picks:
+                    covered = sum(len(gaps) for _, gaps, _ in picks)
+                    with st.expander(f"🧩 最少廠商組合：{len(picks)} 家即可涵蓋 {covered} 個缺口", expanded=True):
+                        st.dataframe(
+                            pd.DataFrame({
+                                "廠商": [vendor for vendor, _, _ in picks],
+                                "涵蓋缺口": ["、".join(f"{cat}-{func}" for cat, func, _ in gaps) for _, gaps, _ in picks],
+                                "加權分數": [gain for _, _, gain in picks],
+                            }),
+                            hide_index=True,
+                            use_container_width=True,
+                        )
+                        if uncoverable:
+                            st.caption("目錄中尚無廠商可處理：" + "、".join(f"{cat}-{func}" for cat, func, _ in uncoverable))
+
+                vendor_label, vendor_empty = texts["vendor_preview"]
+                button_label, button_help = texts["vendor_button"]
+                for cat, func, status in recommendation_list:
+                    label, desc = texts["gaps"][status]
+                    with st.expander(f"{label}：[{cat} - {func}]", expanded=True):
+                        c1, c2 = st.columns([3, 1])
+                        with c1:
+                            # 顯示資料庫中的預覽廠商
+                            vendor_txt = load_catalog().preview(cat, func, empty=vendor_empty)
+                            st.markdown(f"**診斷：** {desc}")
+                            st.markdown(f"👀 **{vendor_label}：** {vendor_txt}")
+                        with c2:
+                            st.write("")
+                            st.link_button(button_label, url=SECPAAS_URL, help=button_help)
+            elif len(shared.store) == 0:
+                st.warning(texts["no_assets"])
+            else:
+                st.success(texts["healthy"])
+                if texts.get("healthy_link"):
+                    st.link_button(texts["healthy_link"], SECPAAS_URL)
+
+        risk_dashboard()
+
+    # 集團彙總：所有工作區 (單位) 的每格統計量直接加總，命名「群組/單位」即歸入該群組
+    def rollup_dashboard(self):
+        workspace_db, show_matrix = self.workspace_db, self.show_matrix
+
+        @st.fragment
+        def rollup_dashboard():
+            rollup = Rollup.from_workspaces(workspace_db)
+
+            st.subheader("🏢 全企業矩陣")
+            st.caption(f"共 {len(rollup.units)} 個單位 / {len(rollup.group_names)} 個群組。工作區以「群組/單位」命名即歸入該群組。")
+            show_matrix(rollup.enterprise_matrix())
+
+            st.subheader("🗂️ 群組總覽")
+            st.dataframe(rollup.group_summary(), hide_index=True, use_container_width=True)
+
+            g1, g2 = st.columns(2)
+            with g1: group = st.selectbox("群組", rollup.group_names)
+            with g2: unit = st.selectbox("下鑽至單位", ["(整個群組)"] + rollup.members(group))
+            if unit == "(整個群組)":
+                show_matrix(rollup.group_matrix(group))
+                st.dataframe(rollup.unit_summary(group), hide_index=True, use_container_width=True)
+            else:
+                show_matrix(rollup.unit_matrix(unit))
+
+        rollup_dashboard()
+
+    # What-if 模擬：假設性的提升只套在每格統計量上，不會寫入評分；候選方案一次以陣列判定
+    def whatif_panel(self):
+        shared, show_matrix = self.shared, self.show_matrix
+
+        @st.fragment
+        def whatif_panel():
+            st.divider()
+            if not st.toggle("🧪 What-if 模擬：預算內最能消除皇冠風險的提升方案"):
+                return
+            _, sim = shared.read(WhatIf)
+            w1, w2, w3 = st.columns(3)
+            with w1: target = st.selectbox("提升至", [2, 3, 4], index=1, format_func=TIER_LABELS_SHORT.get)
+            with w2: cost_per_step = st.number_input("每提升一級的成本", min_value=1, value=1)
+            with w3:
+                st.write("")
+                crown_only = st.checkbox("只提升皇冠寶石", value=True)
+            actions = sim.upgrades(target, crown_only, cost_per_step=cost_per_step)
+            if actions.empty:
+                st.info("沒有符合條件、可提升的評分。")
+                return
+
+            n_cells = actions.groupby(["類別", "功能"]).ngroups
+            st.caption(f"共 {len(actions)} 個可提升的評分，分布在 {n_cells} 格；全部提升的總成本 {actions['成本'].sum()}。")
+            with st.expander("全部提升後的矩陣"):
+                show_matrix(sim.matrix(actions))
+
+            b1, b2 = st.columns(2)
+            with b1: budget = st.number_input("預算", min_value=0, value=int(actions["成本"].sum() // 2))
+            with b2: limit = st.number_input("候選方案數", min_value=100, max_value=50000, value=10000, step=1000)
+            if st.button("🔎 找出預算內的最佳方案"):
+                # 以格子為單位組合候選方案，依 皇冠風險 -> Tier 1 -> Tier 2 -> 成本 排序
+                plans = sim.cell_plans(actions, limit=int(limit))
+                ranking = sim.rank(actions, plans, budget=budget)
+                if ranking.empty:
+                    st.warning("預算內沒有可行的方案。")
+                    return
+                best = ranking.iloc[0]
+                chosen = sim.expand(actions, plans[int(best["方案"])])
+                st.markdown(
+                    f"**最佳方案**：提升 {int(best['調整數'])} 項評分，成本 {best['成本']:g}，"
+                    f"消除 **{int(best['消除皇冠風險'])}** 格皇冠風險 (共評估 {len(plans)} 個方案)"
+                )
+                show_matrix(sim.matrix(actions, chosen))
+                st.dataframe(actions[chosen], hide_index=True, use_container_width=True)
+                with st.expander("前 10 名方案"):
+                    st.dataframe(ranking, hide_index=True, use_container_width=True)
+
+        whatif_panel()
+
+    # 歷史快照：每個快照只存與前一個快照的差異；趨勢只讀每格統計量，比對時才還原兩端的資產
+    def history_panel(self):
+        workspace_db = self.workspace_db
+
+        @st.fragment
+        def history_panel():
+            st.divider()
+            if not st.toggle("🕰️ 歷史快照與趨勢"):
+                return
+            workspace = st.session_state.workspace
+            h1, h2 = st.columns([3, 1])
+            with h1: label = st.text_input("快照標籤", placeholder="例：2026 Q3 評估")
+            with h2:
+                st.write("")
+                if st.button("📸 建立快照", use_container_width=True):
+                    workspace_db.snapshot(workspace, label.strip())
+                    st.toast("已建立快照")
+
+            snapshots, *aggregates = workspace_db.snapshot_cells(workspace)
+            if not snapshots:
+                st.info("尚無快照。建立快照後即可檢視各季的成熟度變化。")
+                return
+            labels = {i: f"#{n} {label or created_at}" for n, (i, label, created_at) in enumerate(snapshots, 1)}
+            statuses, tiers = classify_cells(*aggregates)
+
+            st.markdown("**風險格數趨勢**")
+            st.line_chart(pd.DataFrame(
+                {status: (statuses == status).sum(axis=(1, 2)) for status in RISK_STATUSES},
+                index=pd.Index(range(1, len(snapshots) + 1), name="快照"),
+            ))
+
+            t1, t2 = st.columns(2)
+            with t1: category = st.selectbox("類別", CATEGORIES, key="trend_category")
+            with t2: function = st.selectbox("功能", FUNCTIONS, key="trend_function")
+            c, f = CATEGORIES.index(category), FUNCTIONS.index(function)
+            _, sums, counts, crown_lows = aggregates
+            cell = pd.DataFrame({
+                "快照": list(labels.values()),
+                "狀態": statuses[:, c, f],
+                "Tier": tiers[:, c, f],
+                "平均分數": pd.Series(sums[:, c, f], dtype=float) / pd.Series(counts[:, c, f]).where(lambda n: n > 0),
+                "已評分": counts[:, c, f],
+                "皇冠低分": crown_lows[:, c, f],
+            })
+            st.line_chart(cell.set_index(pd.Index(range(1, len(cell) + 1), name="快照"))[["平均分數"]])
+            st.dataframe(cell, hide_index=True, use_container_width=True)
+
+            ids = list(labels)
+            d1, d2, d3 = st.columns([2, 2, 1])
+            with d1: old = st.selectbox("比對：從", ids, index=max(len(ids) - 2, 0), format_func=labels.get)
+            with d2: new = st.selectbox("到", ids, index=len(ids) - 1, format_func=labels.get)
+            with d3:
+                st.write("")
+                compare = st.button("🔍 比對", use_container_width=True)
+            if compare and old != new:
+                added, removed, changes = workspace_db.snapshot_diff(old, new)
+                m1, m2, m3 = st.columns(3)
+                m1.metric("新增資產", len(added))
+                m2.metric("刪除資產", len(removed))
+                m3.metric("變動欄位", len(changes))
+                st.dataframe(changes.astype({"前": str, "後": str}), hide_index=True, use_container_width=True)
+                if added or removed:
+                    st.caption(f"新增：{'、'.join(added[:20])}{' ...' if len(added) > 20 else ''}　刪除：{'、'.join(removed[:20])}{' ...' if len(removed) > 20 else ''}")
+
+            with st.expander("🗂️ 管理快照"):
+                st.dataframe(
+                    pd.DataFrame(workspace_db.snapshots(workspace), columns=["id", "標籤", "建立時間", "資產數", "儲存列數", "完整內容"]),
+                    hide_index=True,
+                    use_container_width=True,
+                )
+                victim = st.selectbox("刪除快照", ids, format_func=labels.get)
+                if st.button("🗑️ 刪除"):
+                    workspace_db.delete_snapshot(victim)
+                    st.rerun()
+
+        history_panel()
+
+    # 報表匯出：以目前的評分政策與當下的資產快照，在背景執行緒寫入暫存檔；
+    # 匯出中這個 fragment 每秒重跑一次顯示進度 (頁面其餘部分照常操作)，寫完才提供下載
+    def export_panel(self):
+        shared, renderer = self.shared, self.renderer
+        export_job = st.session_state.get('export_job')
+        polling = export_job is not None and export_job.running
+
+        @st.fragment(run_every=1 if polling else None)
+        def export_panel():
+            st.divider()
+            if not st.toggle("📤 匯出報表：矩陣、處方籤與每項資產的評分"):
+                return
+            job = st.session_state.get('export_job')
+            e1, e2 = st.columns([3, 1])
+            with e1:
+                fmt = st.radio("格式", list(EXPORT_FORMATS), format_func=lambda f: EXPORT_FORMATS[f][0], horizontal=True, key="export_format")
+            with e2:
+                st.write("")
+                start = st.button("📤 開始匯出", use_container_width=True, disabled=job is not None and job.running)
+            if start:
+                if job is not None:
+                    job.discard()
+                policy_name = st.session_state.get('policy', DEFAULT_POLICY["name"])
+                report = Report.from_shared(
+                    shared, load_policies()[policy_name], catalog=load_catalog(),
+                    meta=[("工作區", st.session_state.workspace), ("評分政策", policy_name)],
+                )
+                st.session_state.export_job = ExportJob(report, fmt, theme=renderer.theme).start()
+                st.rerun()  # 整頁重跑，fragment 改為每秒輪詢
+            if job is None:
+                return
+            if job.running:
+                st.progress(job.progress, text=f"匯出中… {job.rows_done:,} / {job.total:,} 項資產")
+                if st.button("✖️ 取消匯出"):
+                    job.cancel()
+            elif polling:
+                st.rerun()  # 剛寫完：整頁重跑一次，停止輪詢
+            elif job.ok:
+                st.success(f"✅ 匯出完成：{job.total:,} 項資產，{job.size() / 1e6:.1f} MB，{job.seconds:.1f} 秒")
+                # 點下載時才讀檔 (讀完即刪除暫存檔)，內容留在工作階段直到下一次匯出
+                st.download_button(
+                    f"⬇️ 下載 {job.file_name}", job.read, file_name=job.file_name, mime=job.mime,
+                    on_click="ignore", type="primary",
+                )
+            else:
+                st.warning(f"匯出未完成：{job.error}")
+
+        export_panel()
+
+    # ==========================================
+    # 側邊欄：效能診斷 (放在最後，顯示的是本次重跑的量測)
+    # ==========================================
+    def profiling_sidebar(self):
+        profiler, shared, workspace_db = self.profiler, self.shared, self.workspace_db
+        with st.sidebar.expander("🩺 效能診斷"):
+            st.toggle("啟用量測", key="profiling", help="記錄矩陣計算、HTML、資產清單、評分元件與匯入的耗時；關閉時不計時")
+            if not profiler.enabled:
+                return
+            # 所有 session 共用的資料庫連線不算在這個 session 內 (共用工作區 shared 仍會列出，只在版本變動時重新估算)
+            state_bytes = {
+                key: profiler.cached_size(value, shared.version, exclude=[workspace_db]) if value is shared
+                else estimate_size(value, exclude=[workspace_db])
+                for key, value in st.session_state.items()
+            }
+            profiler.end(widgets=widget_count(), session_state_bytes=state_bytes, assets=len(shared.store))
+            st.dataframe(profiler.summary(), hide_index=True, use_container_width=True)
+            m1, m2 = st.columns(2)
+            m1.metric("Session State", f"{sum(state_bytes.values()) / 1e6:.1f} MB")
+            m2.metric("元件數", profiler.gauges.get("widgets", "—"))
+            largest = sorted(state_bytes.items(), key=lambda item: -item[1])[:5]
+            st.caption("最大的項目：" + "、".join(f"{key} {size / 1e6:.2f} MB" for key, size in largest))
+            d1, d2 = st.columns(2)
+            d1.download_button("📄 JSON Lines", profiler.log_lines(), file_name="cdm-profile.jsonl",
+                               mime="application/json", use_container_width=True)
+            d2.download_button("📈 Prometheus", profiler.prometheus({"app": self.name}), file_name="cdm-metrics.prom",
+                               mime="text/plain", use_container_width=True)
@@ -0,0 +1,25 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("CDM_DB_PATH", ":memory:")  # 測試時不寫入使用者的工作區資料庫
+
+from cdm_core import CATEGORIES, FUNCTIONS
+
+
+# --- 隨機資產清單：rng 為 random.Random，回傳 (assets DataFrame, {(資產名稱, 功能): 分數 0~4}) ---
+@pytest.fixture
+def random_inventory():
+    def make(rng, n, crown_ratio=0.3, prefix="a"):
+        names = [f"{prefix}{i}" for i in range(n)]
+        assets = pd.DataFrame({
+            "資產名稱": names,
+            "類別": [rng.choice(CATEGORIES) for _ in names],
+            "皇冠寶石": [rng.random() < crown_ratio for _ in names],
+        })
+        return assets, {(name, f): rng.randint(0, 4) for name in names for f in FUNCTIONS}
+    return make
@@ -0,0 +1,54 @@
+import random
+
+import pytest
+
+from cdm_core import CATEGORIES, FUNCTIONS, SEVERITY_WEIGHTS, SOLUTIONS, VendorCatalog
+
+
+def _greedy(solutions, gaps):
+    # 參考：每輪逐家廠商加總尚未涵蓋缺口的權重，取最大者 (同分取目錄中較前者)
+    remaining = {(cat, func): SEVERITY_WEIGHTS[status] for cat, func, status in gaps}
+    vendors = list(dict.fromkeys(v for vendors in solutions.values() for v in vendors))
+    picks = []
+    while True:
+        best, best_gain = None, 0
+        for vendor in vendors:
+            gain = sum(w for cell, w in remaining.items() if vendor in solutions.get(cell, ()))
+            if gain > best_gain:
+                best, best_gain = vendor, gain
+        if best is None:
+            return picks
+        picks.append((best, best_gain))
+        remaining = {cell: w for cell, w in remaining.items() if best not in solutions.get(cell, ())}
+
+
+@pytest.mark.parametrize("seed", range(100))
+def test_cover_matches_greedy_reference(seed):
+    rng = random.Random(seed)
+    vendors = [f"廠商{i}" for i in range(rng.randint(1, 40))]
+    cells = [(cat, func) for cat in CATEGORIES for func in FUNCTIONS]
+    # 部分格子沒有任何廠商；少數廠商只出現在矩陣外的格子
+    solutions = {cell: rng.sample(vendors, rng.randint(0, min(6, len(vendors)))) for cell in cells if rng.random() < 0.8}
+    solutions[("其他", "識別")] = ["矩陣外廠商"]
+    gaps = [(cat, func, rng.choice(list(SEVERITY_WEIGHTS))) for cat, func in rng.sample(cells, rng.randint(0, 25))]
+
+    picks, uncoverable = VendorCatalog(solutions).cover(gaps)
+    assert [(vendor, gain) for vendor, _, gain in picks] == _greedy(solutions, gaps)
+    assert uncoverable == [gap for gap in gaps if not solutions.get(gap[:2])]
+    covered = [gap for _, newly, _ in picks for gap in newly]
+    assert sorted(covered) == sorted(gap for gap in gaps if solutions.get(gap[:2]))
+    for vendor, newly, gain in picks:
+        assert all(vendor in solutions[gap[:2]] for gap in newly)
+        assert gain == sum(SEVERITY_WEIGHTS[status] for _, _, status in newly)
+
+
+def test_default_catalog():
+    catalog = VendorCatalog()
+    assert catalog.vendors("資料", "識別") == list(SOLUTIONS[("資料", "識別")])
+    assert catalog.vendors("其他", "識別") == []
+    vendor = SOLUTIONS[("資料", "識別")][0]
+    assert ("資料", "識別") in catalog.vendor_cells(vendor)
+    assert catalog.vendor_cells("不存在的廠商") == []
+    assert catalog.cover([]) == ([], [])
+    assert VendorCatalog({("資料", "識別"): ["a", "b", "c"]}).preview("資料", "識別", limit=2) == "a、b..."
+    assert VendorCatalog({}).preview("資料", "識別", empty="-") == "-"
@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+from cdm_core import DEFAULT_RULE, DEFAULT_RULES, RuleClassifier
+
+# 關鍵字互相包含 (ad / admin、nas / sql、net / network...) 與各類別的皇冠關鍵字，另加不會命中的字
+WORDS = [kw for rule in DEFAULT_RULES for kw in rule["keywords"]] + ["核心", "生產", "總經理", "nas"] + [
+    "ADMIN", "SQL", "Network", "NAS", "madness", "badge", "Database", "主機", "筆電", "伺服器", "-", " ", "01",
+]
+
+
+def _original(line):
+    # 原本 app_ai.py 匯入迴圈內的 if / elif 判斷
+    line_lower = line.lower()
+    if any(x in line_lower for x in ['sql', 'db', 'data', '個資', 'database']):
+        return "資料", True
+    elif any(x in line_lower for x in ['ad', 'admin', 'user', '帳號', 'vpn']):
+        return "使用者", False
+    elif any(x in line_lower for x in ['cisco', 'switch', 'wifi', 'router', 'net']):
+        return "網路", '核心' in line
+    elif any(x in line_lower for x in ['office', 'erp', 'slack', 'app', 'aws']):
+        return "應用程式", '生產' in line
+    return "裝置", '總經理' in line or 'nas' in line_lower
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_original_rules(seed):
+    rng = random.Random(seed)
+    lines = ["".join(rng.choice(WORDS) for _ in range(rng.randint(0, 6))) for _ in range(10000)]
+    assert RuleClassifier().classify(lines) == [_original(line) for line in lines]
+
+
+def test_custom_rules():
+    classifier = RuleClassifier(
+        rules=[
+            {"category": "網路", "keywords": ["fw", "firewall"], "crown": ["edge"]},
+            {"category": "資料", "keywords": ["fire"], "crown": True},
+        ],
+        default=dict(DEFAULT_RULE, crown=[]),
+    )
+    assert classifier.classify(["Edge Firewall", "fire safe", "firewall", "NAS"]) == [
+        ("網路", True), ("資料", True), ("網路", False), ("裝置", False),
+    ]
+    assert RuleClassifier(rules=[], default={"category": "裝置", "crown": []}).classify(["sql"]) == [("裝置", False)]
+
+
+def test_streaming_chunks():
+    lines = (f"sql-{i}" for i in range(25))
+    chunks = list(RuleClassifier().iter_classify(lines, chunk_size=10))
+    assert [done for done, _ in chunks] == [10, 20, 25]
+    assert sum(len(chunk) for _, chunk in chunks) == 25
+    assert chunks[-1][1].iloc[-1].tolist() == ["sql-24", "資料", True]
@@ -0,0 +1,109 @@
+import json
+
+import pytest
+
+from cdm_core import FUNCTIONS, compute_matrix
+from cdm_core.cli import discover, load_organization, main, score_organization
+
+INVENTORY = (
+    "資產名稱,類別,皇冠寶石,識別,保護,偵測,應變,復原\n"
+    "核心資料庫,data,是,1,3,,0,2\n"
+    "前台網站,app,,4,4,4,4,4\n"
+    "核心資料庫,資料,,4,4,4,4,4\n"  # 重複名稱：保留第一筆
+    ",網路,,1,1,1,1,1\n"  # 沒有名稱：略過
+    "VPN,帳號,v,2,,,,\n"
+)
+
+
+def _write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def _orgs(tmp_path):
+    # 兩個正常的組織 + 一個損毀的 xlsx
+    _write(tmp_path / "甲.csv", INVENTORY)
+    _write(tmp_path / "甲.assessments.csv", "資產名稱,功能,分數\n前台網站,識別,0\nVPN,保護,3\n不存在,識別,4\n")
+    _write(tmp_path / "乙.csv", "資產名稱,類別\nsw-01,network\n")
+    (tmp_path / "丙.xlsx").write_bytes(b"not a zip file")
+    _write(tmp_path / "說明.txt", "略過")
+    return tmp_path
+
+
+def test_discover(tmp_path):
+    directory = _orgs(tmp_path)
+    assert discover(str(directory)) == [
+        ("丙", str(directory / "丙.xlsx"), None),
+        ("乙", str(directory / "乙.csv"), None),
+        ("甲", str(directory / "甲.csv"), str(directory / "甲.assessments.csv")),
+    ]
+
+
+def test_load_organization(tmp_path):
+    directory = _orgs(tmp_path)
+    assets, assessments = load_organization(str(directory / "甲.csv"), str(directory / "甲.assessments.csv"))
+    assert assets.values.tolist() == [["核心資料庫", "資料", True], ["前台網站", "應用程式", False], ["VPN", "使用者", True]]
+    assert list(assets.index) == [0, 1, 2]
+    expected = {("核心資料庫", "識別"): 1, ("核心資料庫", "保護"): 3, ("核心資料庫", "復原"): 2, ("VPN", "識別"): 2, ("VPN", "保護"): 3}
+    expected.update({("前台網站", f): 4 for f in FUNCTIONS if f != "識別"})  # 評分檔的 0 清除清單內的分數
+    assert assessments == expected
+
+
+def test_errors_report_the_row_in_the_file(tmp_path):
+    # 重複與空白名稱被略過後，列號仍對應檔案內的位置 (表頭為第 1 列)
+    bad_score = _write(tmp_path / "a.csv", INVENTORY + "壞分數,data,,9,,,,\n")
+    with pytest.raises(ValueError, match="第 7 列為 '9'"):
+        load_organization(bad_score)
+    bad_category = _write(tmp_path / "b.csv", INVENTORY + "未知,桌子,,,,,,\n")
+    with pytest.raises(ValueError, match="第 7 列為未知的資產類別 '桌子'"):
+        load_organization(bad_category)
+    long = _write(tmp_path / "b.assessments.csv", "資產名稱,功能,分數\n核心資料庫,識別,1\n核心資料庫,保護,x\n")
+    with pytest.raises(ValueError, match="第 3 列為 'x'"):
+        load_organization(_write(tmp_path / "c.csv", INVENTORY), long)
+    with pytest.raises(ValueError, match="缺少欄位：類別"):
+        load_organization(_write(tmp_path / "d.csv", "資產名稱\nx\n"))
+
+
+def test_score_organization_matches_engine(tmp_path):
+    directory = _orgs(tmp_path)
+    result = score_organization("甲", str(directory / "甲.csv"), str(directory / "甲.assessments.csv"), check=True)
+    matrix = compute_matrix(*load_organization(str(directory / "甲.csv"), str(directory / "甲.assessments.csv")))
+    assert result["assets"] == 3 and result["crown_assets"] == 2
+    assert result["check_mismatches"] == []
+    assert all(
+        (cell["status"], cell["tier"]) == matrix[(cat, func)]
+        for cat, row in result["matrix"].items() for func, cell in row.items()
+    )
+
+
+def test_corrupt_file_is_reported(tmp_path):
+    result = score_organization("丙", str(_orgs(tmp_path) / "丙.xlsx"))
+    assert result["error"].startswith("BadZipFile")
+    assert "matrix" not in result
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_bad_file_does_not_stop_the_batch(tmp_path, capsys, jobs):
+    directory = tmp_path / "orgs"
+    directory.mkdir()
+    _orgs(directory)
+    out = tmp_path / "out"
+    assert main(["score", str(directory), "-o", str(out), "-j", jobs, "--check"]) == 1  # 有錯誤的檔案：非 0 結束
+    assert sorted(p.name for p in out.iterdir()) == [
+        "matrix.csv", "recommendations.csv", "summary.csv", "丙.json", "乙.json", "甲.json",
+    ]
+    assert "BadZipFile" in json.loads((out / "丙.json").read_text(encoding="utf-8"))["error"]
+    assert json.loads((out / "甲.json").read_text(encoding="utf-8"))["assets"] == 3
+    summary = (out / "summary.csv").read_text(encoding="utf-8-sig").splitlines()
+    assert [line.split(",")[0] for line in summary] == ["organization", "丙", "乙", "甲"]
+    assert "完成 3 個組織 (1 個錯誤)" in capsys.readouterr().err
+
+
+def test_exit_code(tmp_path, capsys):
+    _write(tmp_path / "甲.csv", INVENTORY)
+    assert main(["score", str(tmp_path), "-o", str(tmp_path / "out"), "-j", "1", "-f", "json", "--check"]) == 0
+    assert sorted(p.name for p in (tmp_path / "out").iterdir()) == ["甲.json"]
+    with pytest.raises(SystemExit):
+        main(["score", str(tmp_path / "out"), "-o", str(tmp_path / "x")])  # 目錄內沒有資產清單
+    with pytest.raises(SystemExit):
+        main(["score", str(tmp_path), "--check", "--policy", "p.json"])
@@ -0,0 +1,79 @@
+import random
+
+import pandas as pd
+
+from cdm_core import merge_duplicates, name_tokens, near_duplicates
+
+
+def _assets(names, crowns=None):
+    crowns = crowns or [False] * len(names)
+    return pd.DataFrame({"資產名稱": names, "類別": "裝置", "皇冠寶石": crowns})
+
+
+def _synthetic(n, seed, dup_rate=0.1):
+    rng = random.Random(seed)
+    names = []
+    for i in range(n):
+        if names and rng.random() < dup_rate:
+            words = rng.choice(names).split()
+            rng.shuffle(words)
+            name = rng.choice([" ", "  ", " - "]).join(words)
+            names.append(name.upper() if rng.random() < 0.5 else name.lower())
+        else:
+            names.append(f"{rng.choice(['Synology', 'Cisco', 'Dell'])} {rng.choice(['NAS 備份機', '核心交換器', '防火牆', '資料庫主機'])} {i:04d}")
+    return names
+
+
+def test_name_tokens_normalize_case_width_and_punctuation():
+    assert name_tokens("ＨＲ-DB 資料庫") == name_tokens("hr db  資料庫") == {"hr", "db", "資料", "料庫"}
+
+
+def test_rewritten_name_is_merged_into_first_occurrence():
+    merges = near_duplicates(["Synology NAS 機房備份機", "synology nas 備份機", "Web Server 01"])
+    assert merges[["資產名稱", "合併至"]].values.tolist() == [["synology nas 備份機", "Synology NAS 機房備份機"]]
+
+
+def test_different_numbers_are_not_duplicates():
+    assert near_duplicates(["Web Server 01", "Web Server 02"]).empty
+
+
+def test_repeated_name_is_not_offered_as_merge_into_itself():
+    lines = ["Synology NAS 機房備份機", "synology nas 備份機", "HR DB", "HR DB", "Web Server 01"]
+    merges = near_duplicates(lines)
+    assert (merges["資產名稱"] != merges["合併至"]).all()
+    assert "HR DB" not in set(merges["資產名稱"])
+
+    kept = merge_duplicates(_assets(lines), merges.assign(合併=True))
+    assert kept["資產名稱"].tolist() == ["Synology NAS 機房備份機", "HR DB", "Web Server 01"]
+
+
+def test_merge_removes_only_the_merged_copy():
+    assets = _assets(["HR DB", "HR DB", "hr db"], crowns=[False, False, True])
+    merges = pd.DataFrame({"資產名稱": ["hr db", "HR DB"], "合併至": ["HR DB", "HR DB"], "合併": [True, True]})
+    kept = merge_duplicates(assets, merges)
+    assert kept["資產名稱"].tolist() == ["HR DB"]
+    assert kept["皇冠寶石"].tolist() == [True]  # 併掉的皇冠寶石把保留的資產也標為皇冠寶石
+
+
+def test_unchecked_merge_is_imported():
+    merges = near_duplicates(["Cisco 核心交換器 A", "cisco 核心交換器 a"]).assign(合併=False)
+    assert len(merge_duplicates(_assets(["Cisco 核心交換器 A", "cisco 核心交換器 a"]), merges)) == 2
+
+
+def test_exact_match_with_existing_asset_is_not_listed():
+    merges = near_duplicates(["HR DB", "hr db", "Web Server 01"], existing=["HR DB", "Web Server 02"])
+    assert merges.values.tolist() == [["hr db", "HR DB", 1.0, True]]
+
+
+def test_recall_matches_pairwise_comparison():
+    names = _synthetic(600, seed=3)
+    tokens = [name_tokens(n) for n in names]
+    digits = [{t for t in ts if any(c.isdigit() for c in t)} for ts in tokens]
+    expected = {
+        names[j]
+        for i in range(len(names)) for j in range(i + 1, len(names))
+        if names[j] != names[i] and digits[i] == digits[j] and len(tokens[i] & tokens[j]) / len(tokens[i] | tokens[j]) >= 0.6
+    }
+    got = set(near_duplicates(names)["資產名稱"])
+    assert got <= expected
+    assert len(got) >= 0.95 * len(expected)
@@ -0,0 +1,93 @@
+import gc
+import os
+import random
+import threading
+
+import pytest
+
+import cdm_core.export
+from cdm_core import AssessmentStore, ExportJob, Report, SharedWorkspace
+
+
+@pytest.fixture
+def report(random_inventory):
+    assets, scores = random_inventory(random.Random(0), 50)
+    store = AssessmentStore()
+    store.add_assets(assets)
+    store.update(scores)
+    return Report.from_shared(SharedWorkspace(store))
+
+
+def _finished(job):
+    job._thread.join()
+    return job
+
+
+def _slow_format(monkeypatch, release):
+    # 寫入一半後等待 release，讓測試在匯出中途操作
+    def write(report, path, progress, theme):
+        with open(path, "wb") as f:
+            f.write(b"partial")
+        progress(1)
+        release.wait(5)
+        progress(2)
+
+    monkeypatch.setitem(cdm_core.export.EXPORT_FORMATS, "slow", ("slow", ".bin", "application/octet-stream", write))
+
+
+@pytest.mark.parametrize("fmt", list(cdm_core.export.EXPORT_FORMATS))
+def test_read_removes_the_temp_file(report, fmt):
+    job = _finished(ExportJob(report, fmt).start())
+    assert job.ok and os.path.exists(job.path)
+    size = job.size()
+    data = job.read()
+    assert len(data) == size > 0
+    assert not os.path.exists(job.path)
+    assert job.read() is data and job.size() == size  # 重複下載沿用同一份內容
+    job.discard()
+    assert job.size() == 0
+
+
+def test_dropped_job_removes_the_temp_file(report):
+    job = _finished(ExportJob(report, "html").start())
+    path = job.path
+    assert os.path.exists(path)
+    del job
+    gc.collect()
+    assert not os.path.exists(path)
+
+
+def test_discard_removes_the_temp_file(report):
+    job = _finished(ExportJob(report, "html").start())
+    job.discard()
+    assert not os.path.exists(job.path)
+
+
+def test_cancel_and_discard_while_running(report, monkeypatch):
+    release = threading.Event()
+    _slow_format(monkeypatch, release)
+    job = ExportJob(report, "slow").start()
+    job.discard()  # 執行中：由背景執行緒收尾時刪除
+    release.set()
+    _finished(job)
+    assert job.error == "已取消" and not job.ok
+    assert not os.path.exists(job.path)
+
+
+def test_failed_export_removes_the_temp_file(report, monkeypatch):
+    def write(report, path, progress, theme):
+        with open(path, "wb") as f:
+            f.write(b"partial")
+        raise OSError("disk full")
+
+    monkeypatch.setitem(cdm_core.export.EXPORT_FORMATS, "broken", ("broken", ".bin", "application/octet-stream", write))
+    job = _finished(ExportJob(report, "broken").start())
+    assert job.error == "OSError: disk full"
+    assert not os.path.exists(job.path)
+
+
+def test_export_over_the_download_limit_fails(report, monkeypatch):
+    monkeypatch.setattr(cdm_core.export, "MAX_DOWNLOAD_BYTES", 100)
+    job = _finished(ExportJob(report, "html").start())
+    assert not job.ok and "超過頁面下載上限" in job.error
+    assert not os.path.exists(job.path)
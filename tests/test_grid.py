@@ -0,0 +1,78 @@
+import random
+
+import pandas as pd
+import pytest
+
+from cdm_core import CATEGORIES, FUNCTIONS, AssessmentStore, SharedWorkspace, assessment_grid, cell_details, grid_changes
+
+
+def _details(store, category, function):
+    # 參考：逐項資產依 (不是皇冠低分, 分數, 清單順序) 排序
+    rows = [
+        (name, crown, store[(name, function)])
+        for name, cat, crown in store.assets[["資產名稱", "類別", "皇冠寶石"]].itertuples(index=False)
+        if cat == category
+    ]
+    assessed = [(k, row) for k, row in enumerate(rows) if row[2] > 0]
+    assessed.sort(key=lambda item: (not (item[1][1] and item[1][2] < 3), item[1][2], item[0]))
+    return [(name, crown, score, crown and score < 3) for _, (name, crown, score) in assessed], len(rows) - len(assessed)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_cell_details_match_reference(random_inventory, seed):
+    rng = random.Random(seed)
+    assets, scores = random_inventory(rng, rng.choice([0, 5, 60, 400]))
+    store = AssessmentStore()
+    store.add_assets(assets)
+    store.update(scores)
+    store.remove_assets(rng.sample(assets["資產名稱"].tolist(), len(assets) // 3))  # 刪除後仍依清單順序
+    for category in CATEGORIES:
+        for function in FUNCTIONS:
+            details, unscored = cell_details(store, category, function)
+            expected, expected_unscored = _details(store, category, function)
+            assert list(details.itertuples(index=False, name=None)) == expected
+            assert unscored == expected_unscored
+
+
+def test_worst_first_with_ties():
+    store = AssessmentStore()
+    for name, crown, score in [
+        ("web-a", False, 1), ("db-a", True, 4), ("db-b", True, 2), ("web-b", False, 1),
+        ("db-c", True, 1), ("db-d", True, 3), ("web-c", False, 0), ("db-e", True, 2), ("db-f", True, 0),
+    ]:
+        store.add_asset(name, "資料", crown)
+        store[(name, "偵測")] = score
+    store.add_asset("其他類別", "網路", True)
+    store[("其他類別", "偵測")] = 1
+
+    details, unscored = cell_details(store, "資料", "偵測")
+    # 皇冠低分 (1、2 分) 最前，依分數排序、同分依清單順序；其後是其他資產 (含 3 分以上的皇冠寶石)
+    assert details["資產名稱"].tolist() == ["db-c", "db-b", "db-e", "web-a", "web-b", "db-d", "db-a"]
+    assert details["皇冠風險"].tolist() == [True, True, True, False, False, False, False]
+    assert details["分數"].tolist() == [1, 2, 2, 1, 1, 3, 4]
+    assert unscored == 2  # web-c、db-f 未評分 / N/A，不列在明細
+
+    empty, unscored = cell_details(store, "使用者", "偵測")
+    assert empty.empty and list(empty.columns) == ["資產名稱", "皇冠寶石", "分數", "皇冠風險"]
+    assert unscored == 0
+
+
+def test_save_then_revert_in_grid():
+    # 批次表格每次儲存後整頁重跑：重新讀取表格與版本，下一次儲存與剛寫入的分數比對
+    shared = SharedWorkspace(AssessmentStore())
+    shared.add_assets(pd.DataFrame({"資產名稱": ["db-a", "db-b"], "類別": ["資料", "資料"], "皇冠寶石": [True, False]}))
+    shared.update({("db-a", "偵測"): 1, ("db-b", "偵測"): 2})
+
+    def save(edit):
+        base, page = shared.read(assessment_grid, "資料")
+        edited = page.copy()
+        for (name, function), score in edit.items():
+            edited.loc[edited["資產名稱"] == name, function] = score
+        changes = grid_changes(page, edited)
+        return changes, shared.update(changes, base, "me")
+
+    assert save({("db-a", "偵測"): 3}) == ({("db-a", "偵測"): 3}, {})
+    assert shared.store[("db-a", "偵測")] == 3
+    # 改回原值：與重新讀取的表格比對才看得到變動，且只計入這一筆
+    assert save({("db-a", "偵測"): 1}) == ({("db-a", "偵測"): 1}, {})
+    assert shared.store[("db-a", "偵測")] == 1 and shared.store[("db-b", "偵測")] == 2
@@ -0,0 +1,118 @@
+import io
+
+import pytest
+
+from cdm_core import AssessmentStore, InventoryImport, RuleClassifier, iter_file_chunks, read_header
+
+
+def _csv(text, encoding="utf-8"):
+    return io.BytesIO(text.encode(encoding))
+
+
+def _xlsx(rows):
+    openpyxl = pytest.importorskip("openpyxl")
+    book = openpyxl.Workbook()
+    sheet = book.active
+    for row in rows:
+        sheet.append(row)
+    out = io.BytesIO()
+    book.save(out)
+    out.seek(0)
+    return out
+
+
+def _import(file, filename, store=None, chunk_size=20000, **columns):
+    job = InventoryImport(store or AssessmentStore(), RuleClassifier(), **columns)
+    for _, chunk in iter_file_chunks(file, filename, chunk_size=chunk_size):
+        job.feed(chunk)
+    return job, job.result()
+
+
+def test_utf8_bom_header_and_rows():
+    file = _csv("﻿名稱,類別,重要\n核心資料庫,資料,是\n前台網站,app,\n", "utf-8")
+    assert read_header(file, "清單.csv") == ["名稱", "類別", "重要"]
+    assert file.tell() == 0
+    _, assets = _import(file, "清單.csv", name_column="名稱", category_column="類別", crown_column="重要")
+    assert assets.values.tolist() == [["核心資料庫", "資料", True], ["前台網站", "應用程式", False]]
+
+
+def test_cp950_file():
+    file = _csv("資產名稱,類別\n財務 ERP 主機,系統\n研發 NAS,設備\n", "cp950")
+    assert read_header(file, "清單.csv") == ["資產名稱", "類別"]
+    _, assets = _import(file, "清單.csv", name_column="資產名稱", category_column="類別")
+    assert assets[["資產名稱", "類別"]].values.tolist() == [["財務 ERP 主機", "應用程式"], ["研發 NAS", "裝置"]]
+
+
+def test_cp950_file_with_ascii_head():
+    # 前 64 KB 以上全是英數字，中文在檔尾：不能只看檔頭就判定為 UTF-8
+    rows = "".join(f"host-{i:05d},device\n" for i in range(5000))
+    file = _csv("name,category\n" + rows + "核心資料庫,data\n", "cp950")
+    assert len(file.getvalue()) > 65536
+    job, assets = _import(file, "cmdb.csv", chunk_size=1000, name_column="name", category_column="category")
+    assert job.read == 5001
+    assert assets.iloc[-1].tolist() == ["核心資料庫", "資料", False]
+
+
+def test_undecodable_bytes_are_replaced():
+    file = io.BytesIO("名稱\n核心資料庫\n".encode("utf-8") + b"bad \xff\xfe host\n")
+    _, assets = _import(file, "清單.csv", name_column="名稱")
+    assert assets["資產名稱"].tolist() == ["核心資料庫", "bad �� host"]
+
+
+def test_xlsx_file():
+    file = _xlsx([
+        ["資產名稱", "類別", "皇冠寶石", None, "資產名稱"],
+        ["Cisco 核心交換器", "Network", "Y", None, "x"],
+        ["HR 個資資料庫", None, None],
+        [12345, "users", "否"],
+    ])
+    assert read_header(file, "清單.xlsx") == ["資產名稱", "類別", "皇冠寶石", "欄位4", "資產名稱.1"]
+    job, assets = _import(file, "清單.xlsx", name_column="資產名稱", category_column="類別", crown_column="皇冠寶石")
+    assert assets.values.tolist() == [
+        ["Cisco 核心交換器", "網路", True],
+        ["HR 個資資料庫", "資料", False],  # 類別空白：交給分類引擎；皇冠寶石欄位空白即為否
+        ["12345", "使用者", False],
+    ]
+    assert job.classified == 1
+
+
+def test_unknown_category_goes_to_classifier():
+    file = _csv("name,type,crown\nAWS 生產環境,雲端,no\nOffice 365,mystery,yes\n")
+    job, assets = _import(file, "a.csv", name_column="name", category_column="type", crown_column="crown")
+    assert assets.values.tolist() == [["AWS 生產環境", "應用程式", False], ["Office 365", "應用程式", True]]
+    assert job.classified == 2
+
+
+def test_missing_columns():
+    # 對應的類別欄位不存在：交給分類引擎；皇冠寶石欄位不存在：與空白相同 (否)
+    file = _csv("name\nSQL 伺服器\n\n總經理筆電\n")
+    job, assets = _import(file, "a.csv", name_column="name", category_column="類別")
+    assert assets.values.tolist() == RuleClassifier().to_assets(["SQL 伺服器", "總經理筆電"]).values.tolist()
+    assert job.classified == 2
+    file.seek(0)
+    _, assets = _import(file, "a.csv", name_column="name", crown_column="皇冠寶石")
+    assert assets.values.tolist() == [["SQL 伺服器", "資料", False], ["總經理筆電", "裝置", False]]
+
+    # 名稱欄位不存在：每一列都視為空白名稱而略過
+    job, assets = _import(_csv("a,b\n1,2\n"), "a.csv", name_column="name")
+    assert assets.empty and job.skipped == 1
+
+
+def test_duplicates_and_existing_assets_are_skipped():
+    store = AssessmentStore()
+    store.add_asset("既有主機", "裝置", False)
+    file = _csv("名稱\n既有主機\n新主機\n 新主機 \n新主機\n")
+    job, assets = _import(file, "a.csv", store=store, chunk_size=2, name_column="名稱")
+    assert assets["資產名稱"].tolist() == ["新主機"]
+    assert (job.read, job.skipped) == (4, 3)
+
+
+def test_progress_reaches_one():
+    file = _csv("name\n" + "".join(f"asset-{i}\n" for i in range(100)))
+    progress = [p for p, _ in iter_file_chunks(file, "a.csv", chunk_size=30)]
+    assert len(progress) == 4 and progress == sorted(progress) and progress[-1] == 1.0
+
+
+def test_unsupported_file_type():
+    with pytest.raises(ValueError):
+        read_header(_csv("x"), "清單.pdf")
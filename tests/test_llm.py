@@ -0,0 +1,145 @@
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from cdm_core import ClassificationCache, LLMClassifier, RuleClassifier, normalize_line
+
+ITEM = re.compile(r"^(\d+)\. (.*)$", re.M)
+MODEL_ANSWER = ("資料", True)  # 與規則 (這些名稱都落到 ("裝置", False)) 不同，可分辨結果來源
+RULE_ANSWER = ("裝置", False)
+
+
+# --- 本地 stub 模型：server.script(第幾個請求) 回傳 (回應種類, 延遲秒數) ---
+# ok：正常回應；error：HTTP 500；null："response": null；count：筆數不符；truncated：內容比 Content-Length 短
+@pytest.fixture
+def stub():
+    requests = []
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            lines = [line for _, line in ITEM.findall(payload["prompt"])]
+            with lock:
+                requests.append(lines)
+                kind, delay = server.script(len(requests))
+            time.sleep(delay)
+            if kind == "error":
+                self.send_response(500)
+                self.end_headers()
+                return
+            results = [{"category": MODEL_ANSWER[0], "crown": MODEL_ANSWER[1]} for _ in lines]
+            if kind == "count":
+                results = results[1:]
+            response = None if kind == "null" else json.dumps({"results": results})
+            body = json.dumps({"model": payload["model"], "response": response, "done": True}).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body) + (100 if kind == "truncated" else 0)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.script = lambda n: ("ok", 0)
+    server.requests = requests
+    server.endpoint = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _lines(n):
+    return [f"asset {i:04d}" for i in range(n)]
+
+
+def _classifier(stub, **kw):
+    options = {"batch_size": 5, "max_workers": 2, "timeout": 2.0, "retries": 2, "backoff": 0.01}
+    options.update(kw)
+    return LLMClassifier(stub.endpoint, "stub", **options)
+
+
+def test_model_answers_are_used_and_cached(stub):
+    cache = ClassificationCache(":memory:")
+    classifier = _classifier(stub, cache=cache)
+    lines = _lines(23)
+    assert classifier.classify(lines) == [MODEL_ANSWER] * 23
+    assert classifier.stats == {"cached": 0, "llm": 23, "fallback": 0}
+    assert len(stub.requests) == 5  # 23 行 / 每批 5 行
+    assert len(cache) == 23
+
+    # 再次匯入 (大小寫、全形空白不同也算同一筆) 全部命中快取，不再呼叫模型
+    again = [line.upper().replace(" ", "　") for line in lines]
+    assert classifier.classify(again) == [MODEL_ANSWER] * 23
+    assert classifier.stats["cached"] == 23
+    assert len(stub.requests) == 5
+
+
+def test_duplicate_lines_are_sent_once(stub):
+    classifier = _classifier(stub)
+    assert classifier.classify(["Web 01", "web  01", "Web 01", "DB 02"]) == [MODEL_ANSWER] * 4
+    assert sorted(line for batch in stub.requests for line in batch) == ["DB 02", "Web 01"]
+
+
+def test_failed_requests_are_retried(stub):
+    stub.script = lambda n: ("error", 0) if n <= 2 else ("ok", 0)
+    classifier = _classifier(stub, batch_size=10, max_workers=1)
+    assert classifier.classify(_lines(10)) == [MODEL_ANSWER] * 10
+    assert len(stub.requests) == 3
+    assert classifier.stats["fallback"] == 0
+
+
+@pytest.mark.parametrize("kind", ["error", "null", "count", "truncated"])
+def test_bad_responses_fall_back_to_rules(stub, kind):
+    stub.script = lambda n: (kind, 0)
+    cache = ClassificationCache(":memory:")
+    classifier = _classifier(stub, cache=cache, retries=1)
+    lines = _lines(10)
+    assert classifier.classify(lines) == RuleClassifier().classify(lines)
+    assert classifier.stats == {"cached": 0, "llm": 0, "fallback": 10}
+    assert len(cache) == 0  # 規則的結果不寫入快取
+
+
+def test_timeouts_fall_back_to_rules(stub):
+    stub.script = lambda n: ("ok", 1.0)
+    classifier = _classifier(stub, timeout=0.2, retries=1, max_workers=4)
+    start = time.monotonic()
+    assert classifier.classify(_lines(20)) == [RULE_ANSWER] * 20
+    assert time.monotonic() - start < 1.5
+    assert classifier.stats["fallback"] == 20
+
+
+def test_consecutive_failures_stop_calling_the_model(stub):
+    stub.script = lambda n: ("error", 0)
+    classifier = _classifier(stub, max_workers=1, retries=0, max_failures=3)
+    assert classifier.classify(_lines(50)) == [RULE_ANSWER] * 50
+    assert len(stub.requests) == 3
+
+
+def test_offline_model_falls_back_to_rules():
+    classifier = LLMClassifier("http://127.0.0.1:9", "stub", timeout=0.5, retries=1, backoff=0.01)
+    assert classifier.classify(_lines(7)) == [RULE_ANSWER] * 7
+
+
+def test_time_budget_spans_all_chunks_of_an_import(stub):
+    # 每批都要 0.3 秒才回應 (未逾時，但太慢)：超過時間上限後其餘批次改用規則，後面的分段不再等待模型
+    stub.script = lambda n: ("ok", 0.3)
+    classifier = _classifier(stub, max_workers=1, time_budget=0.5)
+    start = time.monotonic()
+    chunks = [chunk for _, chunk in classifier.iter_classify(_lines(40), chunk_size=10)]
+    assert time.monotonic() - start < 1.5
+    assert len(chunks) == 4
+    assert 1 <= len(stub.requests) <= 3
+    assert classifier.stats["llm"] == 5 * len(stub.requests)
+    assert classifier.stats["fallback"] == 40 - classifier.stats["llm"]
+
+
+def test_normalize_line():
+    assert normalize_line("  ＨＲ　DB  ") == normalize_line("hr db") == "hr db"
@@ -0,0 +1,97 @@
+import random
+
+import pandas as pd
+import pytest
+
+from cdm_core import CATEGORIES, FUNCTIONS, calculate_cell_status, compute_matrix
+
+COLUMNS = ["資產名稱", "類別", "皇冠寶石"]
+
+
+def _reference(assets, assessments):
+    return {
+        (c, f): calculate_cell_status(assets, assessments, c, f)[:2]
+        for c in CATEGORIES
+        for f in FUNCTIONS
+    }
+
+
+def _random_inventory(rng, n):
+    # 名稱可能重複、類別可能不在清單內、評分可能是 0 或不存在的資產 / 功能
+    assets = pd.DataFrame(
+        [(f"a{rng.randint(0, n)}", rng.choice(CATEGORIES + ["其他"]), rng.random() < 0.3) for _ in range(n)],
+        columns=COLUMNS,
+    )
+    assessments = {
+        (f"a{i}", f): rng.randint(0, 4)
+        for i in range(n + 2)
+        for f in FUNCTIONS + ["不存在的功能"]
+        if rng.random() < 0.6
+    }
+    return assets, assessments
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_matches_reference_on_random_inventories(seed):
+    rng = random.Random(seed)
+    assets, assessments = _random_inventory(rng, rng.choice([0, 1, 3, 10, 50, 200]))
+    assert compute_matrix(assets, assessments) == _reference(assets, assessments)
+
+
+def test_empty_inventory():
+    assets = pd.DataFrame(columns=COLUMNS)
+    matrix = compute_matrix(assets, {})
+    assert set(matrix.values()) == {("no_asset", 0)}
+    assert matrix == _reference(assets, {})
+
+
+def test_empty_categories_and_unassessed_cells():
+    assets = pd.DataFrame([("db", "資料", False), ("web", "應用程式", True)], columns=COLUMNS)
+    assessments = {("db", "識別"): 4}
+    matrix = compute_matrix(assets, assessments)
+    assert matrix[("裝置", "識別")] == ("no_asset", 0)
+    assert matrix[("資料", "識別")] == ("tier-4", 4)
+    assert matrix[("資料", "保護")] == ("not_assessed", 0)
+    assert matrix == _reference(assets, assessments)
+
+
+def test_all_scores_zero_is_not_assessed():
+    assets = pd.DataFrame([(f"a{i}", "網路", i % 2 == 0) for i in range(6)], columns=COLUMNS)
+    assessments = {(f"a{i}", f): 0 for i in range(6) for f in FUNCTIONS}
+    matrix = compute_matrix(assets, assessments)
+    assert all(matrix[("網路", f)] == ("not_assessed", 0) for f in FUNCTIONS)
+    assert matrix == _reference(assets, assessments)
+
+
+def test_crown_only_assets():
+    assets = pd.DataFrame([("core", "裝置", True), ("edge", "裝置", True)], columns=COLUMNS)
+    assessments = {("core", "識別"): 2, ("edge", "識別"): 4, ("core", "保護"): 3, ("edge", "保護"): 4, ("core", "偵測"): 0}
+    matrix = compute_matrix(assets, assessments)
+    assert matrix[("裝置", "識別")] == ("crown_risk", 1)
+    assert matrix[("裝置", "保護")] == ("tier-4", 4)
+    assert matrix[("裝置", "偵測")] == ("not_assessed", 0)
+    assert matrix == _reference(assets, assessments)
+
+
+def test_score_zero_is_excluded_from_average():
+    # 0 (N/A) 不計入平均：1 與 0 的平均是 1 (tier-1)，不是 0.5
+    assets = pd.DataFrame([("a", "使用者", False), ("b", "使用者", False), ("c", "使用者", False)], columns=COLUMNS)
+    assessments = {("a", "應變"): 1, ("b", "應變"): 0, ("a", "復原"): 3, ("b", "復原"): 4, ("c", "復原"): 0}
+    matrix = compute_matrix(assets, assessments)
+    assert matrix[("使用者", "應變")] == ("tier-1", 1)
+    assert matrix[("使用者", "復原")] == ("tier-4", 4)
+    assert matrix == _reference(assets, assessments)
+
+
+@pytest.mark.parametrize("scores, expected", [
+    ([1, 2], ("tier-2", 2)),  # 平均 1.5 剛好落在 tier-2
+    ([2, 3], ("tier-3", 3)),  # 2.5
+    ([3, 4], ("tier-4", 4)),  # 3.5
+    ([1, 1, 2], ("tier-1", 1)),  # 1.33
+])
+def test_average_boundaries(scores, expected):
+    assets = pd.DataFrame([(f"a{i}", "資料", False) for i in range(len(scores))], columns=COLUMNS)
+    assessments = {(f"a{i}", "偵測"): s for i, s in enumerate(scores)}
+    matrix = compute_matrix(assets, assessments)
+    assert matrix[("資料", "偵測")] == expected
+    assert matrix == _reference(assets, assessments)
@@ -0,0 +1,116 @@
+import random
+import statistics
+
+import pytest
+
+from cdm_core import (
+    CATEGORIES,
+    DEFAULT_POLICY,
+    FUNCTIONS,
+    POLICIES,
+    AssessmentStore,
+    ScoringPolicy,
+    calculate_cell_status,
+    compute_matrix,
+)
+
+SPECS = POLICIES + [
+    {"name": "中位數", "aggregate": "median"},
+    {"name": "不套用皇冠法則", "crown_threshold": None, "cutoffs": [2, 2, 3]},
+    {"name": "各類別", "aggregate": "median", "crown_threshold": {"default": 2, "網路": 4, "使用者": None},
+     "cutoffs": {"default": [1, 2, 3], "應用程式": [2.5, 3, 3.5]}},
+    {"name": "一般資產加權", "weights": {"other": 3}, "cutoffs": {"資料": [2, 2.5, 4]}},
+]
+
+
+def _per_category(value, category, field):
+    if isinstance(value, dict):
+        return value.get(category, value.get("default", DEFAULT_POLICY[field]))
+    return value
+
+
+def _reference(assets, assessments, spec):
+    # 逐格、逐筆資產直接套用政策設定
+    spec = {**DEFAULT_POLICY, **spec}
+    weights = {**DEFAULT_POLICY["weights"], **spec["weights"]}
+    matrix = {}
+    for category in CATEGORIES:
+        rows = assets[assets["類別"] == category]
+        threshold = _per_category(spec["crown_threshold"], category, "crown_threshold")
+        cutoffs = _per_category(spec["cutoffs"], category, "cutoffs")
+        for function in FUNCTIONS:
+            scored = [
+                (assessments.get((name, function), 0), bool(crown))
+                for name, crown in zip(rows["資產名稱"], rows["皇冠寶石"])
+            ]
+            scored = [(s, crown) for s, crown in scored if s > 0]
+            if rows.empty:
+                matrix[(category, function)] = ("no_asset", 0)
+            elif not scored:
+                matrix[(category, function)] = ("not_assessed", 0)
+            elif threshold and any(crown and s < threshold for s, crown in scored):
+                matrix[(category, function)] = ("crown_risk", 1)
+            else:
+                if spec["aggregate"] == "mean":
+                    w = [weights["crown"] if crown else weights["other"] for _, crown in scored]
+                    value = sum(s * x for (s, _), x in zip(scored, w)) / sum(w)
+                elif spec["aggregate"] == "min":
+                    value = min(s for s, _ in scored)
+                else:
+                    value = statistics.median(s for s, _ in scored)
+                tier = 1 + sum(value >= cut for cut in cutoffs)
+                matrix[(category, function)] = (f"tier-{tier}", tier)
+    return matrix
+
+
+@pytest.mark.parametrize("seed", range(40))
+@pytest.mark.parametrize("spec", SPECS, ids=lambda spec: spec["name"])
+def test_matches_reference_on_random_inventories(random_inventory, spec, seed):
+    rng = random.Random(seed)
+    assets, assessments = random_inventory(rng, rng.choice([0, 1, 5, 30, 120]), crown_ratio=rng.random())
+    policy = ScoringPolicy(spec)
+    assert compute_matrix(assets, assessments, policy) == _reference(assets, assessments, spec)
+
+
+def test_default_policy_matches_default_rules(random_inventory):
+    assets, assessments = random_inventory(random.Random(1), 200)
+    expected = {(c, f): calculate_cell_status(assets, assessments, c, f)[:2] for c in CATEGORIES for f in FUNCTIONS}
+    assert compute_matrix(assets, assessments, ScoringPolicy()) == compute_matrix(assets, assessments) == expected
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_incremental_results_after_random_edits(random_inventory, seed):
+    # store 的矩陣快取在新增、改分、刪除之後，每個政策的結果與完整重算一致
+    rng = random.Random(seed)
+    policies = [ScoringPolicy(spec) for spec in SPECS]
+    assets, assessments = random_inventory(rng, 60)
+    store = AssessmentStore()
+    store.add_assets(assets)
+    store.update(assessments)
+    for step in range(40):
+        names = store.assets["資產名稱"].tolist()
+        op = rng.random()
+        if op < 0.2:
+            store.add_asset(f"new-{step}", rng.choice(CATEGORIES), rng.random() < 0.5)
+        elif op < 0.3 and names:
+            store.remove_assets(rng.sample(names, min(len(names), 3)))
+        elif names:
+            store.update({(rng.choice(names), rng.choice(FUNCTIONS)): rng.randint(0, 4) for _ in range(5)})
+        policy = rng.choice(policies)
+        assert store.matrix(policy) == _reference(store.assets, dict(store.items()), policy.spec)
+    assert all(store.verify(policy) == {} for policy in policies)
+
+
+@pytest.mark.parametrize("spec", [
+    {"unknown": 1},
+    {"aggregate": "max"},
+    {"weights": {"crown": 0}},
+    {"weights": {"vip": 2}},
+    {"cutoffs": [1, 2]},
+    {"cutoffs": [3, 2, 1]},
+    {"crown_threshold": {"其他": 3}},
+    {"cutoffs": {"資料": [1, 2]}},
+])
+def test_invalid_policies_are_rejected(spec):
+    with pytest.raises(ValueError):
+        ScoringPolicy(spec)
@@ -0,0 +1,154 @@
+import json
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+
+from cdm_core import Profiler, estimate_size
+from cdm_core.profiling import BUCKETS
+
+# Prometheus 文字格式的一行樣本：名稱{標籤="值",...} 數值
+_SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{((?:[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\]|\\.)*",?)*)\})? (\S+)$')
+_LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"')
+
+
+def _parse(text):
+    # 回傳 [(名稱, {標籤: 原始值}, 數值)]；每一行都必須是註解或合法的樣本
+    samples = []
+    for line in text.splitlines():
+        if line.startswith("#"):
+            assert re.match(r"^# (HELP|TYPE) [a-zA-Z_:][a-zA-Z0-9_:]* ", line)
+            continue
+        match = _SAMPLE.match(line)
+        assert match, line
+        name, labels, value = match.groups()
+        samples.append((name, dict(_LABEL.findall(labels or "")), float(value)))
+    return samples
+
+
+def _profiler(*seconds):
+    profiler = Profiler()
+    profiler.enabled = True
+    for s in seconds:
+        profiler.observe("matrix", s)
+    return profiler
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler()
+    with profiler.section("matrix"):
+        pass
+    profiler.begin()
+    profiler.end(assets=3)
+    assert profiler.samples == {} and profiler.gauges == {} and not profiler.events
+    assert profiler.prometheus() == (
+        "# HELP cdm_section_duration_seconds Time spent in instrumented sections.\n"
+        "# TYPE cdm_section_duration_seconds histogram\n"
+    )
+
+
+def test_nested_sections():
+    profiler = _profiler()
+    profiler.begin()
+    with profiler.section("import"):
+        with profiler.section("matrix"):
+            sum(range(10000))
+        with profiler.section("matrix"):
+            pass
+    profiler.end(assets=5)
+    assert profiler.totals["matrix"][0] == 2 and profiler.totals["import"][0] == 1
+    assert profiler.totals["rerun"][0] == 1
+    # 外層區段包含內層的時間，整次重跑包含全部
+    assert profiler.totals["import"][1] >= profiler.totals["matrix"][1]
+    assert profiler.totals["rerun"][1] >= profiler.totals["import"][1]
+    assert [e.get("section") for e in profiler.events] == ["matrix", "matrix", "import", "rerun", None]
+    summary = profiler.summary().set_index("區段")
+    assert summary.loc["矩陣計算", "次數"] == 2 and summary.loc["整次重跑", "次數"] == 1
+
+
+def test_end_without_begin_is_ignored():
+    profiler = _profiler()
+    profiler.end(assets=1)
+    assert "rerun" not in profiler.totals and profiler.gauges == {}
+
+
+def test_histogram_buckets_are_cumulative():
+    seconds = [0.0005, 0.003, 0.003, 0.2, 7.0, 30.0]
+    samples = _parse(_profiler(*seconds).prometheus())
+    buckets = {labels["le"]: value for name, labels, value in samples if name == "cdm_section_duration_seconds_bucket"}
+    assert list(buckets) == [str(b) for b in BUCKETS] + ["+Inf"]
+    assert [buckets[str(b)] for b in BUCKETS] == [sum(s <= b for s in seconds) for b in BUCKETS]
+    assert buckets["+Inf"] == len(seconds)
+    totals = {name: value for name, labels, value in samples if not name.endswith("_bucket")}
+    assert totals["cdm_section_duration_seconds_count"] == len(seconds)
+    assert abs(totals["cdm_section_duration_seconds_sum"] - sum(seconds)) < 1e-6
+
+
+def test_prometheus_labels_and_escaping():
+    profiler = _profiler(0.01)
+    profiler.begin()
+    profiler.end(widgets=12, session_state_bytes={"shared": 2048, 'say "hi"\\\n': 1}, missing=None)
+    text = profiler.prometheus({"app": "app.py", "host": 'a"b\\c\nd'})
+    assert text.endswith("\n")
+    samples = _parse(text)
+    assert {name for name, _, _ in samples} == {
+        "cdm_section_duration_seconds_bucket", "cdm_section_duration_seconds_sum", "cdm_section_duration_seconds_count",
+        "cdm_widgets", "cdm_session_state_bytes",
+    }
+    assert "# TYPE cdm_widgets gauge" in text.splitlines()
+    for _, labels, _ in samples:
+        # 每個指標都帶共用標籤；值中的引號、反斜線與換行依規格跳脫
+        assert labels["app"] == "app.py" and labels["host"] == 'a\\"b\\\\c\\nd'
+    assert ("cdm_widgets", {"app": "app.py", "host": 'a\\"b\\\\c\\nd'}, 12.0) in samples
+    keys = {labels["key"]: value for name, labels, value in samples if name == "cdm_session_state_bytes"}
+    assert keys == {"shared": 2048.0, 'say \\"hi\\"\\\\\\n': 1.0}
+    sections = {labels["section"] for name, labels, _ in samples if name.startswith("cdm_section")}
+    assert sections == {"matrix", "rerun"}
+
+
+def test_log_lines_are_json():
+    profiler = _profiler(0.5)
+    profiler.begin()
+    profiler.end(assets=7, 名稱="中文")
+    events = [json.loads(line) for line in profiler.log_lines().splitlines()]
+    assert [e.get("section") for e in events] == ["matrix", "rerun", None]
+    assert events[0]["seconds"] == 0.5 and all(isinstance(e["ts"], float) for e in events)
+    assert events[-1]["gauges"] == {"assets": 7, "名稱": "中文"}
+    assert "中文" in profiler.log_lines()  # 不轉成 \u 跳脫
+
+
+def test_history_limits_samples_but_not_totals():
+    profiler = Profiler(history=3)
+    for s in range(10):
+        profiler.observe("html", s / 100)
+    assert list(profiler.samples["html"]) == [0.07, 0.08, 0.09]
+    assert profiler.totals["html"][0] == 10
+
+
+def test_estimate_size_of_arrays_and_frames():
+    numbers = np.zeros((100, 5), dtype=np.int64)
+    assert estimate_size(numbers) == numbers.nbytes
+    words = np.array([f"asset-{i}" for i in range(50)], dtype=object)
+    assert estimate_size(words) == words.nbytes + sum(sys.getsizeof(w) for w in words)
+    same = np.array(["x" * 1000] * 50, dtype=object)  # 同一個字串只算一次
+    assert estimate_size(same) == same.nbytes + sys.getsizeof(same[0])
+
+    frame = pd.DataFrame({"資產名稱": [f"a{i}" for i in range(200)], "分數": np.arange(200)})
+    assert estimate_size(frame) == frame.memory_usage(deep=True).sum()
+    assert estimate_size(frame["資產名稱"]) == frame["資產名稱"].memory_usage(deep=True)
+
+    # 容器遞迴加總；同一個物件只算一次，exclude 的物件不列入
+    state = {"a": frame, "b": frame, "c": numbers}
+    assert estimate_size(state) > estimate_size(frame) + numbers.nbytes
+    assert estimate_size(state) < 2 * estimate_size(frame) + numbers.nbytes
+    assert estimate_size(state) - estimate_size(state, exclude=[frame]) == estimate_size(frame)
+
+
+def test_cached_size_only_recomputes_on_new_version():
+    profiler = Profiler()
+    data = [np.zeros(1000)]
+    first = profiler.cached_size(data, version=1)
+    data.append(np.zeros(1000))
+    assert profiler.cached_size(data, version=1) == first
+    assert profiler.cached_size(data, version=2) > first
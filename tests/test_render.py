@@ -0,0 +1,92 @@
+import random
+
+import pytest
+
+from cdm_core import CATEGORIES, FUNCTIONS, AssessmentStore, MatrixRenderer
+from cdm_core.render import THEMES
+
+
+def _original(matrix, theme):
+    # 原本 app.py 的 render_matrix：每次重新組出整張表 (不含處方籤清單)
+    html_code = THEMES[theme] + """
+    <table>
+        <tr><th>CDM</th>
+    """
+    for f in FUNCTIONS: html_code += f"<th>{f}</th>"
+    html_code += "</tr>"
+    for cat in CATEGORIES:
+        html_code += f"<tr><td class='cat-head'>{cat}</td>"
+        for func in FUNCTIONS:
+            status, tier = matrix[(cat, func)]
+            if status == "no_asset":
+                css_class, display_text = "s-no-asset", "無資產"
+            elif status == "not_assessed":
+                css_class, display_text = "s-pending", "待評估"
+            elif status == "crown_risk":
+                css_class, display_text = "s-crown-risk", "⚠️ 關鍵風險"
+            else:
+                css_class, display_text = f"s-t{tier}", f"Tier {tier}"
+            html_code += f"<td class='{css_class}'>{display_text}</td>"
+        html_code += "</tr>"
+    html_code += "</table>"
+    return html_code
+
+
+def _same_html(a, b):
+    # 只比較標籤與文字，不比較縮排
+    return " ".join(a.split()) == " ".join(b.split())
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_cached_output_matches_fresh_render(random_inventory, seed):
+    # 隨機改分、切換樣式後重新繪製：快取的結果與每次重組的結果相同
+    rng = random.Random(seed)
+    assets, scores = random_inventory(rng, 40, crown_ratio=0.2)
+    store = AssessmentStore()
+    store.add_assets(assets.iloc[:rng.randint(0, 40)])
+    store.update({key: s for key, s in scores.items() if store.has_asset(key[0])})
+    renderers = {theme: MatrixRenderer(theme, cache_size=4) for theme in THEMES}
+    seen = []
+    for _ in range(60):
+        names = store.assets["資產名稱"].tolist()
+        if names and rng.random() < 0.8:
+            store.update({(rng.choice(names), rng.choice(FUNCTIONS)): rng.randint(0, 4) for _ in range(rng.randint(1, 5))})
+        else:
+            store.add_assets(assets.sample(5, random_state=rng.randint(0, 1000)))
+        seen.append(dict(store.matrix()))
+        matrix = rng.choice(seen)  # 也回到較早的矩陣 (可能已被 LRU 淘汰)
+        theme = rng.choice(list(THEMES))
+        renderer = renderers[theme]
+        assert _same_html(renderer.render(matrix), _original(matrix, theme))
+        assert renderer.render(matrix) == MatrixRenderer(theme).render(matrix)
+        assert renderer.stylesheet == THEMES[theme]
+
+
+def test_unchanged_cells_are_not_rerendered(monkeypatch):
+    renderer = MatrixRenderer("ai")
+    matrix = {(cat, func): ("not_assessed", 0) for cat in CATEGORIES for func in FUNCTIONS}
+    first = renderer.table(matrix)
+    assert renderer.cache_info().misses == 1
+    rows = renderer._row.cache_info()
+    assert (rows.misses, rows.hits) == (len(CATEGORIES), 0)
+
+    # 只改一格：只有該列重新組字串，其他列與格子都取自快取
+    built = []
+    monkeypatch.setattr(renderer, "_cell", lambda status, tier: built.append((status, tier)) or MatrixRenderer.cell(status, tier))
+    changed = dict(matrix)
+    changed[(CATEGORIES[2], FUNCTIONS[1])] = ("tier-1", 1)
+    html = renderer.table(changed)
+    rows = renderer._row.cache_info()
+    assert (rows.misses, rows.hits) == (len(CATEGORIES) + 1, len(CATEGORIES) - 1)
+    assert built == [("not_assessed", 0), ("tier-1", 1)] + [("not_assessed", 0)] * (len(FUNCTIONS) - 2)
+    assert html != first and "Tier 1" in html
+
+    # 同樣的矩陣再畫一次：整張表直接命中
+    built.clear()
+    assert renderer.table(matrix) == first and renderer.table(changed) == html
+    assert built == [] and renderer.cache_info().hits == 2
+
+
+def test_unknown_theme():
+    with pytest.raises(ValueError):
+        MatrixRenderer("neon")
@@ -0,0 +1,91 @@
+import random
+
+import pandas as pd
+import pytest
+
+from cdm_core import FUNCTIONS, RISK_STATUSES, Rollup, WorkspaceDB, compute_matrix, group_of
+
+
+def _units(rng, random_inventory, db):
+    # 幾個群組 + 未分組的單位；資產名稱在各單位之間不重複
+    stores = {}
+    for u in range(rng.randint(1, 12)):
+        name = f"群組{rng.randint(0, 3)}/單位{u}" if rng.random() < 0.8 else f"單位{u}"
+        assets, scores = random_inventory(rng, rng.choice([0, 1, 5, 40]), crown_ratio=0.1, prefix=f"{name}-")
+        store = db.load(name)
+        store.add_assets(assets)
+        store.update(scores)
+        stores[name] = store
+    return stores
+
+
+def _rescan(stores):
+    # 參考：把單位的資產合併後重新計算整個矩陣
+    if not stores:
+        return compute_matrix(pd.DataFrame(columns=["資產名稱", "類別", "皇冠寶石"]), {})
+    assets = pd.concat([store.assets for store in stores], ignore_index=True)
+    return compute_matrix(assets, {key: score for store in stores for key, score in store.items()})
+
+
+def _check(rollup, stores):
+    assert rollup.units == list(stores)
+    for unit, store in stores.items():
+        assert rollup.unit_matrix(unit) == store.matrix()
+    for group in rollup.group_names:
+        assert rollup.group_matrix(group) == _rescan([s for u, s in stores.items() if group_of(u) == group])
+    assert rollup.enterprise_matrix() == _rescan(list(stores.values()))
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_rollup_matches_merged_recompute(random_inventory, seed):
+    rng = random.Random(seed)
+    db = WorkspaceDB(":memory:")
+    stores = _units(rng, random_inventory, db)
+    _check(Rollup.from_stores(stores), stores)
+    _check(Rollup.from_workspaces(db), stores)
+
+    # 改動部分單位後，資料庫統計只重算有異動的工作區，結果仍與重掃一致
+    for _ in range(3):
+        unit = rng.choice(list(stores))
+        store = stores[unit]
+        names = store.assets["資產名稱"].tolist()
+        if names and rng.random() < 0.5:
+            store.update({(rng.choice(names), rng.choice(FUNCTIONS)): rng.randint(0, 4) for _ in range(5)})
+        elif names:
+            store.remove_assets(names[:2])
+        else:
+            store.add_asset(f"{unit}-new", "資料", True)
+            store[(f"{unit}-new", "識別")] = 1
+        _check(Rollup.from_workspaces(db), stores)
+
+    removed = rng.choice(list(stores))
+    db.delete(removed)
+    del stores[removed]
+    _check(Rollup.from_workspaces(db), stores)
+
+
+def test_summaries():
+    db = WorkspaceDB(":memory:")
+    a = db.load("北區/台北")
+    a.add_asset("db", "資料", True)
+    a[("db", "識別")] = 1
+    b = db.load("北區/新竹")
+    b.add_asset("web", "應用程式", False)
+    b[("web", "保護")] = 2
+    db.load("總部")
+    rollup = Rollup.from_workspaces(db)
+    assert rollup.group_names == ["北區", "未分組"]
+    assert rollup.members("北區") == ["北區/台北", "北區/新竹"]
+
+    groups = rollup.group_summary().set_index("名稱")
+    assert groups.loc["北區", ["單位數", "資產數", "crown_risk", "tier-2", "已評估格數"]].tolist() == [2, 2, 1, 1, 2]
+    assert groups.loc["未分組", ["單位數", "資產數", "已評估格數"]].tolist() == [1, 0, 0]
+    units = rollup.unit_summary("北區").set_index("名稱")
+    assert list(units.index) == ["北區/台北", "北區/新竹"]
+    assert units[list(RISK_STATUSES)].sum(axis=1).tolist() == [1, 1]
+
+
+def test_group_of():
+    assert group_of("北區/台北") == "北區"
+    assert group_of(" 北區 /台北/一課") == "北區"
+    assert group_of("總部") == group_of("/台北") == "未分組"
@@ -0,0 +1,196 @@
+import random
+import sys
+import threading
+
+import pandas as pd
+
+from cdm_core import (
+    CATEGORIES,
+    FUNCTIONS,
+    POLICIES,
+    AssessmentStore,
+    InventoryImport,
+    RuleClassifier,
+    ScoringPolicy,
+    SharedWorkspace,
+    WhatIf,
+    WorkspaceDB,
+    assessment_grid,
+    compute_matrix,
+)
+
+
+def _inventory(n, seed=0):
+    rng = random.Random(seed)
+    return pd.DataFrame({
+        "資產名稱": [f"asset-{i:05d}" for i in range(n)],
+        "類別": [CATEGORIES[i % len(CATEGORIES)] for i in range(n)],
+        "皇冠寶石": [rng.random() < 0.2 for _ in range(n)],
+    })
+
+
+def _run(workers):
+    # 同時啟動所有 worker，回傳各 worker 拋出的例外
+    # 縮短執行緒切換間隔，讓讀寫更常在操作中途交錯
+    errors = []
+    start = threading.Barrier(len(workers))
+
+    def wrap(fn):
+        def run():
+            start.wait()
+            try:
+                fn()
+            except Exception as e:
+                errors.append(e)
+        return run
+
+    threads = [threading.Thread(target=wrap(fn)) for fn in workers]
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        sys.setswitchinterval(interval)
+    return errors
+
+
+def test_conflicting_write_is_reported_and_not_applied():
+    shared = SharedWorkspace(AssessmentStore())
+    shared.add_assets(_inventory(3))
+    key = ("asset-00000", FUNCTIONS[0])
+    base = shared.version
+    assert shared.update({key: 2}, base, "alice") == {}
+    assert shared.update({key: 4}, base, "bob") == {key: 2}
+    assert shared.store[key] == 2
+    # 自己在 base 之後寫過的格子不算衝突
+    assert shared.update({key: 3}, base, "alice") == {}
+    assert shared.store[key] == 3
+
+
+def test_write_to_removed_asset_is_a_conflict():
+    shared = SharedWorkspace(AssessmentStore())
+    shared.add_assets(_inventory(3))
+    key = ("asset-00001", FUNCTIONS[1])
+    base = shared.version
+    shared.remove_assets(["asset-00001"], "alice")
+    assert shared.update({key: 3}, base, "bob") == {key: None}
+    # 同名資產重新新增後，刪除前讀取的畫面仍視為衝突
+    shared.add_assets(_inventory(3).iloc[[1]], "alice")
+    assert shared.update({key: 3}, base, "bob") == {key: 0}
+    assert shared.update({key: 3}, shared.version, "bob") == {}
+
+
+def test_removed_assets_leave_no_version_records():
+    shared = SharedWorkspace(AssessmentStore())
+    shared.add_assets(_inventory(50))
+    shared.update({(f"asset-{i:05d}", f): 3 for i in range(50) for f in FUNCTIONS}, shared.version, "alice")
+    shared.remove_assets([f"asset-{i:05d}" for i in range(40)], "alice")
+    assert {name for name, _ in shared._cell_versions} == {f"asset-{i:05d}" for i in range(40, 50)}
+    assert set(shared._asset_versions) == {f"asset-{i:05d}" for i in range(40, 50)}
+
+
+def test_concurrent_writers_lose_no_update(tmp_path):
+    # 每個 writer 負責自己的資產，同時反覆「讀取版本 -> 寫入一批」；最後每格都是該 writer 最後寫入的值，資料庫也一致
+    db = WorkspaceDB(str(tmp_path / "shared.sqlite"))
+    shared = db.shared("共用")
+    shared.add_assets(_inventory(8 * 30))
+    last = {}
+
+    def writer(k):
+        def run():
+            rng = random.Random(k)
+            own = [(f"asset-{i:05d}", f) for i in range(k, 8 * 30, 8) for f in FUNCTIONS]
+            for _ in range(100):
+                base = shared.version
+                batch = {key: rng.randint(0, 4) for key in rng.sample(own, 10)}
+                assert shared.update(batch, base, f"writer-{k}") == {}
+                last.update(batch)
+        return run
+
+    assert _run([writer(k) for k in range(8)]) == []
+    assert all(shared.store[key] == score for key, score in last.items())
+    assert shared.verify() == {}
+    reloaded = WorkspaceDB(str(tmp_path / "shared.sqlite")).load("共用", create=False)
+    assert dict(reloaded.items()) == dict(shared.store.items())
+
+
+def test_concurrent_writers_on_same_cell_get_conflicts():
+    # 每一輪 4 個 writer 讀到同一個版本後同時把同一格改成不同的值：只有一個寫入，其餘回報衝突與寫入的值
+    shared = SharedWorkspace(AssessmentStore())
+    shared.add_assets(_inventory(60))
+    results = {}
+    rounds = [(f"asset-{i:05d}", FUNCTIONS[i % len(FUNCTIONS)]) for i in range(60)]
+    read = threading.Barrier(4)
+
+    def writer(k):
+        def run():
+            for key in rounds:
+                base = shared.version
+                read.wait()
+                results[key, k] = shared.update({key: k + 1}, base, f"writer-{k}")
+                read.wait()  # 下一輪的 base 在所有人寫完之後才讀
+        return run
+
+    assert _run([writer(k) for k in range(4)]) == []
+    for key in rounds:
+        winners = [k for k in range(4) if not results[key, k]]
+        assert len(winners) == 1
+        assert shared.store[key] == winners[0] + 1
+        assert all(results[key, k] == {key: winners[0] + 1} for k in range(4) if k != winners[0])
+
+
+def test_reads_during_writes_and_compaction():
+    # 讀取 (矩陣、各政策、表格、What-if) 與寫入、大量刪除 (觸發 id 重新編號) 同時進行
+    shared = SharedWorkspace(AssessmentStore())
+    shared.add_assets(_inventory(4000))
+    policies = [ScoringPolicy(spec) for spec in POLICIES]
+    stop = threading.Event()
+
+    def writer():
+        rng = random.Random(1)
+        try:
+            for round_no in range(8):
+                _, names = shared.read(lambda store: store.assets["資產名稱"].tolist())
+                shared.update({(rng.choice(names), rng.choice(FUNCTIONS)): rng.randint(0, 4) for _ in range(3000)})
+                shared.remove_assets(names[:len(names) * 2 // 3], "writer")
+                shared.add_assets(_inventory(3000, seed=round_no).assign(資產名稱=lambda df: df["資產名稱"] + f"-{round_no}"))
+        finally:
+            stop.set()
+
+    def reader(k):
+        def run():
+            rng = random.Random(k)
+            while not stop.is_set():
+                policy = rng.choice([None] + policies)
+                matrix = shared.matrix(policy)
+                assert len(matrix) == len(CATEGORIES) * len(FUNCTIONS)
+                version, grid = shared.read(assessment_grid, rng.choice(CATEGORIES))
+                assert version <= shared.version
+                assert grid["資產名稱"].is_unique
+                shared.read(WhatIf)[1].upgrades(3, crown_only=False)
+        return run
+
+    assert _run([writer] + [reader(k) for k in range(4)]) == []
+    assert shared.verify() == {}
+    assessments = dict(shared.store.items())
+    for policy in policies:
+        assert shared.matrix(policy) == compute_matrix(shared.store.assets, assessments, policy)
+
+
+def test_import_checks_existing_names_under_the_lock():
+    # 匯入時既有名稱經由 SharedWorkspace 查詢：其他 session 持有 lock (寫入 / 重新編號) 時要等待
+    shared = SharedWorkspace(AssessmentStore())
+    shared.add_asset("asset-00000", "資料", False)
+    job = InventoryImport(shared, RuleClassifier(), "資產名稱")
+    chunk = _inventory(3)
+    with shared._lock:
+        feeding = threading.Thread(target=job.feed, args=(chunk,))
+        feeding.start()
+        feeding.join(0.2)
+        assert feeding.is_alive()
+    feeding.join()
+    assert job.result()["資產名稱"].tolist() == ["asset-00001", "asset-00002"]
+    assert job.skipped == 1
@@ -0,0 +1,155 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cdm_core import CATEGORIES, FUNCTIONS, AssessmentStore, compute_matrix
+
+COLUMNS = ["資產名稱", "類別", "皇冠寶石"]
+WORDS = ["SQL", "db", "Core", "核心", "NAS", "web", "Web01", "ERP", "vpn"]
+
+
+def _name(rng):
+    return f"{rng.choice(WORDS)}-{rng.randint(0, 300)}"
+
+
+def _rows(rng, n):
+    # 名稱可能與既有資產或同批其他列重複
+    return [(_name(rng), rng.choice(CATEGORIES), rng.random() < 0.3) for _ in range(n)]
+
+
+def _frame(assets):
+    return pd.DataFrame([(name, c, k) for name, (c, k) in assets.items()], columns=COLUMNS)
+
+
+def _add(store, assets, rows):
+    new = {}
+    for name, category, crown in rows:
+        if name not in assets:
+            new.setdefault(name, (category, crown))
+    assert store.add_assets(pd.DataFrame(rows, columns=COLUMNS)) == len(new)
+    assets.update(new)
+
+
+def _remove(rng, store, assets, scores):
+    names = rng.sample(list(assets), int(len(assets) * rng.choice([0.1, 0.8]))) + [_name(rng)]
+    removed = {name for name in names if name in assets}
+    assert store.remove_assets(names) == len(removed)
+    for name in removed:
+        del assets[name]
+    for key in [key for key in scores if key[0] in removed]:
+        del scores[key]
+
+
+def _check(store, assets, scores):
+    frame = _frame(assets)
+    got = store.assets
+    assert len(store) == len(assets)
+    assert got["資產名稱"].tolist() == frame["資產名稱"].tolist()
+    assert got["類別"].astype(str).tolist() == frame["類別"].tolist()
+    assert got["皇冠寶石"].tolist() == frame["皇冠寶石"].tolist()
+    assert dict(store.items()) == {key: score for key, score in scores.items() if score > 0}
+    assert store.matrix() == compute_matrix(frame, scores)
+
+
+@pytest.mark.parametrize("seed", range(150))
+def test_random_edits_match_reference(seed):
+    # 與原本的表示法 (依新增順序的資產 + 評分 dict) 比對：逐筆 / 整批新增 (含重複)、刪除 (含重新編號)、
+    # 單筆 / 批次改分，中途穿插讀取 assets (延遲合併)；矩陣快取與完整重算一致
+    rng = random.Random(seed)
+    store = AssessmentStore(capacity=rng.choice([0, 1, 64]))
+    assets, scores = {}, {}
+    for _ in range(60):
+        op = rng.random()
+        if op < 0.25 or not assets:
+            name, category, crown = _rows(rng, 1)[0]
+            assert store.add_asset(name, category, crown) == (name not in assets)
+            assets.setdefault(name, (category, crown))
+        elif op < 0.35:
+            _add(store, assets, _rows(rng, rng.choice([1, 20, 1200])))
+        elif op < 0.45:
+            _remove(rng, store, assets, scores)
+        elif op < 0.75:
+            key = (rng.choice(list(assets)), rng.choice(FUNCTIONS))
+            store[key] = scores[key] = rng.randint(0, 4)
+        else:
+            names = list(assets)
+            batch = {(rng.choice(names), rng.choice(FUNCTIONS)): rng.randint(0, 4) for _ in range(rng.randint(1, 50))}
+            store.update(batch)
+            scores.update(batch)
+        if rng.random() < 0.15:
+            _check(store, assets, scores)
+    _check(store, assets, scores)
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_find_matches_reference(seed):
+    # 名稱 (3 個字以上為子字串、較短的比對開頭，不分大小寫) + 類別 + 皇冠寶石篩選，與逐筆比對相同；
+    # 查詢之間穿插新增與刪除 (索引延後併入、重新編號後重建)
+    rng = random.Random(seed)
+    store = AssessmentStore()
+    assets, scores = {}, {}
+    for _ in range(40):
+        op = rng.random()
+        if op < 0.3 or not assets:
+            _add(store, assets, _rows(rng, rng.choice([1, 30, 1200])))
+        elif op < 0.45:
+            _remove(rng, store, assets, scores)
+        text = rng.choice(["", " ", "s", "SQ", "sql", "db-1", "核心", "WEB0", "-1", " erp-2 ", rng.choice(list(assets) or ["x"])[:rng.randint(1, 6)]])
+        categories = rng.choice([None, [], rng.sample(CATEGORIES, 2)])
+        crown_only = rng.random() < 0.3
+        query = text.casefold().strip()
+        expected = [
+            name for name, (c, k) in assets.items()
+            if (name.casefold().startswith(query) if len(query) < 3 else query in name.casefold())
+            and (categories is None or c in categories)
+            and (k or not crown_only)
+        ]
+        ids = store.find(text, categories, crown_only)
+        assert store.assets_at(ids)["資產名稱"].tolist() == expected
+
+
+def test_compaction_renumbers_ids_and_keeps_scores():
+    store = AssessmentStore()
+    names = [f"asset-{i:04d}" for i in range(2000)]
+    store.add_assets(pd.DataFrame({"資產名稱": names, "類別": "網路", "皇冠寶石": False}))
+    store.update({(name, "保護"): 1 + i % 4 for i, name in enumerate(names)})
+    store.find("asset-1")  # 建立搜尋索引，重新編號後須重建
+    store.remove_assets(names[:1500])
+    assert store._n == 500 and store._alive.all()
+    assert store.assets["資產名稱"].tolist() == names[1500:]
+    assert [store[(name, "保護")] for name in names[1500:]] == [1 + i % 4 for i in range(1500, 2000)]
+    assert store.assets_at(store.find("asset-19"))["資產名稱"].tolist() == names[1900:2000]
+    assert store.add_asset(names[0], "資料", True)
+    assert store.get((names[0], "保護")) == 0
+    assert store.verify() == {}
+
+
+def test_from_arrays_matches_incremental_adds(random_inventory):
+    assets, scores = random_inventory(random.Random(0), 300)
+    incremental = AssessmentStore()
+    incremental.add_assets(assets)
+    incremental.update(scores)
+    codes = pd.Categorical(assets["類別"], categories=CATEGORIES).codes
+    matrix = np.array([[scores[(name, f)] for f in FUNCTIONS] for name in assets["資產名稱"]])
+    bulk = AssessmentStore.from_arrays(assets["資產名稱"].tolist(), codes, assets["皇冠寶石"], matrix)
+    assert dict(bulk.items()) == dict(incremental.items())
+    assert bulk.matrix() == incremental.matrix() == compute_matrix(assets, scores)
+
+    with pytest.raises(ValueError):
+        AssessmentStore.from_arrays(["a", "a"], [0, 0], [False, False], np.zeros((2, len(FUNCTIONS))))
+
+
+def test_dict_semantics():
+    store = AssessmentStore()
+    store.add_asset("web", "應用程式", False)
+    with pytest.raises(ValueError):
+        store.add_asset("x", "其他", False)
+    assert ("web", "識別") in store and ("web", "其他") not in store and ("db", "識別") not in store
+    assert store.get(("db", "識別"), 5) == 5
+    assert store.get(("web", "識別")) == 0 and store.get(("web", "識別"), None) is None
+    store[("web", "識別")] = 3
+    assert store[("web", "識別")] == store.get(("web", "識別")) == 3
+    with pytest.raises(KeyError):
+        store[("db", "識別")] = 1
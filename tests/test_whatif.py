@@ -0,0 +1,118 @@
+import random
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from cdm_core import CATEGORIES, FUNCTIONS, AssessmentStore, WhatIf, compute_matrix
+
+
+def _store(random_inventory, rng, n):
+    assets, scores = random_inventory(rng, n, crown_ratio=0.3)
+    store = AssessmentStore()
+    store.add_assets(assets)
+    store.update(scores)
+    return store
+
+
+def _applied(store, actions, plan):
+    # 參考：把方案採用的調整寫進評分 dict 後完整重算
+    scores = dict(store.items())
+    for (name, function, target), take in zip(zip(actions["資產名稱"], actions["功能"], actions["目標"]), plan):
+        if take:
+            scores[(name, function)] = int(target)
+    return compute_matrix(store.assets, scores)
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_plans_match_recompute(random_inventory, seed):
+    rng = random.Random(seed)
+    store = _store(random_inventory, rng, rng.choice([5, 40, 150]))
+    sim = WhatIf(store)
+    actions = sim.upgrades(target=rng.choice([2, 3, 4]), crown_only=rng.random() < 0.5)
+    masks = sim.cell_plans(actions, limit=20, seed=seed)
+    plans = np.vstack([
+        [sim.expand(actions, mask) for mask in masks],
+        np.random.default_rng(seed).random((10, len(actions))) < 0.5,  # 不以格子為單位的任意子集合
+    ])
+    statuses, tiers = sim.evaluate(actions, plans, chunk=7)
+    cell_statuses, cell_tiers = sim.evaluate_cells(actions, masks, chunk=3)
+    assert (cell_statuses == statuses[:len(masks)]).all() and (cell_tiers == tiers[:len(masks)]).all()
+    for s, plan in enumerate(plans):
+        expected = _applied(store, actions, plan)
+        assert {
+            (cat, func): (str(statuses[s, c, f]), int(tiers[s, c, f]))
+            for c, cat in enumerate(CATEGORIES) for f, func in enumerate(FUNCTIONS)
+        } == expected
+    assert sim.matrix(actions) == _applied(store, actions, np.ones(len(actions), dtype=bool))
+    assert sim.matrix(actions, np.zeros(len(actions), dtype=bool)) == store.matrix()
+
+
+def test_upgrades(random_inventory):
+    store = _store(random_inventory, random.Random(3), 80)
+    sim = WhatIf(store)
+    actions = sim.upgrades(target=3, crown_only=False, cells=[("資料", "識別"), ("網路", "復原")], cost_per_step=5)
+    expected = sorted(
+        (name, function, store[(name, function)])
+        for name in store.assets["資產名稱"]
+        for function in FUNCTIONS
+        if (store.category_of(name), function) in {("資料", "識別"), ("網路", "復原")}
+        and 0 < store[(name, function)] < 3
+    )
+    assert sorted(zip(actions["資產名稱"], actions["功能"], actions["目前"])) == expected
+    assert (actions["成本"] == (3 - actions["目前"]) * 5).all()
+    assert sim.upgrades(target=3, crown_only=True)["皇冠寶石"].all()
+    assert sim.upgrades(target=1).empty
+
+
+def test_store_changes_after_creation_do_not_affect_the_simulation(random_inventory):
+    store = _store(random_inventory, random.Random(4), 60)
+    sim = WhatIf(store)
+    before = sim.upgrades(target=4, crown_only=False)
+    store.update({key: 4 for key, _ in list(store.items())})
+    store.remove_assets(store.assets["資產名稱"].tolist()[:30])
+    assert sim.upgrades(target=4, crown_only=False).equals(before)
+
+
+def test_rank_orders_by_risk_then_cost_within_budget(random_inventory):
+    store = _store(random_inventory, random.Random(5), 120)
+    sim = WhatIf(store)
+    actions = sim.upgrades(target=3, crown_only=True)
+    masks = sim.cell_plans(actions, limit=200)
+    cells, _ = sim.plan_cells(actions)
+    assert masks.shape[1] == len(cells) == actions.groupby(["類別", "功能"]).ngroups
+    budget = actions["成本"].sum() / 2
+    ranking = sim.rank(actions, masks, budget=budget, top=len(masks))
+    assert (ranking["成本"] <= budget).all()
+    keys = list(zip(ranking["皇冠風險"], ranking["tier-1"], ranking["tier-2"], ranking["成本"]))
+    assert keys == sorted(keys)
+    plans = np.array([sim.expand(actions, mask) for mask in masks])
+    cost = plans.astype(float) @ actions["成本"].to_numpy(dtype=float)
+    assert len(ranking) == (cost <= budget).sum()
+    assert ranking["成本"].tolist() == cost[ranking["方案"]].tolist()
+    assert ranking["調整數"].tolist() == plans[ranking["方案"]].sum(axis=1).tolist()
+    statuses, _ = sim.evaluate(actions, plans[ranking["方案"].to_numpy()])
+    assert ((statuses == "crown_risk").sum(axis=(1, 2)) == ranking["皇冠風險"]).all()
+
+
+def _plan_peak(random_inventory, n):
+    # 產生 10000 個格子方案、排名並展開最佳方案的記憶體峰值 (不限皇冠寶石：約 3n 個調整)
+    sim = WhatIf(_store(random_inventory, random.Random(6), n))
+    actions = sim.upgrades(target=4, crown_only=False)
+    tracemalloc.start()
+    try:
+        masks = sim.cell_plans(actions, limit=10000)
+        ranking = sim.rank(actions, masks, budget=actions["成本"].sum() / 2)
+        chosen = sim.expand(actions, masks[ranking["方案"].iloc[0]])
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert masks.shape == (10000, 25) and chosen.shape == (len(actions),) and len(actions) > 2 * n
+    return peak
+
+
+def test_plan_memory_does_not_grow_with_assets(random_inventory):
+    # 方案以格子遮罩 (S x G) 表示，不展開成 (方案 x 調整)：資產數 10 倍，記憶體峰值幾乎不變
+    small, large = _plan_peak(random_inventory, 2000), _plan_peak(random_inventory, 20000)
+    assert large < 1.5 * small
+    assert large < 64 * 2**20  # 展開成 (10000 x 6 萬) 的布林矩陣就要 600 MB
@@ -0,0 +1,138 @@
+import random
+
+import pandas as pd
+import pytest
+
+import cdm_core.workspace
+from cdm_core import CATEGORIES, FUNCTIONS, AssessmentStore, WorkspaceDB, classify_cells, compute_matrix
+
+
+def _edit(rng, store):
+    # 隨機異動：逐筆 / 整批新增 (含已存在的名稱)、刪除 (偶爾大量，觸發重新編號)、單筆 / 批次改分
+    names = store.assets["資產名稱"].tolist()
+    op = rng.random()
+    if op < 0.2 or not names:
+        store.add_asset(f"a{rng.randint(0, 3000)}", rng.choice(CATEGORIES), rng.random() < 0.3)
+    elif op < 0.3:
+        n = rng.choice([5, 1500])
+        store.add_assets(pd.DataFrame({
+            "資產名稱": [f"a{rng.randint(0, 3000)}" for _ in range(n)],
+            "類別": [rng.choice(CATEGORIES) for _ in range(n)],
+            "皇冠寶石": [rng.random() < 0.3 for _ in range(n)],
+        }))
+    elif op < 0.4:
+        store.remove_assets(rng.sample(names, int(len(names) * rng.choice([0.05, 0.7]))))
+    elif op < 0.7:
+        store[(rng.choice(names), rng.choice(FUNCTIONS))] = rng.randint(0, 4)
+    else:
+        store.update({(rng.choice(names), rng.choice(FUNCTIONS)): rng.randint(0, 4) for _ in range(rng.randint(1, 100))})
+
+
+def _state(store):
+    # {資產名稱: (類別, 皇冠寶石, 分數...)}
+    names, categories, crowns, scores = store.snapshot()
+    return {
+        name: (CATEGORIES[c], k, *s)
+        for name, c, k, s in zip(names.tolist(), categories.tolist(), crowns.tolist(), scores.tolist())
+    }
+
+
+def _assert_same(loaded, store):
+    assert loaded.assets["資產名稱"].tolist() == store.assets["資產名稱"].tolist()
+    assert _state(loaded) == _state(store)
+    assert loaded.matrix() == store.matrix()
+
+
+@pytest.mark.parametrize("seed", range(80))
+def test_random_edits_survive_reopen(tmp_path, seed):
+    # 每次異動只寫入變更的列；任何時候重新開啟資料庫，內容 (含資產順序) 與記憶體中的 store 相同
+    rng = random.Random(seed)
+    path = str(tmp_path / "workspaces.sqlite")
+    store = WorkspaceDB(path).load("單位")
+    for _ in range(30):
+        _edit(rng, store)
+        if rng.random() < 0.2:
+            _assert_same(WorkspaceDB(path).load("單位", create=False), store)
+    _assert_same(WorkspaceDB(path).load("單位", create=False), store)
+
+
+def test_save_load_and_delete(tmp_path, random_inventory):
+    path = str(tmp_path / "workspaces.sqlite")
+    db = WorkspaceDB(path)
+    assets, scores = random_inventory(random.Random(0), 50)
+    store = AssessmentStore()
+    store.add_assets(assets)
+    store.update(scores)
+    shared = db.shared("甲")
+    db.save("甲", store)
+    assert db.shared("甲") is not shared  # 覆寫後共用的內容重新載入
+    store[("a0", "識別")] = 4 if store[("a0", "識別")] != 4 else 1  # save 之後的異動寫入同一個工作區
+    _assert_same(WorkspaceDB(path).load("甲", create=False), store)
+
+    db.load("乙").add_asset("x", "網路", False)
+    assert db.names() == ["甲", "乙"]
+    db.delete("甲")
+    assert db.names() == ["乙"]
+    with pytest.raises(KeyError):
+        db.load("甲", create=False)
+    assert len(WorkspaceDB(path).load("乙")) == 1
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_snapshots_restore_any_point(tmp_path, monkeypatch, seed):
+    # 差異儲存的快照：隨機異動後建立快照、偶爾刪除快照；每個快照都能還原成當時的內容，
+    # 任意兩個快照的比對與每格統計量 (趨勢) 也與當時的內容一致
+    monkeypatch.setattr(cdm_core.workspace, "KEYFRAME_EVERY", 4)
+    rng = random.Random(seed)
+    path = str(tmp_path / "workspaces.sqlite")
+    db = WorkspaceDB(path)
+    store = db.load("單位")
+    taken = {}  # 快照 id -> 當時的內容
+    for step in range(30):
+        for _ in range(rng.randint(0, 3)):
+            _edit(rng, store)
+        taken[db.snapshot("單位", f"第 {step} 次")] = (_state(store), store.matrix().copy())
+        if rng.random() < 0.15:
+            removed = rng.choice(list(taken))
+            db.delete_snapshot(removed)
+            del taken[removed]
+
+    reopened = WorkspaceDB(path)  # 沒有最新快照的快取，從資料庫還原
+    assert [row[0] for row in reopened.snapshots("單位")] == list(taken)
+    for snapshot_id, (state, _) in taken.items():
+        assert _state(reopened.snapshot_store(snapshot_id)) == state
+
+    ids = list(taken)
+    for _ in range(10):
+        old, new = rng.choice(ids), rng.choice(ids)
+        before, after = taken[old][0], taken[new][0]
+        added, removed, changes = reopened.snapshot_diff(old, new)
+        assert sorted(added) == sorted(set(after) - set(before))
+        assert sorted(removed) == sorted(set(before) - set(after))
+        expected = sorted(
+            (name, field, a, b)
+            for name in set(before) & set(after)
+            for field, a, b in zip(["類別", "皇冠寶石", *FUNCTIONS], before[name], after[name])
+            if a != b
+        )
+        assert sorted(zip(changes["資產名稱"], changes["欄位"], changes["前"], changes["後"])) == expected
+
+    _, *aggregates = reopened.snapshot_cells("單位")
+    statuses, tiers = classify_cells(*aggregates)
+    for k, (_, matrix) in enumerate(taken.values()):
+        assert {
+            (cat, func): (str(statuses[k, c, f]), int(tiers[k, c, f]))
+            for c, cat in enumerate(CATEGORIES) for f, func in enumerate(FUNCTIONS)
+        } == matrix
+
+
+def test_snapshot_of_empty_workspace_and_unknown_ids():
+    db = WorkspaceDB(":memory:")
+    db.load("空")
+    snapshot_id = db.snapshot("空")
+    assert len(db.snapshot_store(snapshot_id)) == 0
+    assert compute_matrix(db.snapshot_store(snapshot_id).assets, {}) == AssessmentStore().matrix()
+    with pytest.raises(KeyError):
+        db.snapshot_store(snapshot_id + 1)
+    with pytest.raises(KeyError):
+        db.snapshot_diff(snapshot_id, snapshot_id + 1)